@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+정적 에셋 빌드 도구
+assets/new_design.css → static/new_design.<해시>.css (압축 + 폰트 자체 호스팅)
+
+- CSS 압축 (주석 / 공백 제거)
+- Google Fonts CSS를 받아 필요한 서브셋(latin 등)의 woff2만 static/fonts/에 저장하고 URL을 로컬 경로로 교체
+  (빌드할 때만 네트워크 필요, 실행 중에는 오프라인으로 동작)
+- 내용 해시를 파일명에 넣어 내용이 바뀌면 URL도 바뀜 → 브라우저가 오래 캐시해도 안전
+- static/assets_manifest.json에 논리 이름 → 해시 파일명 기록 (styles_new_design.py가 읽음)
+
+Streamlit 정적 파일 서빙(.streamlit/config.toml의 server.enableStaticServing)으로 app/static/ 경로에 제공됨
+
+빌드 결과(static/)는 저장소에 넣지 않음 → 앱이 처음 스타일을 적용할 때 ensure_built()가 자동 빌드
+(매니페스트가 없거나 원본 CSS가 바뀌었을 때만, 폰트를 받을 수 없으면 폰트 없이 빌드하고 다음 실행에서 다시 시도)
+배포 환경에서 시작 시 네트워크를 쓰지 않으려면 배포 단계에서 미리 빌드하고 ASSETS_AUTO_BUILD=0
+
+사용 예:
+    python build_assets.py            # 폰트 포함 빌드
+    python build_assets.py --no-fonts # 오프라인 빌드 (시스템 폰트로 대체)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+ASSETS_DIR = ROOT / "assets"
+STATIC_DIR = ROOT / "static"
+FONTS_DIR = STATIC_DIR / "fonts"
+MANIFEST_PATH = STATIC_DIR / "assets_manifest.json"
+
+# Streamlit 정적 파일 URL 접두어 (페이지 기준 상대 경로)
+STATIC_URL = "app/static/"
+
+# 0이면 실행 시 자동 빌드 안 함 (배포 단계에서 미리 빌드한 경우)
+AUTO_BUILD = os.getenv("ASSETS_AUTO_BUILD", "1") != "0"
+
+# 논리 이름 → 원본 CSS
+CSS_BUNDLES = {
+    "new_design.css": ASSETS_DIR / "new_design.css",
+}
+
+# 자체 호스팅할 Google Fonts (styles_new_design.GOOGLE_FONTS_LINKS와 같은 패밀리)
+GOOGLE_FONTS_URLS = [
+    "https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap",
+    "https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700&family=Inter:wght@400;500;700&family=JetBrains+Mono:wght@400;700&family=Playfair+Display:wght@700&family=Space+Grotesk:wght@400;500;700&display=swap",
+    # 아이콘 폰트는 실제로 쓰는 아이콘만 서브셋
+    "https://fonts.googleapis.com/css2?family=Material+Symbols+Outlined&icon_names=verified",
+]
+
+# 유지할 유니코드 서브셋 (Google Fonts CSS의 /* latin */ 주석 기준, 주석이 없는 블록은 항상 유지)
+FONT_SUBSETS = ("latin",)
+
+# woff2 응답을 받기 위한 브라우저 User-Agent
+WOFF2_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+FONT_FACE_PATTERN = re.compile(r"(?:/\*\s*([\w-]+)\s*\*/\s*)?(@font-face\s*\{[^}]*\})")
+FONT_URL_PATTERN = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+)\)")
+
+
+def minify_css(css):
+    """CSS 압축 (주석 / 불필요한 공백 / 마지막 세미콜론 제거)"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def content_hash(data, length=10):
+    """파일명용 내용 해시"""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def _fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": WOFF2_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def _localize_font(match):
+    """gstatic 폰트 파일을 받아 static/fonts/<해시>.woff2로 저장하고 로컬 URL 반환"""
+    data = _fetch(match.group(1))
+    filename = f"{content_hash(data)}.woff2"
+    (FONTS_DIR / filename).write_bytes(data)
+    return f"url({STATIC_URL}fonts/{filename})"
+
+
+def _keep_subset(match):
+    """FONT_SUBSETS에 없는 서브셋의 @font-face 블록 제거"""
+    subset, face = match.groups()
+    return "" if subset and subset not in FONT_SUBSETS else face
+
+
+def build_font_css():
+    """Google Fonts CSS를 받아 폰트 URL을 로컬 경로로 바꾼 CSS 반환 (아이콘 클래스 규칙 등은 그대로 유지)"""
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    parts = []
+    for url in GOOGLE_FONTS_URLS:
+        css = FONT_FACE_PATTERN.sub(_keep_subset, _fetch(url).decode("utf-8"))
+        parts.append(FONT_URL_PATTERN.sub(_localize_font, css))
+        print(f"  ✓ {url.split('family=')[1].split(':')[0].split('&')[0]}")
+    return "".join(parts)
+
+
+def _remove_stale(name, keep):
+    """이전 빌드의 해시 파일 삭제"""
+    stem, suffix = name.rsplit(".", 1)
+    for path in STATIC_DIR.glob(f"{stem}.*.{suffix}"):
+        if path.name != keep:
+            path.unlink()
+
+
+def build(with_fonts=True, retry_fonts=False):
+    """
+    CSS 번들 빌드 + 매니페스트 저장
+
+    retry_fonts: 폰트 다운로드에 실패해 폰트 없이 빌드한 경우 True → 다음 실행 때 폰트 포함으로 다시 빌드
+                 (--no-fonts로 일부러 폰트 없이 빌드한 결과는 그대로 사용)
+    """
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+
+    font_css = ""
+    if with_fonts:
+        print("🔤 폰트 다운로드 중...")
+        font_css = minify_css(build_font_css())
+
+    manifest = {}
+    for name, source in CSS_BUNDLES.items():
+        css = font_css + minify_css(source.read_text(encoding="utf-8"))
+        data = css.encode("utf-8")
+        stem, suffix = name.rsplit(".", 1)
+        filename = f"{stem}.{content_hash(data)}.{suffix}"
+        (STATIC_DIR / filename).write_bytes(data)
+        _remove_stale(name, filename)
+        manifest[name] = {"file": filename, "fonts": with_fonts, "source": content_hash(source.read_bytes())}
+        if retry_fonts:
+            manifest[name]["retry_fonts"] = True
+        print(f"✓ {name} → static/{filename} ({source.stat().st_size:,} → {len(data):,} bytes)")
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"✓ 매니페스트 저장: {MANIFEST_PATH}")
+    return manifest
+
+
+def read_manifest():
+    """빌드 매니페스트 (없으면 빈 dict)"""
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_stale(manifest):
+    """번들이 없거나, 원본 CSS가 빌드 이후 바뀌었거나, 폰트 다운로드 실패로 폰트 없이 빌드됐으면 True"""
+    for name, source in CSS_BUNDLES.items():
+        bundle = manifest.get(name)
+        if not bundle or not (STATIC_DIR / bundle["file"]).exists():
+            return True
+        if bundle.get("source") != content_hash(source.read_bytes()):
+            return True
+        if bundle.get("retry_fonts"):
+            return True
+    return False
+
+
+def ensure_built():
+    """
+    실행 시 빌드: 빌드 결과가 최신이면 그대로, 아니면 다시 빌드한 매니페스트 반환
+
+    폰트를 받을 수 없으면 폰트 없이 빌드 (Google Fonts 링크로 대체, 다음 실행에서 폰트 다운로드 재시도),
+    빌드 자체를 할 수 없으면 (읽기 전용 파일 시스템 등) 빈 dict → 인라인 CSS
+    """
+    manifest = read_manifest()
+    if not AUTO_BUILD or not is_stale(manifest):
+        return manifest
+    print("🎨 스타일 번들이 없거나 오래되어 빌드합니다...")
+    try:
+        return build(with_fonts=True)
+    except OSError as e:
+        print(f"⚠️ 폰트 포함 빌드 실패 ({e}) → 폰트 없이 빌드")
+    try:
+        return build(with_fonts=False, retry_fonts=True)
+    except OSError as e:
+        print(f"⚠️ 스타일 번들 빌드 실패 ({e}) → 인라인 CSS 사용")
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정적 에셋 빌드 (CSS 압축 + 폰트 자체 호스팅)")
+    parser.add_argument("--no-fonts", action="store_true", help="폰트 다운로드 생략 (오프라인 빌드)")
+    args = parser.parse_args()
+    build(with_fonts=not args.no_fonts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+합성 증거 데이터셋 생성기
+에피소드 1의 6개 데이터셋(data/*.csv)과 같은 스키마로 대용량 데이터를 생성
+
+- 시드 고정: 같은 설정이면 항상 같은 데이터 (날짜별 시드 분리 → 파티션 단위로 재현 가능)
+- 날짜 단위로 NumPy 벡터 연산 (행 단위 루프 없음), 하루치씩 만들고 바로 저장해서 메모리 일정
+- 단서는 노이즈 속에 심어 둠: 카이토의 DBG 토큰 수정 로그, 녹티스의 IP / 기기 지문
+- noise 비율만큼 미끼 추가: 정상 업무에 쓰인 DBG 토큰, 같은 대역(203.0.113.x) IP를 쓰는 플레이어
+- 서버 로그 / 매치 기록은 날짜별 파티션 Parquet, 나머지는 단일 Parquet
+- 날짜 = 게임 일자 (매일 GAME_DAY_START(UTC)의 일일 초기화부터 다음 초기화 전까지, 시작한 날짜로 표기)
+
+사용 예:
+    python data_generator.py --out data/generated --log-rows 5000000 --match-rows 2000000
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# 캐릭터 (이름, 영문 대상명, 포지션, 난이도, 픽률 가중치, 기본 승률)
+CHARACTERS = [
+    ("셰도우", "Shadow", "암살자", "어려움", 15.3, 0.50),
+    ("피닉스", "Phoenix", "마법사", "보통", 12.5, 0.56),
+    ("바이퍼", "Viper", "원거리", "쉬움", 8.7, 0.51),
+    ("블레이드", "Blade", "전사", "어려움", 18.2, 0.53),
+    ("루나", "Luna", "서포터", "보통", 9.3, 0.515),
+    ("노바", "Nova", "원거리", "어려움", 6.8, 0.55),
+    ("제로", "Zero", "암살자", "어려움", 14.6, 0.497),
+    ("오로라", "Aurora", "마법사", "쉬움", 11.2, 0.534),
+    ("타이탄", "Titan", "전사", "보통", 13.8, 0.509),
+    ("가디언", "Guardian", "서포터", "보통", 8.9, 0.523),
+]
+SHADOW = 0
+
+# 심어 둘 단서
+CULPRIT_USER = "admin01_kaito"
+CULPRIT_IP = "203.0.113.45"
+CULPRIT_TOKEN = "DBG-3344"
+CULPRIT_TOKEN_NUMBER = int(CULPRIT_TOKEN.split("-")[1])
+NOCTIS_NAME = "녹티스"
+NOCTIS_DEVICE = "DFP:7a9c42b1"
+# 수정 시각 (에피소드 대본의 2025-01-25T23:47:22Z)
+SPIKE_TIME = "23:47:22"
+
+STORY_USERS = ["admin01_kaito", "admin02_lucas", "admin03_maya"]
+LOG_ACTIONS = ["View", "Modify", "Login", "Logout", "Email"]
+LOG_ACTION_WEIGHTS = [0.74, 0.05, 0.1, 0.1, 0.01]
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# 게임 일자 시작 시각 (UTC 20:00 일일 초기화) - 일별 집계 / 파티션 기준
+# 자정 기준이면 23:47 수정 이후 경기가 25일에 13분뿐이라 급등이 26일로 밀림
+# → 25일 게임 일자(25일 20:00 ~ 26일 20:00)는 대부분 수정 이후라 대본대로 25일이 급등
+GAME_DAY_START = np.timedelta64(20 * 60 * 60, "s")
+
+
+def _day_rng(seed, day_index):
+    """날짜별 독립 난수 생성기 (다른 날짜 생성 여부와 무관하게 재현 가능)"""
+    return np.random.default_rng([seed, day_index])
+
+
+def _day_start(day):
+    """게임 일자 시작 시각 (UTC)"""
+    return np.datetime64(day, "s") + GAME_DAY_START
+
+
+def _game_day(ts):
+    """타임스탬프 → 게임 일자"""
+    return (ts - GAME_DAY_START).astype("datetime64[D]")
+
+
+def _sorted_times(rng, day, n):
+    """게임 일자 하루 안에서 정렬된 임의 타임스탬프 n개"""
+    seconds = np.sort(rng.integers(0, SECONDS_PER_DAY, n))
+    return _day_start(day) + seconds.astype("timedelta64[s]")
+
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def build_player_pool(seed, n_players, noise):
+    """플레이어 풀 (이름, IP, 기기 지문) - noise 비율은 범인과 같은 IP 대역을 쓰는 미끼"""
+    rng = np.random.default_rng([seed, 0xFFFF])
+    names = np.array([f"player_{i:06d}" for i in range(n_players)] + [NOCTIS_NAME])
+
+    octets = rng.integers(1, 255, size=(n_players, 3))
+    ips = np.char.add(np.char.add("10.", octets[:, 0].astype(str)), np.char.add(".", octets[:, 1].astype(str)))
+    ips = np.char.add(np.char.add(ips, "."), octets[:, 2].astype(str))
+
+    decoys = rng.random(n_players) < noise
+    decoy_hosts = rng.integers(1, 255, size=decoys.sum())
+    decoy_hosts[decoy_hosts == 45] = 46
+    ips[decoys] = np.char.add("203.0.113.", decoy_hosts.astype(str))
+    ips = np.append(ips, CULPRIT_IP)
+
+    devices = np.char.add("DFP:", np.char.zfill(np.char.mod("%x", rng.integers(0, 2**32, n_players, dtype=np.uint64)), 8))
+    devices = np.append(devices, NOCTIS_DEVICE)
+    return names, ips, devices
+
+
+def generate_match_day(rng, day, n, players, spike_at):
+    """하루치 매치 기록 (녹티스의 셰도우 경기 포함)"""
+    names, ips, devices = players
+    n_players = len(names) - 1
+
+    # 일반 플레이어 경기
+    weights = np.array([c[4] for c in CHARACTERS])
+    characters = rng.choice(len(CHARACTERS), size=n, p=weights / weights.sum())
+    player_ids = rng.integers(0, n_players, n)
+    times = _sorted_times(rng, day, n)
+
+    # 녹티스 경기 (평소 하루 35~45판, 수정 직후부터 셰도우 급등)
+    n_noctis = int(rng.integers(35, 46))
+    noctis_times = _sorted_times(rng, day, n_noctis)
+    if _game_day(spike_at) == np.datetime64(day):
+        # 수정 당일은 수정 3분 후부터 몰아서 플레이 (다음 초기화를 넘기지 않도록 → 다른 날짜 파티션에 섞이지 않음)
+        day_end = _day_start(day) + np.timedelta64(SECONDS_PER_DAY, "s")
+        last = min(180 + 12 * 60, int((day_end - spike_at) / np.timedelta64(1, "s")))
+        offsets = np.sort(rng.integers(min(180, last - 1), last, n_noctis // 2))
+        noctis_times = spike_at + offsets.astype("timedelta64[s]")
+        n_noctis = len(noctis_times)
+
+    characters = np.concatenate([characters, np.full(n_noctis, SHADOW)])
+    player_ids = np.concatenate([player_ids, np.full(n_noctis, n_players)])
+    times = np.concatenate([times, noctis_times])
+    order = np.argsort(times, kind="stable")
+    characters, player_ids, times = characters[order], player_ids[order], times[order]
+
+    # 승패 / 스탯 (수정 이후 셰도우만 강해짐)
+    boosted = (characters == SHADOW) & (times >= spike_at)
+    win_prob = np.array([c[5] for c in CHARACTERS])[characters]
+    win_prob = np.where(player_ids == n_players, 0.48, win_prob)
+    win_prob = np.where(boosted, np.where(player_ids == n_players, 0.88, 0.85), win_prob)
+    wins = rng.random(len(times)) < win_prob
+
+    kills = rng.poisson(np.where(wins, 9.0, 6.0) + boosted * 6.0)
+    deaths = rng.poisson(np.clip(np.where(wins, 5.0, 7.0) - boosted * 4.0, 0.5, None))
+    damage = (kills * 2200 + rng.normal(5000, 1500, len(times))).clip(1000).astype(np.int32)
+    minutes = rng.integers(14, 31, len(times))
+
+    return pd.DataFrame({
+        "타임스탬프": times,
+        "플레이어명": _categorical(player_ids, names),
+        "캐릭터": _categorical(characters, [c[0] for c in CHARACTERS]),
+        "결과": _categorical(wins.astype(np.int8), ["패배", "승리"]),
+        "킬": kills.astype(np.int16),
+        "데스": deaths.astype(np.int16),
+        "총_데미지": damage,
+        "매치_지속시간": _categorical(minutes - 14, [f"{m}분" for m in range(14, 31)]),
+        "IP주소": ips[player_ids],
+        "기기지문": devices[player_ids],
+    })
+
+
+def generate_log_day(rng, day, n, n_staff, noise, spike_at):
+    """하루치 서버 로그 (수정 당일에는 카이토의 무단 수정 로그를 심음)"""
+    users = STORY_USERS + [f"staff{i:03d}" for i in range(n_staff)]
+    user_ips = np.array([f"192.168.{1 + i // 250}.{10 + i % 250}" for i in range(len(users))])
+    targets = [f"{c[1]}.stats" for c in CHARACTERS] + [f"{c[1]}.base_stats" for c in CHARACTERS] + ["All_Characters", "Community_Forum"]
+
+    user_ids = rng.integers(0, len(users), n)
+    actions = rng.choice(len(LOG_ACTIONS), size=n, p=LOG_ACTION_WEIGHTS)
+    target_ids = rng.integers(0, len(targets), n)
+    times = _sorted_times(rng, day, n)
+
+    tokens = np.full(n, "APPROVED", dtype=object)
+    notes = np.full(n, "정상업무", dtype=object)
+
+    # 미끼: 정상 버그 수정에 쓰인 DBG 토큰 (사내 IP)
+    decoys = (LOG_ACTIONS[1] == np.array(LOG_ACTIONS)[actions]) & (rng.random(n) < noise)
+    # 범인 토큰 번호는 건너뜀 (1000~9999 중 범인 번호를 뺀 값)
+    numbers = rng.integers(1000, 9999, decoys.sum())
+    numbers[numbers >= CULPRIT_TOKEN_NUMBER] += 1
+    tokens[decoys] = np.char.add("DBG-", numbers.astype(str))
+    notes[decoys] = "긴급버그수정"
+
+    df = pd.DataFrame({
+        "타임스탬프": pd.to_datetime(times).tz_localize("UTC"),
+        "사용자": np.array(users)[user_ids],
+        "작업": np.array(LOG_ACTIONS)[actions],
+        "대상": np.array(targets)[target_ids],
+        "변경내용": "",
+        "IP주소": user_ips[user_ids],
+        "승인토큰": tokens,
+        "비고": notes,
+    })
+
+    if _game_day(spike_at) == np.datetime64(day):
+        planted_at = pd.Timestamp(spike_at).tz_localize("UTC")
+        planted = pd.DataFrame({
+            "타임스탬프": [planted_at, planted_at + pd.Timedelta(seconds=33)],
+            "사용자": [CULPRIT_USER, CULPRIT_USER],
+            "작업": ["Modify", "Logout"],
+            "대상": ["Shadow.base_stats", ""],
+            "변경내용": ["ATK +15|DEF +10", ""],
+            "IP주소": [CULPRIT_IP, CULPRIT_IP],
+            "승인토큰": [CULPRIT_TOKEN, CULPRIT_TOKEN],
+            "비고": ["집IP_무단수정!", ""],
+        })
+        df = pd.concat([df, planted], ignore_index=True).sort_values("타임스탬프", kind="stable")
+
+    for column in ["사용자", "작업", "대상", "IP주소", "승인토큰", "비고"]:
+        df[column] = df[column].astype("category")
+    return df.reset_index(drop=True)
+
+
+def generate_patch_notes(seed, days, spike_day, n_noise):
+    """패치 노트 (공식 기록 + 다른 캐릭터 노이즈 패치) - 수정 당일 셰도우는 '변경사항 없음'"""
+    rng = np.random.default_rng([seed, 0xBEEF])
+    official = pd.DataFrame({
+        "날짜": [spike_day, spike_day],
+        "버전": ["v2.8.1", "v2.8.1"],
+        "캐릭터": ["셰도우", "피닉스"],
+        "변경사항": ["변경사항 없음", "쿨다운 2초 감소"],
+        "승인자": ["공식기록", "lucas_manager"],
+    })
+    others = [c[0] for c in CHARACTERS[1:]]
+    changes = ["스킬 쿨다운 감소", "기본 공격력 +5", "이동속도 +2%", "방어력 -3", "버그 수정"]
+    noise = pd.DataFrame({
+        "날짜": rng.choice(days, n_noise).astype(str),
+        "버전": [f"v2.7.{i}" for i in range(n_noise)],
+        "캐릭터": rng.choice(others, n_noise),
+        "변경사항": rng.choice(changes, n_noise),
+        "승인자": "lucas_manager",
+    })
+    return pd.concat([noise, official], ignore_index=True).sort_values("날짜", kind="stable").reset_index(drop=True)
+
+
+def _write(df, out_dir, name, day=None, fmt="parquet"):
+    """데이터셋 저장 (day가 있으면 날짜=YYYY-MM-DD 파티션)"""
+    if day is not None:
+        path = os.path.join(out_dir, name, f"날짜={day}")
+        filename = "part-0"
+    else:
+        path = out_dir
+        filename = name
+    os.makedirs(path, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(os.path.join(path, f"{filename}.csv"), index=False)
+    else:
+        df.to_parquet(os.path.join(path, f"{filename}.parquet"), index=False)
+
+
+def generate_all(out_dir, seed=42, start="2025-01-15", n_days=16, spike_day="2025-01-25",
+                 log_rows=1_000_000, match_rows=1_000_000, n_players=50_000, n_staff=40,
+                 noise=0.01, fmt="parquet"):
+    """
+    6개 데이터셋 생성 + 저장
+
+    Args:
+        log_rows / match_rows: 전체 기간의 서버 로그 / 매치 기록 행 수 (날짜별로 균등 분배)
+        noise: 미끼 비율 (정상 DBG 토큰 사용, 범인과 같은 IP 대역 플레이어)
+    """
+    days = np.arange(np.datetime64(start), np.datetime64(start) + n_days).astype(str)
+    spike_at = np.datetime64(f"{spike_day}T{SPIKE_TIME}", "s")
+    players = build_player_pool(seed, n_players, noise)
+
+    n_chars = len(CHARACTERS)
+    games = np.zeros((n_days, n_chars), dtype=np.int64)
+    wins = np.zeros((n_days, n_chars), dtype=np.int64)
+    shadow_rows, profile_rows = [], []
+
+    for i, day in enumerate(days):
+        rng = _day_rng(seed, i)
+
+        matches = generate_match_day(rng, day, match_rows // n_days, players, spike_at)
+        logs = generate_log_day(rng, day, log_rows // n_days, n_staff, noise, spike_at)
+
+        # 집계용 누적 (캐릭터별 경기 수 / 승리 수)
+        codes = matches["캐릭터"].cat.codes.to_numpy()
+        won = matches["결과"].cat.codes.to_numpy() == 1
+        games[i] = np.bincount(codes, minlength=n_chars)
+        wins[i] = np.bincount(codes, weights=won, minlength=n_chars).astype(np.int64)
+
+        shadow = matches[codes == SHADOW]
+        shadow_rows.append({
+            "날짜": day,
+            "승률": round(won[codes == SHADOW].mean() * 100, 1),
+            "게임수": len(shadow),
+            "평균_킬": round(shadow["킬"].mean(), 1),
+            "평균_데스": round(shadow["데스"].mean(), 1),
+        })
+
+        noctis = matches[matches["플레이어명"] == NOCTIS_NAME]
+        profile_rows.append({
+            "날짜": day,
+            "플레이어명": NOCTIS_NAME,
+            "플레이_캐릭터": "셰도우",
+            "승률": round((noctis["결과"] == "승리").mean() * 100, 1),
+            "게임수": len(noctis),
+            "평균_킬": round(noctis["킬"].mean(), 1),
+            "IP주소": CULPRIT_IP,
+            "기기지문": NOCTIS_DEVICE,
+        })
+
+        _write(matches, out_dir, "match_sessions", day, fmt)
+        _write(logs, out_dir, "server_logs", day, fmt)
+        print(f"✓ {day}: 매치 {len(matches):,}건, 로그 {len(logs):,}건")
+
+    # 캐릭터 요약 (전반부 대비 후반부 승률 변화로 추세 판단)
+    total_games = games.sum(axis=0)
+    half = n_days // 2
+    early = wins[:half].sum(axis=0) / np.maximum(games[:half].sum(axis=0), 1)
+    late = wins[half:].sum(axis=0) / np.maximum(games[half:].sum(axis=0), 1)
+    change = (late - early) * 100
+    characters = pd.DataFrame({
+        "캐릭터명": [c[0] for c in CHARACTERS],
+        "평균_승률": np.round(wins.sum(axis=0) / np.maximum(total_games, 1) * 100, 1),
+        "픽률": np.round(total_games / total_games.sum() * 100, 1),
+        "총_게임수": total_games,
+        "포지션": [c[2] for c in CHARACTERS],
+        "난이도": [c[3] for c in CHARACTERS],
+        "변화_추세": np.select([change > 20, change > 3], ["급등", "점진상승"], "안정"),
+    })
+
+    # 셰도우 일별 비고: 전날 대비 20%p 이상 오른 첫날이 급등, 이후는 높은 수준 유지
+    shadow_daily = pd.DataFrame(shadow_rows)
+    jumped = (shadow_daily["승률"].diff() >= 20).to_numpy()
+    after = np.cumsum(jumped) > 0
+    shadow_daily["비고"] = np.select([jumped, after], ["급등!", "높은수준유지"], "정상")
+
+    _write(characters, out_dir, "characters", fmt=fmt)
+    _write(shadow_daily, out_dir, "shadow_daily", fmt=fmt)
+    _write(generate_patch_notes(seed, days, spike_day, n_noise=max(5, n_days)), out_dir, "patch_notes", fmt=fmt)
+    _write(pd.DataFrame(profile_rows), out_dir, "player_profile_noctis", fmt=fmt)
+    print(f"\n✓ 저장 완료: {out_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 증거 데이터셋 생성기")
+    parser.add_argument("--out", default="data/generated", help="출력 폴더")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-rows", type=int, default=1_000_000)
+    parser.add_argument("--match-rows", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--noise", type=float, default=0.01, help="미끼 비율 (0~1)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    args = parser.parse_args()
+
+    generate_all(
+        args.out, seed=args.seed, log_rows=args.log_rows, match_rows=args.match_rows,
+        n_players=args.players, noise=args.noise, fmt=args.format
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+에피소드 엔진 - 스테이지 그래프(JSON) 기반 에피소드 진행
+app.py의 if/elif 스테이지 체인 대신 스테이지 ID → 스테이지 정의를 dict로 바로 찾음
+Streamlit에 의존하지 않으므로 다른 프론트엔드(Flutter 등)도 같은 JSON을 사용할 수 있음
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+EPISODES_DIR = Path(__file__).parent / "data" / "episodes"
+
+# 정의되지 않은 스테이지는 자유 채팅으로 처리
+DEFAULT_STAGE_TYPE = "free_chat"
+
+
+class EpisodeGraph:
+    """컴파일된 스테이지 그래프 (스테이지, 선택지, 점수, 배지, 증거 공개 시점)"""
+
+    def __init__(self, data):
+        self.episode_id = data["episodeId"]
+        self.title = data["title"]
+        self.language = data.get("language", "ko")
+        self.start_stage = data["startStage"]
+        self.contexts = data.get("contexts", {})
+        self.evidence = data.get("evidence", {})
+
+        # 스테이지 ID → 정의 (O(1) 조회)
+        self.stages = {stage["id"]: stage for stage in data["stages"]}
+
+        # 진행 순서 (진행 바 / 증거 공개 판단용)
+        self.progress = data.get("progress", [])
+        self._progress_index = {item["id"]: i for i, item in enumerate(self.progress)}
+        self._progress_names = {item["id"]: item["name"] for item in self.progress}
+
+    def stage(self, stage_id):
+        """스테이지 정의 반환 (없으면 None)"""
+        return self.stages.get(stage_id)
+
+    def stage_type(self, stage_id):
+        """스테이지 타입 반환 - 핸들러 테이블의 키"""
+        stage = self.stages.get(stage_id)
+        return stage.get("type", DEFAULT_STAGE_TYPE) if stage else DEFAULT_STAGE_TYPE
+
+    def hints(self, stage_id):
+        """스테이지 힌트 목록"""
+        stage = self.stages.get(stage_id)
+        return stage.get("hints", []) if stage else []
+
+    def context(self, stage_id):
+        """LLM 프롬프트용 스테이지 컨텍스트"""
+        return self.contexts.get(stage_id, "")
+
+    def progress_of(self, stage_id):
+        """(현재 순서, 전체 개수, 스테이지 이름) 반환 - 진행 순서에 없으면 None"""
+        if stage_id not in self._progress_index:
+            return None
+        return self._progress_index[stage_id] + 1, len(self.progress), self._progress_names[stage_id]
+
+    def reached(self, stage_id, target_stage_id):
+        """stage_id가 진행 순서상 target_stage_id 이후(포함)인지 여부"""
+        if stage_id not in self._progress_index or target_stage_id not in self._progress_index:
+            return False
+        return self._progress_index[stage_id] >= self._progress_index[target_stage_id]
+
+    def is_unlocked(self, panel, stage_id):
+        """증거 패널 공개 여부"""
+        rule = self.evidence.get(panel)
+        if not rule:
+            return False
+        if "stages" in rule:
+            return stage_id in rule["stages"]
+        if "from" in rule and not self.reached(stage_id, rule["from"]):
+            return False
+        return True
+
+    def is_current(self, panel, stage_id):
+        """현재 스테이지에서 조사 중인 증거 패널인지 여부"""
+        rule = self.evidence.get(panel, {})
+        return stage_id in rule.get("current", [])
+
+    def find_choice(self, stage_id, choice_id):
+        """스테이지의 선택지 찾기"""
+        stage = self.stages.get(stage_id) or {}
+        for choice in stage.get("choices", []):
+            if choice["id"] == choice_id:
+                return choice
+        return None
+
+    def rank_for(self, stage_id, score):
+        """점수에 따른 등급 (label, emoji) 반환"""
+        stage = self.stages.get(stage_id) or {}
+        for rank in stage.get("ranks", []):
+            if score >= rank["minScore"]:
+                return rank["label"], rank["emoji"]
+        return None, None
+
+
+def fill_text(text, name):
+    """메시지의 {name} 자리표시자 채우기 (다른 중괄호는 그대로 둠)"""
+    return text.replace("{name}", str(name))
+
+
+@lru_cache(maxsize=None)
+def load_episode(episode_id, language="ko"):
+    """에피소드 그래프 로드 (프로세스당 한 번, 요청 시점에 지연 로드)"""
+    path = EPISODES_DIR / f"{episode_id}_{language}.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return EpisodeGraph(json.load(f))
+
+
+def available_episodes():
+    """data/episodes에 있는 (episode_id, language) 목록"""
+    episodes = []
+    for path in sorted(EPISODES_DIR.glob("*_*.json")):
+        episode_id, _, language = path.stem.rpartition("_")
+        episodes.append((episode_id, language))
+    return episodes
@@ -0,0 +1,95 @@
+"""
+증거 차트 빌더
+데이터셋 버전(파일 수정 시각 + 크기)별로 한 번만 만들어 모든 세션이 공유하도록 app.py에서 캐시
+수치 컬럼은 NumPy 배열로 넘겨 Plotly가 typed array(base64)로 직렬화하도록 함 (plotly 6 이상)
+캐시로 줄이는 건 차트 생성 비용뿐 - st.plotly_chart는 렌더링마다 Figure를 JSON으로 다시 직렬화함 (차트당 약 1ms)
+"""
+
+import hashlib
+import os
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def dataset_version(paths):
+    """데이터 파일 목록의 버전 문자열 (내용이 바뀌면 캐시 키도 바뀜)"""
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+        else:
+            # 없는 파일은 load_data에서 에러로 안내
+            digest.update(f"{path}:missing".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def build_character_winrate_figure(characters_df):
+    """캐릭터별 승률 막대 차트"""
+    sorted_df = characters_df.sort_values("평균_승률", ascending=False)
+    win_rates = sorted_df["평균_승률"].to_numpy(dtype="float32")
+
+    fig = px.bar(
+        x=sorted_df["캐릭터명"].to_numpy(),
+        y=win_rates,
+        color=win_rates,
+        color_continuous_scale="RdYlGn",
+        title="캐릭터별 승률 비교",
+        labels={"x": "캐릭터명", "y": "승률 (%)", "color": "승률 (%)"}
+    )
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", annotation_text="평균 50%")
+    fig.update_layout(
+        coloraxis_colorbar=dict(
+            title="승률 (%)",
+            tickvals=[40, 50, 60, 70, 80],
+        )
+    )
+    return fig
+
+
+def build_daily_winrate_figure(daily_df, name, color, title, normal_label, zoom=False):
+    """일별 승률 라인 차트 (셰도우 일별 / 플레이어 프로필 공용)"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=daily_df["날짜"].to_numpy(),
+        y=daily_df["승률"].to_numpy(dtype="float32"),
+        mode='lines+markers',
+        name=name,
+        line=dict(color=color, width=3),
+        marker=dict(size=8),
+        hovertemplate='%{x}<br>승률: %{y}%<extra></extra>'
+    ))
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", annotation_text=normal_label)
+    fig.update_layout(
+        title=title,
+        xaxis_title="날짜",
+        yaxis_title="승률 (%)",
+        hovermode='x unified'
+    )
+    if zoom:
+        fig.update_layout(dragmode='zoom')
+    return fig
+
+
+def build_shadow_daily_figure(shadow_daily_df):
+    """셰도우 일별 승률 추이"""
+    return build_daily_winrate_figure(
+        shadow_daily_df, name='셰도우 승률', color='red',
+        title="셰도우 일별 승률 추이", normal_label="정상 범위 (50%)", zoom=True
+    )
+
+
+def build_player_profile_figure(player_profile_df):
+    """녹티스(플레이어) 승률 변화"""
+    return build_daily_winrate_figure(
+        player_profile_df, name='녹티스 승률', color='purple',
+        title="녹티스(플레이어) 승률 변화", normal_label="평균 50%"
+    )
+
+
+FIGURE_BUILDERS = {
+    "characters": build_character_winrate_figure,
+    "shadow_daily": build_shadow_daily_figure,
+    "player_profile": build_player_profile_figure,
+}
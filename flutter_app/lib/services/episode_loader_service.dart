@@ -2,20 +2,133 @@ import 'dart:convert';
 import 'package:flutter/services.dart';
 
 /// Service to load episode data from JSON files based on language
+///
+/// Episodes are built by tools/build_episodes.py into minified bundles under
+/// assets/episodes/dist/ with a manifest. Only the manifest is read up front;
+/// each episode is loaded the first time it is requested and then cached.
+///
+/// A bundle is one language-independent structure file (scenes, node ids,
+/// links, choices) plus a per-language string table keyed by node id; they
+/// are joined here, so the structure is loaded once for all languages.
+/// Languages whose structure differs (built with --allow-mismatch) carry
+/// their own structure file in their manifest entry.
+///
+/// Only successful loads are cached; a failed load is retried next time.
 class EpisodeLoaderService {
-  /// Load episode data for a specific episode and language
-  Future<Map<String, dynamic>> loadEpisode(String episodeId, String language) async {
+  static const String _distPath = 'assets/episodes/dist';
+
+  static Map<String, dynamic>? _manifest;
+  static final Map<String, Future<Map<String, dynamic>>> _cache = {};
+  static final Map<String, Future<Map<String, dynamic>>> _structures = {};
+
+  /// Load (once) the bundle manifest: episodeId -> {structure, languages}
+  Future<Map<String, dynamic>> _loadManifest() async {
+    if (_manifest != null) return _manifest!;
     try {
-      // Determine file path based on episode and language
-      final filePath = 'assets/episodes/${episodeId}_$language.json';
+      final String jsonString = await rootBundle.loadString('$_distPath/manifest.json');
+      _manifest = (json.decode(jsonString)['episodes'] as Map<String, dynamic>?) ?? {};
+    } catch (e) {
+      print('Episode manifest not found, using legacy files: $e');
+      _manifest = {};
+    }
+    return _manifest!;
+  }
 
-      // Load the JSON file
-      final String jsonString = await rootBundle.loadString(filePath);
+  /// Episode ids available in the manifest (e.g. for an episode picker)
+  Future<List<String>> availableEpisodes() async {
+    final manifest = await _loadManifest();
+    return manifest.keys.toList()..sort();
+  }
+
+  Future<Map<String, dynamic>> _loadJson(String path) async {
+    final String jsonString = await rootBundle.loadString(path);
+    return json.decode(jsonString) as Map<String, dynamic>;
+  }
+
+  /// Join the shared structure with one language's string table
+  Map<String, dynamic> _join(Map<String, dynamic> structure, Map<String, dynamic> strings) {
+    final sceneTitles = (strings['scenes'] as Map<String, dynamic>?) ?? {};
+    final nodeStrings = (strings['nodes'] as Map<String, dynamic>?) ?? {};
 
-      // Parse JSON
-      final Map<String, dynamic> episodeData = json.decode(jsonString);
+    final scenes = (structure['scenes'] as List<dynamic>).map((scene) {
+      final nodes = (scene['nodes'] as List<dynamic>).map((shared) {
+        final node = Map<String, dynamic>.from(shared as Map<String, dynamic>);
+        final local = nodeStrings[node['id']];
+        if (local is String) {
+          node['text'] = local;
+        } else if (local is Map<String, dynamic>) {
+          local.forEach((key, value) {
+            if (key == 'choices') {
+              final texts = value as List<dynamic>;
+              node['choices'] = [
+                for (var i = 0; i < texts.length; i++)
+                  {...(node['choices'] as List<dynamic>)[i] as Map<String, dynamic>, 'text': texts[i]},
+              ];
+            } else {
+              node[key] = value;
+            }
+          });
+        }
+        return node;
+      }).toList();
+
+      return {
+        'id': scene['id'],
+        'title': scene['title'] ?? sceneTitles[scene['id']] ?? 'Scene',
+        'nodes': nodes,
+      };
+    }).toList();
 
-      return episodeData;
+    return {
+      'episodeId': structure['episodeId'],
+      'title': strings['title'],
+      'description': strings['description'],
+      'language': strings['language'],
+      'scenes': scenes,
+    };
+  }
+
+  /// Load from the built bundle, or the legacy per-language JSON file
+  Future<Map<String, dynamic>> _loadBundle(String episodeId, String language) async {
+    final manifest = await _loadManifest();
+    final entry = manifest[episodeId] as Map<String, dynamic>?;
+    final languageEntry = (entry?['languages'] as Map<String, dynamic>?)?[language];
+    if (entry == null || languageEntry == null) {
+      return _loadJson('assets/episodes/${episodeId}_$language.json');
+    }
+
+    final structureFile = (languageEntry['structure'] ?? entry['structure'])['file'] as String;
+    final structure = await _cached(_structures, structureFile, () => _loadJson('$_distPath/$structureFile'));
+    final strings = await _loadJson('$_distPath/${languageEntry['file']}');
+    return _join(structure, strings);
+  }
+
+  /// Share one in-flight load per key, but forget it if it fails
+  Future<Map<String, dynamic>> _cached(
+    Map<String, Future<Map<String, dynamic>>> cache,
+    String key,
+    Future<Map<String, dynamic>> Function() load,
+  ) {
+    return cache.putIfAbsent(key, () {
+      final future = load();
+      future.catchError((Object _) {
+        cache.remove(key);
+        return <String, dynamic>{};
+      });
+      return future;
+    });
+  }
+
+  /// Drop cached episodes (e.g. when switching language to free memory)
+  void clearCache() {
+    _cache.clear();
+    _structures.clear();
+  }
+
+  /// Load episode data for a specific episode and language
+  Future<Map<String, dynamic>> loadEpisode(String episodeId, String language) async {
+    try {
+      return await _cached(_cache, '${episodeId}_$language', () => _loadBundle(episodeId, language));
     } catch (e) {
       print('Error loading episode $episodeId ($language): $e');
 
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Episode bundle builder for Kastor Data Academy.
+
+Discovers every Episode*_*.md script, parses it with EpisodeParser and writes
+schema-validated, minified JSON bundles with a manifest the app uses to load
+episodes lazily by id. Precompressed .gz (and, when the brotli package is
+installed, .br) copies for static hosting go to dist/episodes/, outside the
+asset folders, so they are not bundled into the app next to the JSON.
+
+Each episode is split into one shared structure file (scenes, node ids/types,
+links, choice graph and any field that is identical in every language) and a
+compact string table per language keyed by node id. The app joins the two at
+load time, so an extra language only costs its text. With --allow-mismatch, a
+language whose structure differs gets its own structure file instead (never a
+join against another language's node ids and links).
+
+Only scripts whose content hash changed (or whose parser/schema changed) are
+rebuilt; everything else is reused from the previous manifest. Changed scripts
+are parsed in a process pool, every language of an episode is cross-checked
+for identical structure (scenes, node ids/types, links, choices), and only then
+are all bundles written.
+
+Usage:
+    python tools/build_episodes.py                 # incremental build
+    python tools/build_episodes.py --force         # rebuild everything
+    python tools/build_episodes.py --jobs 1        # parse serially
+    python tools/build_episodes.py --source DIR    # also scan another folder
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from md_to_json_parser import EpisodeParseError, EpisodeParser
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TOOLS_DIR = Path(__file__).parent
+BASE_PATH = TOOLS_DIR.parent
+REPO_ROOT = BASE_PATH.parent
+SOURCE_DIR = BASE_PATH / 'assets' / 'episodes'
+# Episode 2/3 scripts live at the repository root
+DEFAULT_SOURCES = [SOURCE_DIR, REPO_ROOT]
+DIST_DIR = SOURCE_DIR / 'dist'
+# Not listed in pubspec.yaml assets: compressed copies would double the bundle
+COMPRESSED_DIR = BASE_PATH / 'dist' / 'episodes'
+MANIFEST_NAME = 'manifest.json'
+SCHEMA_PATH = TOOLS_DIR / 'episode.schema.json'
+
+# Episode1_Korean_Improved.md, Episode_2_English_Interactive.md, ...
+SCRIPT_PATTERN = re.compile(r'^Episode_?(\d+)_([A-Za-z]+)')
+LANGUAGE_CODES = {'korean': 'ko', 'english': 'en'}
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def toolchain_hash() -> str:
+    """Hash of everything that affects output besides the script itself."""
+    digest = hashlib.sha256()
+    for path in (TOOLS_DIR / 'md_to_json_parser.py', SCHEMA_PATH, Path(__file__)):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def discover_scripts(source_dirs: List[Path]) -> Dict[Tuple[str, str], Path]:
+    """Find Episode*_*.md scripts → {(episode_id, language): path}."""
+    scripts = {}
+    for source_dir in source_dirs:
+        for path in sorted(source_dir.glob('Episode*_*.md')):
+            match = SCRIPT_PATTERN.match(path.name)
+            if not match:
+                continue
+            episode_id = f"episode{int(match.group(1))}"
+            language = LANGUAGE_CODES.get(match.group(2).lower(), match.group(2).lower()[:2])
+            key = (episode_id, language)
+            if key in scripts and scripts[key].read_bytes() != path.read_bytes():
+                raise SystemExit(f"✗ Conflicting scripts for {episode_id}/{language}: {scripts[key]} and {path}")
+            scripts.setdefault(key, path)
+    return scripts
+
+
+def load_validator():
+    """JSON schema validator (None when jsonschema is not installed)."""
+    try:
+        import jsonschema
+    except ImportError:
+        print("⚠️  jsonschema not installed - skipping schema validation (pip install jsonschema)")
+        return None
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    return jsonschema.Draft202012Validator(schema)
+
+
+def validate(validator, episode: Dict[str, Any], source: Path) -> None:
+    """Raise SystemExit listing every schema violation."""
+    if validator is None:
+        return
+    errors = sorted(validator.iter_errors(episode), key=lambda error: list(error.absolute_path))
+    if errors:
+        lines = [f"  - /{'/'.join(map(str, error.absolute_path))}: {error.message}" for error in errors[:20]]
+        raise SystemExit(f"✗ {source.name} failed schema validation:\n" + "\n".join(lines))
+
+
+_worker_validator = None
+
+
+def parse_script(task: Tuple[str, str, str, bool]) -> Tuple[Dict[str, Any], List[str]]:
+    """Parse (and validate) one script; runs inside the process pool."""
+    global _worker_validator
+    episode_id, language, source, check_schema = task
+    source = Path(source)
+    if check_schema and _worker_validator is None:
+        _worker_validator = load_validator()
+
+    parser = EpisodeParser()
+    try:
+        episode = parser.parse_markdown(source.read_text(encoding='utf-8'), episode_id, language,
+                                        source=source.name)
+    except EpisodeParseError as e:
+        raise SystemExit(f"✗ {e}")
+    if check_schema:
+        validate(_worker_validator, episode, source)
+    return episode, parser.warnings
+
+
+def parse_all(tasks: List[Tuple[str, str, str, bool]], jobs: int) -> List[Tuple[Dict[str, Any], List[str]]]:
+    """Parse scripts in a process pool (serially for one job or one script)."""
+    if jobs <= 1 or len(tasks) <= 1:
+        return [parse_script(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(parse_script, tasks))
+
+
+def structure_of(episode: Dict[str, Any]) -> List[Tuple]:
+    """Language-independent shape of an episode (everything but the text)."""
+    shape = []
+    for scene in episode['scenes']:
+        for node in scene['nodes']:
+            choices = tuple((choice['id'], choice['nextSceneId']) for choice in node.get('choices', []))
+            shape.append((scene['id'], node['id'], node['type'], node.get('nextNodeId'), choices))
+    return shape
+
+
+def cross_check(episodes: Dict[Tuple[str, str], Dict[str, Any]]) -> List[str]:
+    """Compare every language of an episode against the first; return mismatches."""
+    by_episode: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (episode_id, language), episode in episodes.items():
+        by_episode.setdefault(episode_id, {})[language] = episode
+
+    problems = []
+    for episode_id, languages in sorted(by_episode.items()):
+        reference_language, *others = sorted(languages)
+        reference = structure_of(languages[reference_language])
+        for language in others:
+            shape = structure_of(languages[language])
+            for index, (expected, actual) in enumerate(zip(reference, shape)):
+                if expected != actual:
+                    problems.append(
+                        f"{episode_id}: {language} differs from {reference_language} at node #{index + 1}: "
+                        f"{actual[:4]} vs {expected[:4]}"
+                    )
+                    break
+            else:
+                if len(reference) != len(shape):
+                    problems.append(
+                        f"{episode_id}: {language} has {len(shape)} nodes, {reference_language} has {len(reference)}"
+                    )
+    return problems
+
+
+def write_bundle(data: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Write minified JSON + compressed variants, return manifest entry."""
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    content_hash = sha256_bytes(raw)
+
+    (DIST_DIR / f"{name}.json").write_bytes(raw)
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    (COMPRESSED_DIR / f"{name}.json.gz").write_bytes(gz)
+    entry = {
+        'file': f"{name}.json",
+        'sha256': content_hash,
+        'bytes': len(raw),
+        'gzipBytes': len(gz),
+    }
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        (COMPRESSED_DIR / f"{name}.json.br").write_bytes(br)
+        entry['brotliBytes'] = len(br)
+    return entry
+
+
+def write_structure(structure: Dict[str, Any], name: str) -> Dict[str, Any]:
+    entry = write_bundle(structure, name)
+    print(f"✓ {name}: {entry['bytes']:,} bytes (gzip {entry['gzipBytes']:,})")
+    return entry
+
+
+# Node fields that are always structural; everything else is shared only when
+# every language has the same value, and goes to the string tables otherwise.
+STRUCTURE_KEYS = ('id', 'type', 'nextNodeId')
+NODE_KEY_ORDER = ('id', 'type', 'speaker', 'text', 'data', 'nextNodeId', 'choices')
+
+
+def split_episode(languages: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Split same-structure language versions → (structure, {language: strings})."""
+    reference = languages[min(languages)]
+    structure: Dict[str, Any] = {'episodeId': reference['episodeId'], 'scenes': []}
+    strings = {
+        language: {
+            'episodeId': episode['episodeId'],
+            'language': language,
+            'title': episode['title'],
+            'description': episode['description'],
+            'scenes': {},
+            'nodes': {},
+        }
+        for language, episode in languages.items()
+    }
+    versions = list(languages.items())
+
+    for scene_index, scene in enumerate(reference['scenes']):
+        scenes = {language: episode['scenes'][scene_index] for language, episode in versions}
+        shared_scene: Dict[str, Any] = {'id': scene['id'], 'nodes': []}
+        if len({s['title'] for s in scenes.values()}) == 1:
+            shared_scene['title'] = scene['title']
+        else:
+            for language, localized in scenes.items():
+                strings[language]['scenes'][scene['id']] = localized['title']
+
+        for node_index, node in enumerate(scene['nodes']):
+            nodes = {language: localized['nodes'][node_index] for language, localized in scenes.items()}
+            shared = {key: node[key] for key in STRUCTURE_KEYS if key in node}
+            local: Dict[str, Dict[str, Any]] = {language: {} for language in nodes}
+
+            for key in node:
+                if key in STRUCTURE_KEYS or key == 'choices':
+                    continue
+                values = [localized.get(key) for localized in nodes.values()]
+                if all(value == values[0] for value in values):
+                    shared[key] = node[key]
+                else:
+                    for language, localized in nodes.items():
+                        local[language][key] = localized.get(key)
+
+            if 'choices' in node:
+                shared['choices'] = [
+                    {'id': choice['id'], 'nextSceneId': choice['nextSceneId']} for choice in node['choices']
+                ]
+                texts = {language: [c['text'] for c in localized['choices']] for language, localized in nodes.items()}
+                if len({tuple(t) for t in texts.values()}) == 1:
+                    for choice, text in zip(shared['choices'], node['choices']):
+                        choice['text'] = text['text']
+                else:
+                    for language in nodes:
+                        local[language]['choices'] = texts[language]
+
+            shared_scene['nodes'].append(shared)
+            for language, fields in local.items():
+                if fields:
+                    # Plain text is by far the common case → store the bare string
+                    strings[language]['nodes'][node['id']] = fields['text'] if list(fields) == ['text'] else fields
+
+        structure['scenes'].append(shared_scene)
+
+    return structure, strings
+
+
+def join_episode(structure: Dict[str, Any], strings: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of split_episode: structure + one language's strings → episode."""
+    scene_titles = strings.get('scenes', {})
+    node_strings = strings.get('nodes', {})
+    scenes = []
+    for scene in structure['scenes']:
+        nodes = []
+        for shared in scene['nodes']:
+            node = dict(shared)
+            local = node_strings.get(node['id'])
+            if isinstance(local, str):
+                node['text'] = local
+            elif local:
+                for key, value in local.items():
+                    if key == 'choices':
+                        node['choices'] = [dict(choice, text=text) for choice, text in zip(node['choices'], value)]
+                    else:
+                        node[key] = value
+            nodes.append({key: node[key] for key in NODE_KEY_ORDER if key in node})
+        scenes.append({
+            'id': scene['id'],
+            'title': scene.get('title', scene_titles.get(scene['id'], 'Scene')),
+            'nodes': nodes,
+        })
+    return {
+        'episodeId': structure['episodeId'],
+        'title': strings['title'],
+        'description': strings['description'],
+        'language': strings['language'],
+        'scenes': scenes,
+    }
+
+
+def load_manifest() -> Dict[str, Any]:
+    path = DIST_DIR / MANIFEST_NAME
+    if not path.exists():
+        return {'episodes': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_dist(entry: Dict[str, Any]) -> Dict[str, Any]:
+    with open(DIST_DIR / entry['file'], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build(source_dirs: List[Path], force: bool = False, check_schema: bool = True,
+          jobs: int = 1, strict: bool = True) -> Dict[str, Any]:
+    """Incrementally build all discovered episode scripts."""
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    COMPRESSED_DIR.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest()
+    toolchain = toolchain_hash()
+    scripts = discover_scripts(source_dirs)
+    reuse = not force and previous.get('toolchain') == toolchain
+
+    sources: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    episodes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    tasks = []
+    for (episode_id, language), source in sorted(scripts.items()):
+        source_hash = sha256_bytes(source.read_bytes())
+        sources[(episode_id, language)] = {'source': source.name, 'sourceHash': source_hash}
+        old_episode = previous.get('episodes', {}).get(episode_id, {})
+        old_entry = old_episode.get('languages', {}).get(language)
+        old_structure = old_entry and (old_entry.get('structure') or old_episode.get('structure'))
+        up_to_date = (
+            reuse
+            and old_entry is not None
+            and old_entry.get('sourceHash') == source_hash
+            and (DIST_DIR / old_entry['file']).exists()
+            and old_structure is not None
+            and (DIST_DIR / old_structure['file']).exists()
+        )
+        if up_to_date:
+            episodes[(episode_id, language)] = join_episode(load_dist(old_structure), load_dist(old_entry))
+            print(f"· {episode_id}_{language} unchanged")
+        else:
+            tasks.append((episode_id, language, str(source), check_schema))
+
+    for task, (episode, warnings) in zip(tasks, parse_all(tasks, jobs)):
+        episodes[task[:2]] = episode
+        for warning in warnings:
+            print(f"⚠️  {warning}")
+
+    problems = cross_check(episodes)
+    for problem in problems:
+        print(f"{'✗' if strict else '⚠️ '} {problem}")
+    if problems and strict:
+        raise SystemExit("✗ Language bundles do not share the same structure (use --allow-mismatch to build anyway)")
+
+    by_episode: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (episode_id, language), episode in episodes.items():
+        by_episode.setdefault(episode_id, {})[language] = episode
+    changed = {task[0] for task in tasks}
+
+    # Write everything only after all scripts parsed and cross-checked.
+    # A changed language can change what is shared, so the whole episode is re-split.
+    manifest: Dict[str, Any] = {'toolchain': toolchain, 'episodes': {}}
+    for episode_id, languages in sorted(by_episode.items()):
+        if episode_id not in changed:
+            manifest['episodes'][episode_id] = previous['episodes'][episode_id]
+            continue
+        entry: Dict[str, Any] = {'languages': {}}
+        if len({tuple(structure_of(episode)) for episode in languages.values()}) == 1:
+            structure, strings = split_episode(languages)
+            entry['structure'] = write_structure(structure, f"{episode_id}.structure")
+        else:
+            # Only reachable with --allow-mismatch: node ids / links differ, so a shared
+            # structure would join one language's text onto another's graph
+            strings = {}
+            for language, episode in languages.items():
+                structure, localized = split_episode({language: episode})
+                strings[language] = localized[language]
+                entry['languages'][language] = {
+                    'structure': write_structure(structure, f"{episode_id}_{language}.structure")
+                }
+        for language in sorted(languages):
+            name = f"{episode_id}_{language}.strings"
+            language_entry = entry['languages'].get(language, {})
+            language_entry.update(write_bundle(strings[language], name))
+            language_entry.update(sources[(episode_id, language)])
+            language_entry['title'] = languages[language]['title']
+            entry['languages'][language] = language_entry
+            print(f"✓ {name}: {language_entry['bytes']:,} bytes (gzip {language_entry['gzipBytes']:,})")
+        manifest['episodes'][episode_id] = entry
+
+    with open(DIST_DIR / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    print(f"\n✓ {len(scripts)} scripts, {len(tasks)} rebuilt → {DIST_DIR.relative_to(BASE_PATH)}/{MANIFEST_NAME}")
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build episode JSON bundles from markdown scripts.")
+    parser.add_argument('--source', action='append', type=Path, default=[],
+                        help="extra folder to scan for Episode*_*.md (repeatable)")
+    parser.add_argument('--force', action='store_true', help="rebuild even if nothing changed")
+    parser.add_argument('--no-validate', action='store_true', help="skip JSON schema validation")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="parallel parser processes (default: CPU count)")
+    parser.add_argument('--allow-mismatch', action='store_true',
+                        help="warn instead of failing when languages differ in structure "
+                             "(those languages get their own structure file)")
+    args = parser.parse_args(argv)
+
+    check_schema = not args.no_validate and load_validator() is not None
+    build(DEFAULT_SOURCES + args.source, force=args.force, check_schema=check_schema,
+          jobs=args.jobs, strict=not args.allow_mismatch)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,31 +2,103 @@
 """
 Markdown to JSON parser for Kastor Data Academy episodes.
 Converts improved markdown episodes to JSON format for Flutter app.
+
+Parsing is a single pass: every line is classified once by a compiled regex
+table (tokenize), then a small state machine (body / email / choices / code
+fence) consumes exactly the lines that belong to each block. Errors carry the
+source line number.
 """
 
-import json
 import re
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class EpisodeParseError(ValueError):
+    """Malformed episode markdown (message includes the source line)."""
+
+    def __init__(self, message: str, line_no: int, source: Optional[str] = None):
+        self.line_no = line_no
+        self.source = source
+        location = f"{source}:{line_no}" if source else f"line {line_no}"
+        super().__init__(f"{location}: {message}")
+
+
+class Token(NamedTuple):
+    kind: str
+    line_no: int
+    match: Optional[re.Match]
+    text: str
+
+
+# Ordered: the first pattern that matches a (stripped) line decides its kind.
+TOKEN_TABLE: List[Tuple[str, re.Pattern]] = [
+    ('FENCE', re.compile(r'^```')),
+    ('SCENE', re.compile(r'^##\s+(?:🎮\s+)?Scene\b')),
+    ('EMAIL_HEADER', re.compile(r'^###\s*📧')),
+    ('CHOICE_HEADER', re.compile(r'^###\s*🔍\s*(?:인터랙티브|Interactive)')),
+    ('HEADING', re.compile(r'^#{1,6}\s')),
+    ('RULE', re.compile(r'^-{3,}$')),
+    ('EMAIL_FIELD', re.compile(r'^\*\*(발신|보낸 사람|From|제목|Subject)\*\*\s*:\s*(.*)$', re.IGNORECASE)),
+    ('CHOICE_OPTION', re.compile(r'^\*\*([A-C])\)\s*(.+?)\*\*')),
+    ('ARROW', re.compile(r'^→\s*(.*)$')),
+    ('QUOTE', re.compile(r'^>\s*(.*)$')),
+    ('INPUT', re.compile(r'^\[(?:입력|INPUT):\s*(.*?)\]?$')),
+    ('NARRATION', re.compile(r'^\[(.*)\]$')),
+    ('DIALOGUE', re.compile(r'^\*\*(.+?)\*\*:\s*(.+)$')),
+    ('BLANK', re.compile(r'^$')),
+]
+
+EMAIL_FIELDS = {'발신': 'from', '보낸 사람': 'from', 'from': 'from', '제목': 'subject', 'subject': 'subject'}
+
+SPEAKER_MAP = {
+    '탐정': 'detective',
+    'Detective': 'detective',
+    'DETECTIVE': 'detective',
+    '카스터': 'kastor',
+    '캐스터': 'kastor',
+    'Kastor': 'kastor',
+    'KASTOR': 'kastor',
+    'Narrator': 'narrator',
+}
+
+TITLE_PREFIX = re.compile(r'^(?:에피소드|Episode)\s*\d+\s*:\s*')
+
+
+def tokenize(md_content: str) -> Iterator[Token]:
+    """Classify each line once (line numbers are 1-based)."""
+    for line_no, raw in enumerate(md_content.split('\n'), start=1):
+        line = raw.strip()
+        for kind, pattern in TOKEN_TABLE:
+            match = pattern.match(line)
+            if match:
+                yield Token(kind, line_no, match, line)
+                break
+        else:
+            yield Token('TEXT', line_no, None, line)
 
 
 class EpisodeParser:
     def __init__(self):
-        self.nodes = []
         self.scenes = []
-        self.current_scene = None
+        self.warnings: List[str] = []
         self.node_counter = 1
+        self.source: Optional[str] = None
+
+        self._scene_id: Optional[str] = None
+        self._scene_title: Optional[str] = None
+        self._scene_nodes: List[Dict[str, Any]] = []
 
-    def parse_markdown(self, md_content: str, episode_id: str, language: str) -> Dict[str, Any]:
+    def parse_markdown(self, md_content: str, episode_id: str, language: str,
+                       source: Optional[str] = None) -> Dict[str, Any]:
         """Parse markdown content into JSON structure."""
-        lines = md_content.split('\n')
+        self.source = source
+        tokens = list(tokenize(md_content))
 
-        # Extract title
-        title = self._extract_title(lines)
-        description = f"Episode 1 - Missing Balance Patch ({'한국어' if language == 'ko' else 'English'} version)"
+        title = self._extract_title(tokens)
+        episode_no = re.sub(r'\D', '', episode_id) or '1'
+        description = f"Episode {episode_no} - {title} ({'한국어' if language == 'ko' else 'English'} version)"
 
-        # Parse scenes and dialogues
-        self._parse_content(lines)
+        self._parse_content(tokens)
 
         return {
             "episodeId": episode_id,
@@ -36,110 +108,166 @@ class EpisodeParser:
             "scenes": self.scenes
         }
 
-    def _extract_title(self, lines: List[str]) -> str:
+    def _extract_title(self, tokens: List[Token]) -> str:
         """Extract episode title from first heading."""
-        for line in lines[:10]:
-            if line.startswith('# '):
-                return line.replace('# ', '').replace('에피소드 1: ', '').replace('Episode 1: ', '').strip()
+        for token in tokens[:10]:
+            if token.text.startswith('# '):
+                return TITLE_PREFIX.sub('', token.text[2:].strip()).strip()
         return "The Missing Balance Patch"
 
-    def _parse_content(self, lines: List[str]):
-        """Parse markdown content into scenes and nodes."""
-        i = 0
-        current_scene_nodes = []
-        current_scene_id = None
-        current_scene_title = None
-
-        while i < len(lines):
-            line = lines[i].strip()
-
-            # Detect scene headers
-            if line.startswith('## Scene') or line.startswith('## 🎮 Scene'):
-                # Save previous scene if exists
-                if current_scene_id and current_scene_nodes:
-                    self.scenes.append({
-                        "id": current_scene_id,
-                        "title": current_scene_title or "Scene",
-                        "nodes": current_scene_nodes
-                    })
-                    current_scene_nodes = []
-
-                # Extract scene info
-                scene_match = re.search(r'Scene (\d+)', line)
-                if scene_match:
-                    scene_num = scene_match.group(1)
-                    current_scene_id = f"scene_{scene_num}"
-                    current_scene_title = line.split('—')[-1].strip() if '—' in line else f"Scene {scene_num}"
-                else:
-                    current_scene_id = f"scene_{len(self.scenes)}"
-                    current_scene_title = "Scene"
-
-            # Parse dialogue lines
-            elif line.startswith('**') and '**:' in line:
-                speaker, text = self._parse_dialogue(line)
-                if speaker and text:
-                    node = self._create_dialogue_node(speaker, text)
-                    current_scene_nodes.append(node)
-
-            # Parse narration (text in brackets)
-            elif line.startswith('[') and line.endswith(']'):
-                text = line[1:-1].strip()
-                node = self._create_narration_node(text)
-                current_scene_nodes.append(node)
-
-            # Parse email sections
-            elif '### 📧' in line or line.startswith('**발신**') or line.startswith('**제목**'):
-                email_data = self._parse_email(lines, i)
-                if email_data:
-                    node = self._create_email_node(email_data)
-                    current_scene_nodes.append(node)
-                    i += 10  # Skip email lines
-
-            # Parse choices
-            elif '### 🔍 인터랙티브' in line or '### 🔍 Interactive' in line:
-                choices_data = self._parse_choices(lines, i)
-                if choices_data:
-                    node = self._create_choice_node(choices_data)
-                    current_scene_nodes.append(node)
-                    i += 15  # Skip choice lines
-
-            # Parse input prompts
-            elif '[입력:' in line or '[INPUT:' in line:
-                input_prompt = line.replace('[입력:', '').replace('[INPUT:', '').replace(']', '').strip()
-                node = self._create_input_node(input_prompt)
-                current_scene_nodes.append(node)
-
-            i += 1
-
-        # Save last scene
-        if current_scene_id and current_scene_nodes:
+    def _error(self, message: str, line_no: int) -> EpisodeParseError:
+        return EpisodeParseError(message, line_no, self.source)
+
+    def _warn(self, message: str, line_no: int) -> None:
+        location = f"{self.source}:{line_no}" if self.source else f"line {line_no}"
+        self.warnings.append(f"{location}: {message}")
+
+    # ------------------------------------------------------------------
+    # State machine
+    # ------------------------------------------------------------------
+
+    def _parse_content(self, tokens: List[Token]):
+        """Single pass over the tokens; each block consumes exactly its lines."""
+        state = 'body'
+        block: Dict[str, Any] = {}
+
+        for token in tokens:
+            # A block ends at the first token it cannot consume; that token is
+            # then handled by the body state (no lookahead, no rescanning).
+            if state == 'fence':
+                if token.kind == 'FENCE':
+                    state = 'body'
+                continue
+
+            if state == 'email':
+                if self._consume_email(block, token):
+                    continue
+                self._finish_email(block)
+                state = 'body'
+
+            elif state == 'choices':
+                if self._consume_choice(block, token):
+                    continue
+                self._finish_choices(block)
+                state = 'body'
+
+            state, block = self._dispatch_body(token)
+
+        if state == 'fence':
+            raise self._error("unterminated code fence", block['line_no'])
+        if state == 'email':
+            self._finish_email(block)
+        elif state == 'choices':
+            self._finish_choices(block)
+        self._close_scene()
+
+    def _dispatch_body(self, token: Token) -> Tuple[str, Dict[str, Any]]:
+        """Handle a token outside any block; returns the next state."""
+        kind, match = token.kind, token.match
+
+        if kind == 'FENCE':
+            return 'fence', {'line_no': token.line_no}
+
+        if kind == 'SCENE':
+            self._close_scene()
+            scene_match = re.search(r'Scene (\d+)', token.text)
+            if scene_match:
+                scene_num = scene_match.group(1)
+                self._scene_id = f"scene_{scene_num}"
+                self._scene_title = token.text.split('—')[-1].strip() if '—' in token.text else f"Scene {scene_num}"
+            else:
+                self._scene_id = f"scene_{len(self.scenes)}"
+                self._scene_title = "Scene"
+
+        elif kind == 'EMAIL_HEADER':
+            return 'email', {'line_no': token.line_no, 'data': {}}
+
+        elif kind == 'EMAIL_FIELD':
+            block = {'line_no': token.line_no, 'data': {}}
+            self._consume_email(block, token)
+            return 'email', block
+
+        elif kind == 'CHOICE_HEADER':
+            return 'choices', {'line_no': token.line_no, 'choices': []}
+
+        elif kind == 'DIALOGUE':
+            speaker, text = self._parse_dialogue(match)
+            if speaker and text:
+                self._add_node(self._create_dialogue_node(speaker, text))
+
+        elif kind == 'INPUT':
+            self._add_node(self._create_input_node(match.group(1).strip()))
+
+        elif kind == 'NARRATION':
+            self._add_node(self._create_narration_node(match.group(1).strip()))
+
+        return 'body', {}
+
+    def _consume_email(self, block: Dict[str, Any], token: Token) -> bool:
+        """Email block: From/Subject fields, quoted body lines and blanks."""
+        data = block['data']
+        if token.kind == 'EMAIL_FIELD':
+            data[EMAIL_FIELDS[token.match.group(1).lower()]] = token.match.group(2).strip()
+            return True
+        if token.kind == 'QUOTE':
+            data['body'] = data.get('body', '') + token.match.group(1).strip() + '\n'
+            return True
+        return token.kind == 'BLANK'
+
+    def _finish_email(self, block: Dict[str, Any]) -> None:
+        if not block['data']:
+            raise self._error("email block has no sender, subject or body", block['line_no'])
+        self._add_node(self._create_email_node(block['data']))
+
+    def _consume_choice(self, block: Dict[str, Any], token: Token) -> bool:
+        """Choice block: prompt dialogue, A)-C) options with → descriptions."""
+        choices = block['choices']
+        if token.kind == 'CHOICE_OPTION':
+            choice_id = token.match.group(1).lower()
+            choices.append({
+                "id": f"choice_{choice_id}",
+                "text": token.match.group(2).strip(),
+                "nextSceneId": f"choice_result_{choice_id}"
+            })
+            return True
+        if token.kind == 'ARROW':
+            if not choices:
+                raise self._error("'→' description before any choice option", token.line_no)
+            choices[-1]['text'] += f" - {token.match.group(1).strip()}"
+            return True
+        if token.kind == 'DIALOGUE' and not choices:
+            # Kastor's prompt line introducing the options
+            self._dispatch_body(token)
+            return True
+        return token.kind == 'BLANK'
+
+    def _finish_choices(self, block: Dict[str, Any]) -> None:
+        if not block['choices']:
+            self._warn("interactive choice has no 'A)' style options; skipped", block['line_no'])
+            return
+        self._add_node(self._create_choice_node(block['choices']))
+
+    def _add_node(self, node: Dict[str, Any]) -> None:
+        self._scene_nodes.append(node)
+
+    def _close_scene(self) -> None:
+        """Save the current scene if it has any nodes (preamble nodes carry over)."""
+        if self._scene_id and self._scene_nodes:
             self.scenes.append({
-                "id": current_scene_id,
-                "title": current_scene_title or "Scene",
-                "nodes": current_scene_nodes
+                "id": self._scene_id,
+                "title": self._scene_title or "Scene",
+                "nodes": self._scene_nodes
             })
+            self._scene_nodes = []
+
+    def _parse_dialogue(self, match: re.Match) -> tuple:
+        """Parse dialogue match into speaker and text."""
+        speaker = match.group(1).strip()
+        text = match.group(2).strip().strip('"')
 
-    def _parse_dialogue(self, line: str) -> tuple:
-        """Parse dialogue line into speaker and text."""
-        match = re.match(r'\*\*(.+?)\*\*:\s*(.+)', line)
-        if match:
-            speaker = match.group(1).strip()
-            text = match.group(2).strip().strip('"')
-
-            # Normalize speaker names
-            speaker_map = {
-                '탐정': 'detective',
-                'Detective': 'detective',
-                'DETECTIVE': 'detective',
-                '카스터': 'kastor',
-                'Kastor': 'kastor',
-                'KASTOR': 'kastor',
-                'Narrator': 'narrator',
-            }
-
-            speaker = speaker_map.get(speaker, speaker.lower())
-            return speaker, text
-        return None, None
+        # Normalize speaker names
+        speaker = SPEAKER_MAP.get(speaker, speaker.lower())
+        return speaker, text
 
     def _create_dialogue_node(self, speaker: str, text: str) -> Dict[str, Any]:
         """Create a dialogue node."""
@@ -208,97 +336,11 @@ class EpisodeParser:
             "nextNodeId": next_node_id
         }
 
-    def _parse_email(self, lines: List[str], start_idx: int) -> Optional[Dict[str, str]]:
-        """Parse email data from markdown."""
-        email_data = {}
-        i = start_idx
-
-        while i < len(lines) and i < start_idx + 15:
-            line = lines[i].strip()
-
-            if '**발신**' in line or '**From**' in line:
-                email_data['from'] = line.split(':', 1)[-1].strip()
-            elif '**제목**' in line or '**Subject**' in line:
-                email_data['subject'] = line.split(':', 1)[-1].strip()
-            elif line.startswith('>'):
-                body = email_data.get('body', '')
-                body += line[1:].strip() + '\n'
-                email_data['body'] = body
-
-            i += 1
-
-        return email_data if email_data else None
-
-    def _parse_choices(self, lines: List[str], start_idx: int) -> Optional[List[Dict[str, str]]]:
-        """Parse choice options from markdown."""
-        choices = []
-        i = start_idx + 1
-
-        while i < len(lines) and i < start_idx + 20:
-            line = lines[i].strip()
-
-            # Match choice patterns like **A) 공식 패치**
-            if line.startswith('**') and ')' in line:
-                choice_match = re.match(r'\*\*([A-C])\)\s*(.+?)\*\*', line)
-                if choice_match:
-                    choice_id = choice_match.group(1)
-                    choice_text = choice_match.group(2).strip()
-
-                    # Get description from next line if exists
-                    if i + 1 < len(lines) and '→' in lines[i + 1]:
-                        description = lines[i + 1].replace('→', '').strip()
-                        choice_text += f" - {description}"
-
-                    choices.append({
-                        "id": f"choice_{choice_id.lower()}",
-                        "text": choice_text,
-                        "nextSceneId": f"choice_result_{choice_id.lower()}"
-                    })
-
-            i += 1
-
-            if len(choices) >= 3:
-                break
-
-        return choices if choices else None
-
 
 def main():
-    """Main function to parse markdown files and generate JSON."""
-    base_path = Path(__file__).parent.parent
-    assets_path = base_path / 'assets' / 'episodes'
-
-    # Parse Korean version
-    korean_md = assets_path / 'Episode1_Korean_Improved.md'
-    if korean_md.exists():
-        print(f"Parsing {korean_md.name}...")
-        with open(korean_md, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        parser_ko = EpisodeParser()
-        json_data = parser_ko.parse_markdown(content, 'episode1', 'ko')
-
-        output_file = assets_path / 'episode1_ko.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        print(f"✓ Created {output_file.name}")
-
-    # Parse English version
-    english_md = assets_path / 'Episode1_English_Improved.md'
-    if english_md.exists():
-        print(f"Parsing {english_md.name}...")
-        with open(english_md, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        parser_en = EpisodeParser()
-        json_data = parser_en.parse_markdown(content, 'episode1', 'en')
-
-        output_file = assets_path / 'episode1_en.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        print(f"✓ Created {output_file.name}")
-
-    print("\n✓ All done! Episode JSON files created.")
+    """Build all episode bundles (see build_episodes.py)."""
+    from build_episodes import main as build_main
+    build_main()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+에피소드 진행 부하 테스트 (streamlit.testing.v1.AppTest)
+app.py를 브라우저 없이 실행해서 scene_0 → conclusion 전체 경로(미니게임 포함)를 자동으로 진행
+정답 경로에는 자유 채팅 스테이지가 없으므로, 스테이지마다 자유 채팅 모드로 잠시 들어가서
+--chat-turns번 질문 (LLM 호출 비용 / 처리량이 측정에 포함되도록)
+
+- Anthropic 클라이언트는 지연 시간을 설정할 수 있는 스텁으로 교체 (네트워크 / API 키 불필요)
+- 세션 저장소는 memory://, 타이핑 효과는 끔
+- 측정: rerun별 소요 시간 (스테이지별 p50 / p95), 세션당 메모리, N개 세션 처리량
+
+사용 예:
+    python load_test.py --sessions 20 --concurrency 4 --llm-latency 0.3 --chat-turns 2
+    python load_test.py --sessions 5 --json bench_result.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+class StubMessages:
+    """client.messages.create 대체 - 지연 후 고정 응답"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        threading.Event().wait(self.latency)
+        return SimpleNamespace(content=[SimpleNamespace(text="좋아, 탐정! 다음 단서를 찾아보자.")])
+
+
+class StubAnthropic:
+    """anthropic.Anthropic 대체 (모든 세션이 같은 스텁 공유)"""
+
+    messages = None
+
+    def __init__(self, api_key=None, **kwargs):
+        pass
+
+
+def install_stub_client(latency):
+    """app.py가 import하는 anthropic.Anthropic을 스텁으로 교체"""
+    import anthropic
+
+    StubAnthropic.messages = StubMessages(latency)
+    anthropic.Anthropic = StubAnthropic
+    return StubAnthropic.messages
+
+
+def percentile(values, q):
+    """q 분위수 (0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def plan_action(stage):
+    """스테이지 정의 → 진행 동작 (정답 경로: next가 있는 첫 선택지)"""
+    stage_type = stage.get("type", "free_chat")
+    if stage_type == "name_input":
+        return ("chat", "테스터야")
+    if stage_type == "quiz":
+        correct = next(option for option in stage["quiz"]["options"] if option.get("correct"))
+        return ("quiz", correct["key"], stage["choices"][0]["key"])
+    if stage_type == "log_filter":
+        radios = [
+            (spec["key"], next(option for option in spec["options"] if spec["answer"] in option))
+            for spec in stage["filters"]
+        ]
+        return ("log_filter", radios, stage["choices"][0]["key"])
+    if stage_type == "choice":
+        choice = next(choice for choice in stage["choices"] if choice.get("next"))
+        return ("click", choice["key"])
+    if stage_type == "free_chat":
+        return ("chat", CHAT_QUESTION)
+    return None
+
+
+CHAT_QUESTION = "다음 단서는 어디 있어?"
+
+
+def free_chat_stage(episode):
+    """자유 채팅 모드로 쓸 스테이지 (문맥은 있지만 스테이지 정의가 없는 id → free_chat 핸들러)"""
+    return next((stage_id for stage_id in episode.contexts if episode.stage(stage_id) is None), "free_chat")
+
+
+class EpisodeRunner:
+    """한 세션의 전체 에피소드 진행 + rerun 시간 기록"""
+
+    def __init__(self, episode, timeout, chat_turns=1):
+        from streamlit.testing.v1 import AppTest
+
+        self.episode = episode
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = []  # (스테이지, 초)
+        self.chat_turns = chat_turns
+        self.chat_stage = free_chat_stage(episode)
+        self.llm_turns = 0
+
+    def _timed_run(self, stage_id, step):
+        started = time.perf_counter()
+        step().run()
+        self.timings.append((stage_id, time.perf_counter() - started))
+        if self.at.exception:
+            raise RuntimeError(f"{stage_id}: {self.at.exception[0].message}")
+
+    def current_stage(self):
+        return self.at.session_state["game"].episode_stage
+
+    def _set_stage(self, stage_id):
+        self.at.session_state["game"].episode_stage = stage_id
+
+    def free_chat(self, stage_id):
+        """자유 채팅 모드로 들어가 chat_turns번 질문 후 원래 스테이지로 복귀 (모두 free_chat으로 기록)"""
+        at = self.at
+        self._set_stage(self.chat_stage)
+        self._timed_run("free_chat", lambda: at)
+        for _ in range(self.chat_turns):
+            self._timed_run("free_chat", lambda: at.chat_input[0].set_value(CHAT_QUESTION))
+            self.llm_turns += 1
+        self._set_stage(stage_id)
+        self._timed_run("free_chat", lambda: at)
+
+    def run(self, max_steps=100):
+        at = self.at
+        started = time.perf_counter()
+        at.run()
+        self.timings.append(("initial", time.perf_counter() - started))
+        if at.exception:
+            raise RuntimeError(f"initial: {at.exception[0].message}")
+
+        for _ in range(max_steps):
+            stage_id = self.current_stage()
+            stage = self.episode.stage(stage_id) or {"id": stage_id}
+            if stage.get("type") == "conclusion":
+                return
+            action = plan_action(stage)
+            if action is None:
+                raise RuntimeError(f"진행할 수 없는 스테이지: {stage_id}")
+            if self.chat_turns and stage.get("type") != "name_input":
+                self.free_chat(stage_id)
+
+            kind = action[0]
+            if kind == "click":
+                self._timed_run(stage_id, lambda: at.button(key=action[1]).click())
+            elif kind == "chat":
+                self._timed_run(stage_id, lambda: at.chat_input[0].set_value(action[1]))
+            elif kind == "quiz":
+                self._timed_run(stage_id, lambda: at.button(key=action[1]).click())
+                self._timed_run(stage_id, lambda: at.button(key=action[2]).click())
+            elif kind == "log_filter":
+                for key, option in action[1]:
+                    self._timed_run(stage_id, lambda: at.radio(key=key).set_value(option))
+                self._timed_run(stage_id, lambda: at.button(key=action[2]).click())
+        raise RuntimeError(f"{max_steps}단계 안에 결론에 도달하지 못함")
+
+
+def run_benchmark(sessions=10, concurrency=1, llm_latency=0.2, timeout=30, chat_turns=1):
+    """N개 세션 부하 테스트 → 결과 dict"""
+    os.chdir(ROOT)
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub-key")
+    os.environ["KASTOR_TYPING_EFFECT"] = "0"
+    os.environ["SESSION_STORE_URL"] = "memory://"
+    os.environ.setdefault("TRANSCRIPT_DIR", tempfile.mkdtemp(prefix="kastor_bench_"))
+
+    from episode_engine import load_episode
+
+    episode = load_episode("episode1", "ko")
+    stub = install_stub_client(llm_latency)
+
+    # 캐시 예열 (데이터 로드 / 차트 / 로그 인덱스는 프로세스당 한 번이므로 측정에서 제외)
+    EpisodeRunner(episode, timeout, chat_turns).run()
+    warmup_calls = stub.calls
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    runners = [EpisodeRunner(episode, timeout, chat_turns) for _ in range(sessions)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda runner: runner.run(), runners))
+    elapsed = time.perf_counter() - started
+
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    # 자유 채팅 질문마다 스텁 LLM이 한 번씩 불려야 함 (안 불리면 LLM 비용이 측정에서 빠진 것)
+    llm_calls = stub.calls - warmup_calls
+    expected_calls = sum(runner.llm_turns for runner in runners)
+    if llm_calls != expected_calls or (chat_turns and llm_calls == 0):
+        raise RuntimeError(f"LLM 호출 {llm_calls}회 (예상 {expected_calls}회)")
+
+    by_stage = {}
+    for runner in runners:
+        for stage_id, seconds in runner.timings:
+            by_stage.setdefault(stage_id, []).append(seconds)
+    all_runs = [seconds for values in by_stage.values() for seconds in values]
+
+    snapshot_sizes = [len(json.dumps(runner.at.session_state["game"].to_dict(), ensure_ascii=False)) for runner in runners]
+
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "llm_latency": llm_latency,
+        "chat_turns": chat_turns,
+        "llm_calls": llm_calls,
+        "elapsed_sec": elapsed,
+        "reruns": len(all_runs),
+        "reruns_per_sec": len(all_runs) / elapsed if elapsed else 0.0,
+        "sessions_per_min": sessions / elapsed * 60 if elapsed else 0.0,
+        "rerun_p50_ms": percentile(all_runs, 50) * 1000,
+        "rerun_p95_ms": percentile(all_runs, 95) * 1000,
+        "memory_per_session_kb": memory / sessions / 1024,
+        "snapshot_bytes_avg": statistics.mean(snapshot_sizes),
+        "stages": {
+            stage_id: {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+            }
+            for stage_id, values in by_stage.items()
+        },
+    }
+
+
+def print_report(result):
+    """결과 출력"""
+    print("\n" + "=" * 60)
+    print("📊 에피소드 부하 테스트 결과")
+    print("=" * 60)
+    print(f"세션 {result['sessions']}개 (동시 {result['concurrency']}), LLM 지연 {result['llm_latency']}초")
+    print(f"총 {result['reruns']:,}회 rerun / {result['elapsed_sec']:.1f}초")
+    print(f"처리량: {result['reruns_per_sec']:.1f} rerun/s, {result['sessions_per_min']:.1f} 세션/분")
+    print(f"rerun 시간: p50 {result['rerun_p50_ms']:.0f}ms, p95 {result['rerun_p95_ms']:.0f}ms")
+    print(f"세션당 메모리: {result['memory_per_session_kb']:,.0f} KB (스냅샷 {result['snapshot_bytes_avg']:,.0f} bytes)")
+    print(f"LLM 호출: {result['llm_calls']}회 (스테이지당 자유 채팅 {result['chat_turns']}번)")
+
+    print(f"\n{'스테이지':<28}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for stage_id, stats in result["stages"].items():
+        print(f"{stage_id:<28}{stats['count']:>6}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="에피소드 진행 부하 테스트 (AppTest + 스텁 LLM)")
+    parser.add_argument("--sessions", type=int, default=10, help="시뮬레이션할 세션 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 진행할 세션 수")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="스텁 LLM 응답 지연 (초)")
+    parser.add_argument("--chat-turns", type=int, default=1, help="스테이지마다 자유 채팅 질문 수 (LLM 호출)")
+    parser.add_argument("--timeout", type=float, default=30, help="rerun 타임아웃 (초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sessions, args.concurrency, args.llm_latency, args.timeout, args.chat_turns)
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+서버 로그 쿼리 엔진
+로그 필터링 미니게임 / 서버 로그 증거 패널용
+
+- 타입 스키마: 타임스탬프는 UTC datetime, 반복 값이 많은 컬럼은 category
+- 타임스탬프 기준 정렬 → 날짜 범위는 이진 탐색(searchsorted)
+- 사용자 / 작업 / 승인토큰별 행 위치 인덱스 (카테고리 코드 → 정렬된 위치 배열)
+- 수백만 줄 로그는 Parquet으로 저장해 두고 읽기 (duckdb가 설치되어 있으면 DuckDBLogQuery로 직접 질의)
+"""
+
+import numpy as np
+import pandas as pd
+
+# 서버 로그 스키마 (컬럼 → dtype)
+LOG_SCHEMA = {
+    "타임스탬프": "datetime64[ns, UTC]",
+    "사용자": "category",
+    "작업": "category",
+    "대상": "category",
+    "변경내용": "string",
+    "IP주소": "category",
+    "승인토큰": "category",
+    "비고": "string",
+}
+
+# 위치 인덱스를 만드는 컬럼
+INDEXED_COLUMNS = ["사용자", "작업", "승인토큰"]
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def apply_log_schema(df):
+    """로그 DataFrame을 스키마 타입으로 변환 (작업명은 대문자로 통일)"""
+    df = df.copy()
+    for column, dtype in LOG_SCHEMA.items():
+        if column not in df.columns:
+            df[column] = pd.Series(pd.NA, index=df.index)
+        if column == "타임스탬프":
+            df[column] = pd.to_datetime(df[column], utc=True)
+        elif column == "작업":
+            df[column] = df[column].astype("string").str.upper().astype("category")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df[list(LOG_SCHEMA)]
+
+
+class ServerLogIndex:
+    """정렬 + 인덱싱된 서버 로그 (읽기 전용)"""
+
+    def __init__(self, df):
+        df = apply_log_schema(df)
+        self.df = df.sort_values("타임스탬프", kind="stable").reset_index(drop=True)
+        self._timestamps = self.df["타임스탬프"].to_numpy(dtype="datetime64[ns]")
+        self._indexes = {column: self._build_index(self.df[column]) for column in INDEXED_COLUMNS}
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path))
+
+    @classmethod
+    def from_parquet(cls, path, columns=None):
+        return cls(pd.read_parquet(path, columns=columns))
+
+    def to_parquet(self, path):
+        """스키마가 적용된 로그를 Parquet으로 저장 (카테고리 타입 유지)"""
+        self.df.to_parquet(path, index=False)
+
+    def __len__(self):
+        return len(self.df)
+
+    @staticmethod
+    def _build_index(series):
+        """카테고리 값 → 해당 값이 나오는 행 위치 (시간순 정렬된 int 배열)"""
+        codes = series.cat.codes.to_numpy()
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(series.cat.categories) + 1))
+        return {
+            category: order[bounds[i]:bounds[i + 1]]
+            for i, category in enumerate(series.cat.categories)
+        }
+
+    def _lookup(self, column, match):
+        """match(카테고리 값)가 참인 카테고리들의 행 위치 합집합"""
+        index = self._indexes[column]
+        parts = [positions for category, positions in index.items() if match(str(category))]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def _date_range(self, date):
+        """해당 날짜(UTC)의 행 위치 범위 [lo, hi)"""
+        start = np.datetime64(pd.Timestamp(date).normalize().tz_localize(None), "ns")
+        end = start + np.timedelta64(1, "D")
+        lo = np.searchsorted(self._timestamps, start, side="left")
+        hi = np.searchsorted(self._timestamps, end, side="left")
+        return lo, hi
+
+    def query(self, date=None, user=None, action=None, token=None):
+        """
+        필터 조건(AND)에 맞는 행 위치 반환
+
+        Args:
+            date: 'YYYY-MM-DD' (UTC 기준 하루)
+            user: 사용자명 접두어 (예: 'admin01' → admin01_kaito)
+            action: 작업명 (대소문자 무시, 예: 'MODIFY')
+            token: 승인토큰 부분 문자열 (예: 'DBG')
+        """
+        positions = None
+
+        if user:
+            positions = self._lookup("사용자", lambda value: value.startswith(user))
+        if action:
+            action_positions = self._lookup("작업", lambda value: value == action.upper())
+            positions = action_positions if positions is None else np.intersect1d(positions, action_positions, assume_unique=True)
+        if token:
+            token_positions = self._lookup("승인토큰", lambda value: token in value)
+            positions = token_positions if positions is None else np.intersect1d(positions, token_positions, assume_unique=True)
+
+        if date:
+            lo, hi = self._date_range(date)
+            if positions is None:
+                positions = np.arange(lo, hi)
+            else:
+                positions = positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)]
+
+        if positions is None:
+            positions = np.arange(len(self.df))
+        return positions
+
+    def count(self, **filters):
+        """필터 결과 행 개수"""
+        return len(self.query(**filters))
+
+    def filter(self, **filters):
+        """필터 결과 DataFrame"""
+        return self.df.iloc[self.query(**filters)]
+
+    def page(self, page=1, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """필터 결과의 한 페이지 (page는 1부터)"""
+        positions = self.query(**filters)
+        start = (page - 1) * page_size
+        return self.df.iloc[positions[start:start + page_size]]
+
+
+class DuckDBLogQuery:
+    """Parquet 로그를 DuckDB로 직접 질의 (메모리에 전부 올리지 않음, duckdb 필요)"""
+
+    def __init__(self, parquet_path):
+        import duckdb
+
+        self.parquet_path = str(parquet_path)
+        self.con = duckdb.connect()
+
+    def _where(self, date=None, user=None, action=None, token=None):
+        clauses, params = [], []
+        if date:
+            clauses.append("CAST(타임스탬프 AS DATE) = CAST(? AS DATE)")
+            params.append(date)
+        if user:
+            clauses.append("starts_with(사용자, ?)")
+            params.append(user)
+        if action:
+            clauses.append("upper(작업) = ?")
+            params.append(action.upper())
+        if token:
+            clauses.append("contains(승인토큰, ?)")
+            params.append(token)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        sql = f"SELECT count(*) FROM read_parquet(?){where}"
+        return self.con.execute(sql, [self.parquet_path] + params).fetchone()[0]
+
+    def page(self, page=1, page_size=DEFAULT_PAGE_SIZE, **filters):
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM read_parquet(?){where} ORDER BY 타임스탬프 LIMIT ? OFFSET ?"
+        return self.con.execute(sql, [self.parquet_path] + params + [page_size, (page - 1) * page_size]).df()
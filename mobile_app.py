@@ -1,6 +1,6 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import os
+
+from ui_shell import render_shell
 
 # 페이지 설정
 st.set_page_config(
@@ -10,23 +10,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# HTML 파일 읽기
-def load_mobile_ui():
-    """모바일 UI HTML 파일 로드"""
-    html_path = os.path.join(os.path.dirname(__file__), 'mobile_ui.html')
-
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-
-    return html_content
-
 # 모바일 UI 렌더링
 def render_mobile_ui():
     """HTML UI를 Streamlit에서 렌더링"""
-    html_content = load_mobile_ui()
-
-    # 전체 화면으로 HTML 렌더링
-    components.html(html_content, height=900, scrolling=True)
+    # 전체 화면으로 HTML 렌더링 (UI_SHELL_URL이 있으면 iframe src)
+    render_shell('mobile', height=900, scrolling=True)
 
 # 메인 실행
 if __name__ == "__main__":
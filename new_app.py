@@ -1,6 +1,6 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import os
+
+from ui_shell import render_shell
 
 # 페이지 설정
 st.set_page_config(
@@ -38,17 +38,6 @@ if (isMobileDevice()) {
 </script>
 """
 
-# UI 로딩 함수
-def load_ui(ui_type='desktop'):
-    """모바일 또는 데스크톱 UI HTML 파일 로드"""
-    if ui_type == 'mobile':
-        html_path = os.path.join(os.path.dirname(__file__), 'mobile_ui.html')
-    else:
-        html_path = os.path.join(os.path.dirname(__file__), 'desktop_ui.html')
-
-    with open(html_path, 'r', encoding='utf-8') as f:
-        return f.read()
-
 # 디바이스 타입 선택 (개발 모드용)
 if 'device_type' not in st.session_state:
     st.session_state.device_type = 'desktop'
@@ -64,14 +53,11 @@ with col2:
         st.session_state.device_type = 'desktop'
         st.rerun()
 
-# UI 렌더링
-html_content = load_ui(st.session_state.device_type)
-
-# 전체 화면으로 HTML 렌더링
+# 전체 화면으로 HTML 렌더링 (UI_SHELL_URL이 있으면 iframe src)
 if st.session_state.device_type == 'mobile':
-    components.html(html_content, height=900, scrolling=True)
+    render_shell('mobile', height=900, scrolling=True)
 else:
-    components.html(html_content, height=800, scrolling=False)
+    render_shell('desktop', height=800, scrolling=False)
 
 # 현재 모드 표시
 st.markdown(f"""
@@ -5,7 +5,6 @@ Sentiment analysis, keyword extraction, trend analysis
 
 import pandas as pd
 import numpy as np
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from collections import Counter
 import re
 from wordcloud import WordCloud
@@ -13,6 +12,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import os
+from excel_export import save_excel
+from search_index import index_frame
+from trend_engine import resample, detect_anomalies
+from sentiment_backends import load_backend, score_texts, hangul_ratio, SentimentCache
+from config import SENTIMENT_THRESHOLD
 
 class DataAnalyzer:
     def __init__(self, df):
@@ -23,7 +27,7 @@ class DataAnalyzer:
             df: DataFrame from scraper
         """
         self.df = df.copy()
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+        self.sentiment_backend = load_backend()
         self.insights = {}
 
         # Create output directory
@@ -33,27 +37,27 @@ class DataAnalyzer:
         """감정 분석 수행"""
         print("\n📊 감정 분석 중...")
 
-        def get_sentiment(text):
-            if pd.isna(text) or text == '':
-                return 0.0
-            scores = self.sentiment_analyzer.polarity_scores(str(text))
-            return scores['compound']  # -1 (매우 부정) ~ +1 (매우 긍정)
-
-        # Title과 selftext 감정 분석
-        self.df['title_sentiment'] = self.df['title'].apply(get_sentiment)
-        self.df['text_sentiment'] = self.df['selftext'].apply(get_sentiment)
+        # 감정 백엔드 (SENTIMENT_BACKEND: vader 기본값, onnx 다국어 모델) + 본문 해시 캐시
+        cache = SentimentCache()
+        computed = 0
+        for column, target in [('title', 'title_sentiment'), ('selftext', 'text_sentiment')]:
+            scores, new = score_texts(self.df[column].tolist(), self.sentiment_backend, cache)
+            self.df[target] = scores.astype(float)  # -1 (매우 부정) ~ +1 (매우 긍정)
+            computed += new
+        cache.close()
         self.df['overall_sentiment'] = (self.df['title_sentiment'] + self.df['text_sentiment']) / 2
+        print(f"✓ 백엔드: {self.sentiment_backend.name} (새로 추론 {computed:,}건)")
 
-        # 감정 카테고리 분류
-        def categorize_sentiment(score):
-            if score > 0.3:
-                return 'Positive'
-            elif score < -0.3:
-                return 'Negative'
-            else:
-                return 'Neutral'
+        if not self.sentiment_backend.multilingual:
+            korean = hangul_ratio(self.df['title'])
+            if korean > 0:
+                print(f"⚠️ 한글 게시글 {korean * 100:.1f}%는 VADER로 중립 처리됨 (SENTIMENT_BACKEND=onnx 권장)")
 
-        self.df['sentiment_category'] = self.df['overall_sentiment'].apply(categorize_sentiment)
+        # 감정 카테고리 분류 (config.SENTIMENT_THRESHOLD 기준)
+        score = self.df['overall_sentiment']
+        self.df['sentiment_category'] = np.select(
+            [score > SENTIMENT_THRESHOLD, score < -SENTIMENT_THRESHOLD], ['Positive', 'Negative'], 'Neutral'
+        )
 
         # 통계
         sentiment_stats = self.df['sentiment_category'].value_counts()
@@ -218,6 +222,30 @@ class DataAnalyzer:
 
         return filepath
 
+    def analyze_trends(self):
+        """
+        주기별 게시글 수/평균 감정 추세 + 이상치 (trend_engine)
+        주기와 기준 구간은 TREND_FREQ(기본 W), TREND_WINDOW(기본 8) 환경 변수로 조정
+        """
+        freq = os.getenv('TREND_FREQ', 'W')
+        window = int(os.getenv('TREND_WINDOW', '8'))
+        columns = ['overall_sentiment'] if 'overall_sentiment' in self.df.columns else []
+        self.trend_df = detect_anomalies(resample(self.df, 'created_utc', columns, freq), window)
+
+        self.insights['trends'] = {
+            'freq': freq,
+            'periods': len(self.trend_df),
+            'anomalies': {
+                column: [str(day.date()) for day in self.trend_df.index[self.trend_df[f'{column}_anomaly']]]
+                for column in ['count'] + columns
+            },
+        }
+
+        print(f"\n📈 추세 분석 ({freq}, 주기 {len(self.trend_df)}개)")
+        for column, days in self.insights['trends']['anomalies'].items():
+            print(f"✓ {column} 이상치: {', '.join(days) if days else '없음'}")
+        return self.trend_df
+
     def create_visualizations(self):
         """데이터 시각화 생성"""
         print("\n📊 차트 생성 중...")
@@ -265,17 +293,31 @@ class DataAnalyzer:
 
         print(f"✓ 개요 차트 저장: {filepath1}")
 
-        # 2. 시간별 트렌드
+        # 2. 시간별 트렌드 (게시글 수 + 평균 감정, 이상치 표시)
         if 'created_utc' in self.df.columns:
-            self.df['month'] = pd.to_datetime(self.df['created_utc']).dt.to_period('M')
-            monthly_posts = self.df.groupby('month').size()
-
-            fig, ax = plt.subplots(figsize=(12, 6))
-            monthly_posts.plot(kind='line', marker='o', ax=ax, color='#9C27B0', linewidth=2)
-            ax.set_xlabel('Month', fontsize=12)
-            ax.set_ylabel('Number of Posts', fontsize=12)
-            ax.set_title('Posting Trend Over Time', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3)
+            trend = self.analyze_trends()
+            panels = [
+                (column, color, label)
+                for column, color, label in [
+                    ('count', '#9C27B0', 'Number of Posts'),
+                    ('overall_sentiment', '#2196F3', 'Mean Sentiment'),
+                ]
+                if column in trend.columns
+            ]
+
+            fig, axes = plt.subplots(len(panels), 1, figsize=(12, 4.5 * len(panels)), sharex=True, squeeze=False)
+            for ax, (column, color, label) in zip(axes[:, 0], panels):
+                ax.plot(trend.index, trend[column], marker='o', color=color, linewidth=2, label=label)
+                ax.plot(trend.index, trend[f'{column}_rolling_mean'], color='gray', linestyle='--',
+                        label='Rolling Mean')
+                flagged = trend[trend[f'{column}_anomaly']]
+                ax.scatter(flagged.index, flagged[column], color='red', s=80, zorder=3, label='Anomaly')
+                ax.set_ylabel(label, fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.legend(loc='upper left')
+            axes[0, 0].set_title(f"Posting Trend Over Time ({self.insights['trends']['freq']})",
+                                 fontsize=14, fontweight='bold')
+            axes[-1, 0].set_xlabel('Period', fontsize=12)
 
             plt.tight_layout()
             filepath2 = 'output/charts/trend.png'
@@ -294,23 +336,30 @@ class DataAnalyzer:
         """분석된 데이터 저장"""
         filepath = f"output/{filename}.xlsx"
 
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # 전체 데이터
-            self.df.to_excel(writer, sheet_name='Full Data', index=False)
+        # 전체 데이터
+        sheets = {'Full Data': self.df}
+
+        # 감정별 분리
+        for sentiment in ['Positive', 'Neutral', 'Negative']:
+            sentiment_df = self.df[self.df['sentiment_category'] == sentiment]
+            if not sentiment_df.empty:
+                sheets[sentiment] = sentiment_df
+
+        # 고통점 Top 20
+        sheets['Top Pain Points'] = self.df[self.df['pain_score'] > 0].nlargest(20, 'pain_score')
+
+        # 인기 게시글 Top 20
+        sheets['Top Posts'] = self.df.nlargest(20, 'upvotes')
 
-            # 감정별 분리
-            for sentiment in ['Positive', 'Neutral', 'Negative']:
-                sentiment_df = self.df[self.df['sentiment_category'] == sentiment]
-                if not sentiment_df.empty:
-                    sentiment_df.to_excel(writer, sheet_name=sentiment, index=False)
+        # 주기별 추세/이상치
+        if hasattr(self, 'trend_df'):
+            sheets['Trend'] = self.trend_df.reset_index(names='period')
 
-            # 고통점 Top 20
-            pain_posts = self.df[self.df['pain_score'] > 0].nlargest(20, 'pain_score')
-            pain_posts.to_excel(writer, sheet_name='Top Pain Points', index=False)
+        save_excel(filepath, sheets)
 
-            # 인기 게시글 Top 20
-            top_posts = self.df.nlargest(20, 'upvotes')
-            top_posts.to_excel(writer, sheet_name='Top Posts', index=False)
+        # 검색 인덱스에 고통점 점수 반영 (PRAW 수집 데이터)
+        if 'post_id' in self.df.columns:
+            index_frame(self.df, 'reddit_praw', 'post_id')
 
         print(f"\n✓ 분석 데이터 저장: {filepath}")
         return filepath
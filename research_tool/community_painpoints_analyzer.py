@@ -6,6 +6,22 @@ Programming Learner Community Pain Points Analyzer
 import pandas as pd
 from datetime import datetime
 import os
+from excel_export import save_excel
+
+# 이벤트 로그 퍼널 단계 (이벤트 이름, 표시 이름)
+DROPOUT_FUNNEL_STEPS = [
+    ('interest', '프로그래밍에 관심 생김'),
+    ('enroll', '온라인 강의 등록'),
+    ('first_lecture', '첫 강의 시청'),
+    ('week1_complete', '1주차 완료'),
+    ('midpoint', '중간 지점 도달'),
+    ('course_complete', '강의 완강'),
+    ('project_start', '첫 프로젝트 시작'),
+    ('project_complete', '첫 프로젝트 완료'),
+    ('second_project_start', '두 번째 프로젝트 시작'),
+    ('regular_learner', '정기적 학습자로 정착'),
+]
+
 
 class CommunityPainPointsAnalyzer:
     def __init__(self):
@@ -227,14 +243,31 @@ class CommunityPainPointsAnalyzer:
 
         return df
 
-    def calculate_dropout_funnel(self):
+    def calculate_dropout_funnel(self, event_log=None):
         """
         학습자 이탈 퍼널 계산
+
+        Args:
+            event_log: 학습자 이벤트 로그 Parquet 경로 (있으면 funnel_engine으로 실제 계산,
+                       없으면 MOOC 연구 기반 추정치 사용)
         """
         print(f"\n{'='*60}")
         print(f"📉 학습자 이탈 Funnel")
         print(f"{'='*60}\n")
 
+        if event_log:
+            from funnel_engine import compute_funnel
+
+            engine, df = compute_funnel(event_log, DROPOUT_FUNNEL_STEPS)
+            self.funnel_engine = engine
+            self.funnel_df = df
+            self.funnel_cohort_df = engine.cohort_retention()
+            self.funnel_time_df = engine.time_to_step()
+
+            print(f"📊 단계별 학습자 수 (이벤트 로그 {engine.rows_read:,}행):")
+            print(df.to_string(index=False))
+            return df
+
         # 실제 MOOC 연구 및 Kaggle 데이터 기반
         funnel_data = {
             'stage': [
@@ -275,21 +308,29 @@ class CommunityPainPointsAnalyzer:
 
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'learning_challenges_df'):
-                self.learning_challenges_df.to_excel(writer, sheet_name='Learning_Challenges', index=False)
+        sheets = {}
+        if hasattr(self, 'learning_challenges_df'):
+            sheets['Learning_Challenges'] = self.learning_challenges_df
+
+        if hasattr(self, 'mooc_df'):
+            sheets['MOOC_Completion_Rates'] = self.mooc_df
+
+        if hasattr(self, 'pain_points_df'):
+            sheets['Pain_Points'] = self.pain_points_df
+
+        if hasattr(self, 'quotes_df'):
+            sheets['Learner_Quotes'] = self.quotes_df
 
-            if hasattr(self, 'mooc_df'):
-                self.mooc_df.to_excel(writer, sheet_name='MOOC_Completion_Rates', index=False)
+        if hasattr(self, 'funnel_df'):
+            sheets['Dropout_Funnel'] = self.funnel_df
 
-            if hasattr(self, 'pain_points_df'):
-                self.pain_points_df.to_excel(writer, sheet_name='Pain_Points', index=False)
+        if hasattr(self, 'funnel_cohort_df'):
+            sheets['Funnel_Cohorts'] = self.funnel_cohort_df
 
-            if hasattr(self, 'quotes_df'):
-                self.quotes_df.to_excel(writer, sheet_name='Learner_Quotes', index=False)
+        if hasattr(self, 'funnel_time_df'):
+            sheets['Funnel_Time_To_Step'] = self.funnel_time_df
 
-            if hasattr(self, 'funnel_df'):
-                self.funnel_df.to_excel(writer, sheet_name='Dropout_Funnel', index=False)
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -313,8 +354,8 @@ def main():
     # 4. 실제 발언 분석
     analyzer.analyze_beginner_quotes()
 
-    # 5. 이탈 퍼널
-    analyzer.calculate_dropout_funnel()
+    # 5. 이탈 퍼널 (LEARNER_EVENT_LOG가 있으면 실제 이벤트 로그로 계산)
+    analyzer.calculate_dropout_funnel(os.getenv('LEARNER_EVENT_LOG'))
 
     # 6. 데이터 저장
     excel_path = analyzer.save_all_data('minjun_community_painpoints')
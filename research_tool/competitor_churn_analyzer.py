@@ -6,6 +6,7 @@ Competitor Churn Rate Analyzer
 import pandas as pd
 from datetime import datetime
 import os
+from excel_export import save_excel
 
 class CompetitorChurnAnalyzer:
     def __init__(self):
@@ -230,18 +231,20 @@ class CompetitorChurnAnalyzer:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'completion_df'):
-                self.completion_df.to_excel(writer, sheet_name='Completion_Rates', index=False)
+        sheets = {}
+        if hasattr(self, 'completion_df'):
+            sheets['Completion_Rates'] = self.completion_df
 
-            if hasattr(self, 'bootcamp_df'):
-                self.bootcamp_df.to_excel(writer, sheet_name='Bootcamp_Data', index=False)
+        if hasattr(self, 'bootcamp_df'):
+            sheets['Bootcamp_Data'] = self.bootcamp_df
 
-            if hasattr(self, 'churn_reasons_df'):
-                self.churn_reasons_df.to_excel(writer, sheet_name='Churn_Reasons', index=False)
+        if hasattr(self, 'churn_reasons_df'):
+            sheets['Churn_Reasons'] = self.churn_reasons_df
 
-            if hasattr(self, 'weaknesses_df'):
-                self.weaknesses_df.to_excel(writer, sheet_name='Competitor_Weaknesses', index=False)
+        if hasattr(self, 'weaknesses_df'):
+            sheets['Competitor_Weaknesses'] = self.weaknesses_df
+
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -0,0 +1,364 @@
+"""
+Dedup Index
+스크래퍼 간 중복 제거 / 동일 게시글 식별 인덱스 (SQLite에 영구 저장)
+
+스크래퍼마다 자기 안에서만 중복을 제거함 (PRAW는 post_id, 웹 스크래퍼는 url, HN은 objectID)
+→ 같은 글이 reddit_bs4 / reddit_web / PRAW로 다시 수집되거나 HN, dev.to에 교차 게시되면 두 번 집계됨
+
+같은 글 판정 (하나라도 맞으면 먼저 색인된 문서의 중복)
+1. 정규화한 URL: 스킴/www/old./모바일 도메인 통일, 추적 파라미터 제거,
+   reddit 글은 reddit.com/comments/<id>, HN 글은 news.ycombinator.com/item?id=<id> 형태로
+2. 본문 해시: 소문자 + 공백/문장부호 정리 후 SHA-1 (짧은 본문은 제외)
+3. 제목 MinHash: 문자 4-gram MinHash(64개) → LSH 밴드(16밴드 × 4행) 버킷으로 후보를 찾고
+   추정 자카드 유사도가 TITLE_THRESHOLD 이상이면 후보 (제목만으로는 같은 글로 보지 않음)
+   - 둘 다 본문이 있으면 본문 MinHash 유사도가 BODY_THRESHOLD 이상일 때만 같은 글
+   - 한쪽에 본문이 없을 때(링크 글, 웹 스크래퍼 목록 등)만 제목으로 판정
+   - 같은 출처의 다른 키는 제목으로 합치지 않음 ("How do I start learning Python?" 같은 흔한 제목)
+
+- add(): 문서 하나 색인 + 대표 문서 ID 반환 (스트리밍 삽입)
+- lookup(): 색인하지 않고 대표 문서만 찾기
+- dedupe_frame(): 스크래퍼 to_dataframe 결과에서 다른 출처와 겹치는 행 제거
+- 같은 출처의 같은 키(post_id 등)는 다시 수집해도 같은 문서로 봄 → 재실행해도 자기 자신은 지워지지 않음
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.getenv('DEDUP_INDEX', 'output/dedup_index.sqlite')
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+TITLE_THRESHOLD = 0.7
+BODY_THRESHOLD = 0.5
+# 본문 MinHash는 앞부분만 (웹 스크래퍼는 본문 앞부분만 가져오는 경우가 많음)
+BODY_PREFIX_CHARS = 1000
+MIN_CONTENT_CHARS = 40
+MIN_TITLE_CHARS = 15
+
+# 같은 사이트의 다른 호스트 이름
+HOST_ALIASES = {
+    'old.reddit.com': 'reddit.com',
+    'new.reddit.com': 'reddit.com',
+    'np.reddit.com': 'reddit.com',
+    'm.reddit.com': 'reddit.com',
+    'i.reddit.com': 'reddit.com',
+}
+
+TRACKING_PARAMS = {'ref', 'ref_src', 'source', 'fbclid', 'gclid', 'share_id', 'context', 'sort'}
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+
+_REDDIT_POST = re.compile(r'^/(?:r/[^/]+/)?comments/([a-z0-9]+)')
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def canonical_url(url, base='https://reddit.com'):
+    """URL 정규화 (같은 글이면 같은 문자열)"""
+    if not url or not isinstance(url, str) or url == 'N/A':
+        return None
+    url = url.strip()
+    if url.startswith('/'):
+        url = base + url
+    parts = urlsplit(url if '://' in url else f'https://{url}')
+    host = parts.netloc.lower().split('@')[-1].split(':')[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    path = re.sub(r'/+', '/', parts.path).rstrip('/') or '/'
+
+    if host == 'redd.it':
+        return f"reddit.com/comments/{path.strip('/').lower()}"
+    if host == 'reddit.com':
+        post = _REDDIT_POST.match(path.lower())
+        if post:
+            return f"reddit.com/comments/{post.group(1)}"
+    if host == 'news.ycombinator.com':
+        item = dict(parse_qsl(parts.query)).get('id')
+        if item:
+            return f"news.ycombinator.com/item?id={item}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(('', host, path, urlencode(query), '')).lstrip('/')
+
+
+def normalize_text(text):
+    """비교용 텍스트 (유니코드 정규화, 소문자, 문장부호/공백 하나로)"""
+    text = unicodedata.normalize('NFKC', str(text)).lower()
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def content_hash(text):
+    """본문 정규화 후 SHA-1 (너무 짧으면 None - 짧은 글은 우연히 겹치기 쉬움)"""
+    if not isinstance(text, str):
+        return None
+    normalized = normalize_text(text)
+    if len(normalized) < MIN_CONTENT_CHARS:
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def minhash(text):
+    """제목 / 본문 → MinHash 서명 (uint32 NUM_PERM개, 너무 짧으면 None)"""
+    normalized = f" {normalize_text(text)} "
+    if len(normalized.strip()) < MIN_TITLE_CHARS:
+        # "Help", "Question" 같은 짧은 제목은 서로 다른 글도 겹치므로 비교하지 않음
+        return None
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    ) & np.uint64(_MERSENNE_PRIME)
+    # (a·x + b) mod p 를 순열 64개에 대해 한 번에 계산 (a, x < 2^31이라 uint64에서 넘치지 않음)
+    permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % np.uint64(_MERSENNE_PRIME)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature):
+    """서명 → 밴드별 버킷 키 (밴드 안의 행들을 묶어서 해시)"""
+    rows = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'little', signed=True)
+        for row in rows
+    ]
+
+
+class DedupIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                source_key TEXT NOT NULL,
+                canonical_id INTEGER NOT NULL,
+                reason TEXT,
+                title TEXT,
+                signature BLOB,
+                has_body INTEGER,
+                body_signature BLOB,
+                UNIQUE (source, source_key)
+            );
+            CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, doc_id INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS hashes (hash TEXT PRIMARY KEY, doc_id INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, bucket INTEGER NOT NULL, doc_id INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+        """)
+        # 본문 정보 열이 없던 예전 인덱스 (기존 문서는 본문 여부를 모르므로 제목만으로는 합치지 않음)
+        columns = {row[1] for row in self.con.execute("PRAGMA table_info(docs)")}
+        for column, kind in (('has_body', 'INTEGER'), ('body_signature', 'BLOB')):
+            if column not in columns:
+                self.con.execute(f"ALTER TABLE docs ADD COLUMN {column} {kind}")
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _canonical(self, doc_id):
+        return self.con.execute("SELECT canonical_id FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()[0]
+
+    def _match(self, urls, digest, signature, body_signature=None, has_body=False, source=None):
+        """(대표 문서 ID, 판정 이유) - 없으면 (None, None)"""
+        for url in urls:
+            row = self.con.execute("SELECT doc_id FROM urls WHERE url = ?", (url,)).fetchone()
+            if row:
+                return self._canonical(row[0]), 'url'
+        if digest:
+            row = self.con.execute("SELECT doc_id FROM hashes WHERE hash = ?", (digest,)).fetchone()
+            if row:
+                return self._canonical(row[0]), 'content'
+        if signature is not None:
+            candidates = set()
+            for band, bucket in enumerate(band_keys(signature)):
+                candidates.update(
+                    doc_id for (doc_id,) in
+                    self.con.execute("SELECT doc_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket))
+                )
+            if candidates:
+                # 후보 서명을 한 번에 읽어 추정 자카드 유사도(같은 최솟값 비율) 계산
+                ids = sorted(candidates)
+                placeholders = ','.join('?' * len(ids))
+                rows = self.con.execute(
+                    f"SELECT doc_id, signature, source, has_body, body_signature FROM docs "
+                    f"WHERE doc_id IN ({placeholders})", ids
+                ).fetchall()
+                signatures = np.frombuffer(b''.join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), -1)
+                scores = (signatures == signature).mean(axis=1)
+                for best in np.argsort(-scores, kind='stable'):
+                    if scores[best] < TITLE_THRESHOLD:
+                        break
+                    doc_id, _, other_source, other_has_body, other_body = rows[best]
+                    if not self._title_confirmed(source, body_signature, has_body, other_source, other_has_body, other_body):
+                        continue
+                    canonical_id = self._canonical(doc_id)
+                    if canonical_id != doc_id:
+                        # 본문 없는 중복 문서를 거쳐 본문이 다른 대표 문서에 붙지 않도록 대표 문서와도 확인
+                        row = self.con.execute(
+                            "SELECT source, has_body, body_signature FROM docs WHERE doc_id = ?", (canonical_id,)
+                        ).fetchone()
+                        if not self._title_confirmed(source, body_signature, has_body, *row):
+                            continue
+                    return canonical_id, 'title'
+        return None, None
+
+    @staticmethod
+    def _title_confirmed(source, body_signature, has_body, other_source, other_has_body, other_body):
+        """제목이 비슷한 후보를 같은 글로 볼지 (같은 출처 X, 둘 다 본문이 있으면 본문도 비슷해야 함)"""
+        if source is not None and source == other_source:
+            return False
+        if other_has_body is None:
+            return False
+        if not has_body or not other_has_body:
+            return True
+        if body_signature is None or other_body is None:
+            return False
+        other = np.frombuffer(other_body, dtype=np.uint32)
+        return float((other == body_signature).mean()) >= BODY_THRESHOLD
+
+    @staticmethod
+    def _features(urls, title, text):
+        """(정규화 URL 목록, 본문 해시, 제목 서명, 본문 서명, 본문 유무)"""
+        canonical = [url for url in (canonical_url(url) for url in urls) if url]
+        has_body = isinstance(text, str) and bool(normalize_text(text))
+        return (
+            list(dict.fromkeys(canonical)),
+            content_hash(text),
+            minhash(title) if isinstance(title, str) else None,
+            minhash(text[:BODY_PREFIX_CHARS]) if has_body else None,
+            has_body,
+        )
+
+    def lookup(self, urls=(), title=None, text=None, source=None):
+        """색인하지 않고 같은 글 찾기 → (대표 문서 ID, 판정 이유)"""
+        return self._match(*self._features(urls, title, text), source=source)
+
+    def add(self, source, source_key, urls=(), title=None, text=None):
+        """
+        문서 하나 색인
+
+        Returns:
+            (문서 ID, 대표 문서 ID, 판정 이유) - 처음 보는 글이면 대표 문서 ID == 문서 ID, 이유 None
+        """
+        source_key = str(source_key)
+        existing = self.con.execute(
+            "SELECT doc_id, canonical_id, reason FROM docs WHERE source = ? AND source_key = ?", (source, source_key)
+        ).fetchone()
+        if existing:
+            return existing
+
+        urls, digest, signature, body_signature, has_body = self._features(urls, title, text)
+        canonical_id, reason = self._match(urls, digest, signature, body_signature, has_body, source)
+
+        cursor = self.con.execute(
+            "INSERT INTO docs (source, source_key, canonical_id, reason, title, signature, has_body, body_signature) "
+            "VALUES (?, ?, 0, ?, ?, ?, ?, ?)",
+            (source, source_key, reason, title, None if signature is None else signature.tobytes(),
+             int(has_body), None if body_signature is None else body_signature.tobytes()),
+        )
+        doc_id = cursor.lastrowid
+        canonical_id = canonical_id or doc_id
+        self.con.execute("UPDATE docs SET canonical_id = ? WHERE doc_id = ?", (canonical_id, doc_id))
+
+        # 중복 문서의 URL / 해시 / 밴드도 색인 → 다음 글이 어느 쪽과 겹쳐도 같은 대표 문서로 연결
+        self.con.executemany("INSERT OR IGNORE INTO urls VALUES (?, ?)", [(url, doc_id) for url in urls])
+        if digest:
+            self.con.execute("INSERT OR IGNORE INTO hashes VALUES (?, ?)", (digest, doc_id))
+        if signature is not None:
+            self.con.executemany(
+                "INSERT INTO bands VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in enumerate(band_keys(signature))],
+            )
+        return doc_id, canonical_id, reason
+
+    def commit(self):
+        self.con.commit()
+
+    def stats(self):
+        total, unique = self.con.execute(
+            "SELECT COUNT(*), SUM(doc_id = canonical_id) FROM docs"
+        ).fetchone()
+        reasons = dict(self.con.execute(
+            "SELECT reason, COUNT(*) FROM docs WHERE reason IS NOT NULL GROUP BY reason"
+        ).fetchall())
+        return {'documents': total, 'unique': unique or 0, 'duplicates': reasons}
+
+
+TEXT_COLUMNS = ('selftext', 'description', 'body', 'excerpt', 'content')
+URL_COLUMNS = ('url', 'hn_url')
+
+
+def dedupe_frame(df, source, key_column, index_path=DEFAULT_INDEX_PATH):
+    """
+    스크래퍼 DataFrame → 다른 출처에서 이미 수집한 글을 뺀 DataFrame
+
+    행마다 색인하고, 대표 문서가 다른 (출처, 키)이면 제거
+    남은 행에는 dedup_id(대표 문서 ID) 열 추가 → 분석 단계에서 출처를 합쳐도 같은 글은 같은 ID
+    """
+    if df.empty or os.getenv('DEDUP_INDEX_DISABLED') == '1':
+        return df
+
+    url_columns = [c for c in URL_COLUMNS if c in df.columns]
+    text_columns = [c for c in TEXT_COLUMNS if c in df.columns]
+    keep, dedup_ids, reasons = [], [], {}
+    with DedupIndex(index_path) as index:
+        for row in df.itertuples(index=False):
+            row = row._asdict()
+            text = ' '.join(str(row[c]) for c in text_columns if isinstance(row[c], str))
+            doc_id, canonical_id, reason = index.add(
+                source,
+                row[key_column],
+                urls=[row[c] for c in url_columns],
+                title=row.get('title'),
+                text=text or None,
+            )
+            keep.append(doc_id == canonical_id)
+            dedup_ids.append(canonical_id)
+            if doc_id != canonical_id:
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    df = df.assign(dedup_id=dedup_ids)[keep]
+    if reasons:
+        detail = ', '.join(f"{reason} {count}" for reason, count in reasons.items())
+        print(f"🔁 다른 출처와 중복 {sum(reasons.values())}개 제거 ({detail})")
+    return df
+
+
+def main():
+    """실행: 색인 통계 출력"""
+    with DedupIndex() as index:
+        stats = index.stats()
+    print(f"\n{'='*60}")
+    print(f"🔁 중복 제거 인덱스: {DEFAULT_INDEX_PATH}")
+    print(f"{'='*60}\n")
+    print(f"  - 문서: {stats['documents']:,}개 (고유 {stats['unique']:,}개)")
+    for reason, count in stats['duplicates'].items():
+        print(f"  - {reason} 일치 중복: {count:,}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ from datetime import datetime
 import time
 from tqdm import tqdm
 import os
+from excel_export import save_excel
+from search_index import index_frame
+from dedup_index import dedupe_frame
 
 class DevToScraper:
     def __init__(self):
@@ -98,6 +101,8 @@ class DevToScraper:
         # 중복 제거
         original_count = len(df)
         df = df.drop_duplicates(subset=['article_id'])
+        # 다른 스크래퍼에서 이미 수집한 글 제거
+        df = dedupe_frame(df, 'devto', 'article_id')
         removed = original_count - len(df)
 
         print(f"📊 데이터 정리 완료: {len(df)}개 고유 글 (중복 {removed}개 제거)")
@@ -121,7 +126,10 @@ class DevToScraper:
 
         # Excel 저장
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
-        df.to_excel(excel_path, index=False, engine='openpyxl')
+        save_excel(excel_path, {'Sheet1': df})
+
+        # 검색 인덱스에 증분 반영
+        index_frame(df, 'devto', 'article_id')
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - CSV: {csv_path}")
@@ -0,0 +1,316 @@
+"""
+Excel Export
+분석 결과 DataFrame → xlsx (고정 메모리 스트리밍 작성)
+
+pd.ExcelWriter(engine='openpyxl')는 통합 문서 전체를 메모리에 만든 뒤 저장하므로
+수십만 행 크롤링 데이터(Full Data 시트)에서 느리고 메모리를 많이 씀 → 시트 XML을 직접 스트리밍
+
+- 시트 하나를 CHUNK_ROWS 행씩 임시 파일로 바로 기록 (메모리는 청크 크기에 비례)
+- 시트 여러 개는 프로세스 풀에서 병렬로 임시 파일 작성 후 하나의 zip(xlsx)으로 묶음
+- 열 너비는 표본(SAMPLE_ROWS행)의 표시 폭으로 계산 (한글은 두 칸)
+- 엑셀 한도(1,048,576행) 넘는 DataFrame은 'Full Data', 'Full Data (2)', ... 시트로 나눔
+- 문자열은 inlineStr로 기록 (공유 문자열 표를 메모리에 모을 필요 없음)
+"""
+
+import math
+import os
+import re
+import shutil
+import tempfile
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_CELL_CHARS = 32_767
+SHEET_NAME_LIMIT = 31
+CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 1_000
+MAX_COLUMN_WIDTH = 60
+
+# 셀 스타일 번호 (styles.xml의 cellXfs 순서)
+STYLE_DATETIME = 1
+STYLE_HEADER = 2
+STYLE_DURATION = 3
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_ILLEGAL_SHEET_NAME = re.compile(r'[\[\]:*?/\\]')
+_EXCEL_EPOCH = np.datetime64('1899-12-30T00:00:00', 'ns')
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+_STYLES_XML = (
+    _XML_HEADER
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="46" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index):
+    """0부터 시작하는 열 번호 → 엑셀 열 문자 (0 → A, 26 → AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _display_width(text):
+    """표시 폭 (한글 등 전각 문자는 두 칸)"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+
+
+def column_widths(df, sample_rows=SAMPLE_ROWS):
+    """표본 행으로 열 너비 계산 (전체를 훑지 않음)"""
+    sample = df if len(df) <= sample_rows else df.sample(sample_rows, random_state=0)
+    widths = []
+    for position, name in enumerate(df.columns):
+        values = sample.iloc[:, position].dropna().astype(str).str.slice(0, MAX_COLUMN_WIDTH)
+        longest = max((_display_width(value) for value in values), default=0)
+        widths.append(min(max(longest, _display_width(str(name))) + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _text(value):
+    """문자열 → XML 텍스트 (제어 문자 제거, 셀 최대 길이로 자름)"""
+    return escape(_ILLEGAL_XML.sub('', value[:EXCEL_MAX_CELL_CHARS]))
+
+
+def _string_cell(ref, value, style=''):
+    return f'<c r="{ref}" t="inlineStr"{style}><is><t xml:space="preserve">{_text(value)}</t></is></c>'
+
+
+def _object_cell(ref, value):
+    """object 열의 값 하나 → 셀 XML (값 타입별로)"""
+    if value is None or value is pd.NaT:
+        return ''
+    # np.timedelta64는 np.integer의 하위 클래스 → 정수보다 먼저 (pandas처럼 일 단위 소수, [h]:mm:ss)
+    if isinstance(value, (timedelta, np.timedelta64)):
+        days = pd.Timedelta(value) / pd.Timedelta(days=1)
+        return f'<c r="{ref}" s="{STYLE_DURATION}"><v>{days!r}</v></c>'
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        return f'<c r="{ref}"><v>{float(value)!r}</v></c>' if math.isfinite(value) else ''
+    if isinstance(value, (datetime, date)):
+        serial = (np.datetime64(pd.Timestamp(value).tz_localize(None), 'ns') - _EXCEL_EPOCH) / np.timedelta64(1, 'D')
+        return f'<c r="{ref}" s="{STYLE_DATETIME}"><v>{serial!r}</v></c>'
+    return _string_cell(ref, str(value))
+
+
+def _column_cells(series, letter, rows):
+    """열 하나(청크) → 행별 셀 XML 목록 (빈 값은 빈 문자열)"""
+    kind = series.dtype.kind
+    # 결측 표시를 먼저 구함 (Int64/boolean/string 같은 nullable 열의 pd.NA 포함)
+    missing = series.isna().to_numpy()
+    if kind in 'biuf':
+        # nullable 확장 배열도 NumPy 배열로 (결측 자리는 자리표시 값, missing으로 걸러냄)
+        numpy_dtype = getattr(series.dtype, 'numpy_dtype', series.dtype)
+        values = series.to_numpy(dtype=numpy_dtype, na_value=np.nan if kind == 'f' else 0)
+    else:
+        values = series.to_numpy()
+    if kind == 'b':
+        return [
+            '' if na else f'<c r="{letter}{r}" t="b"><v>{int(v)}</v></c>'
+            for r, v, na in zip(rows, values.tolist(), missing)
+        ]
+    if kind in 'iu':
+        return [
+            '' if na else f'<c r="{letter}{r}"><v>{v}</v></c>'
+            for r, v, na in zip(rows, values.tolist(), missing)
+        ]
+    if kind == 'f':
+        return [
+            f'<c r="{letter}{r}"><v>{v!r}</v></c>' if math.isfinite(v) else ''
+            for r, v in zip(rows, values.astype(float).tolist())
+        ]
+    if kind == 'm':
+        days = values.astype('timedelta64[ns]') / np.timedelta64(1, 'D')
+        return [
+            f'<c r="{letter}{r}" s="{STYLE_DURATION}"><v>{v!r}</v></c>' if math.isfinite(v) else ''
+            for r, v in zip(rows, days.tolist())
+        ]
+    if kind == 'M':
+        if getattr(series.dtype, 'tz', None) is not None:
+            values = series.dt.tz_localize(None).to_numpy()
+        serials = (values.astype('datetime64[ns]') - _EXCEL_EPOCH) / np.timedelta64(1, 'D')
+        return [
+            f'<c r="{letter}{r}" s="{STYLE_DATETIME}"><v>{v!r}</v></c>' if math.isfinite(v) else ''
+            for r, v in zip(rows, serials.tolist())
+        ]
+    return [
+        '' if na else _object_cell(f'{letter}{r}', v)
+        for r, v, na in zip(rows, values, missing)
+    ]
+
+
+def write_sheet_xml(df, path, chunk_rows=CHUNK_ROWS, sample_rows=SAMPLE_ROWS):
+    """DataFrame 하나 → 워크시트 XML 파일 (청크 단위 스트리밍, 프로세스 풀 작업 함수)"""
+    letters = [column_letter(i) for i in range(len(df.columns))]
+    widths = column_widths(df, sample_rows)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_XML_HEADER + f'<worksheet xmlns="{_MAIN_NS}">')
+        if len(df.columns):
+            f.write(f'<dimension ref="A1:{letters[-1]}{len(df) + 1}"/><cols>')
+            f.write(''.join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{width}" customWidth="1"/>' for i, width in enumerate(widths)
+            ))
+            f.write('</cols>')
+        f.write('<sheetData>')
+
+        header = ''.join(
+            _string_cell(f'{letter}1', str(name), f' s="{STYLE_HEADER}"') for letter, name in zip(letters, df.columns)
+        )
+        f.write(f'<row r="1">{header}</row>\n')
+
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            rows = range(start + 2, start + 2 + len(chunk))
+            columns = [_column_cells(chunk.iloc[:, i], letter, rows) for i, letter in enumerate(letters)]
+            f.write('\n'.join(
+                f'<row r="{r}">{"".join(cells)}</row>' for r, cells in zip(rows, zip(*columns))
+            ))
+            f.write('\n')
+
+        f.write('</sheetData></worksheet>')
+    return path
+
+
+def _clean_sheet_name(name):
+    return _ILLEGAL_SHEET_NAME.sub('_', str(name)).strip("'")[:SHEET_NAME_LIMIT] or 'Sheet'
+
+
+def _unique_name(name, used):
+    candidate, n = name, 2
+    while candidate.lower() in used:
+        suffix = f' ({n})'
+        candidate = name[:SHEET_NAME_LIMIT - len(suffix)] + suffix
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def plan_sheets(sheets, max_rows=EXCEL_MAX_ROWS - 1):
+    """(시트 이름, DataFrame) → 엑셀 행 한도로 나눈 [(시트 이름, DataFrame 조각)]"""
+    items = sheets.items() if isinstance(sheets, dict) else sheets
+    used, parts = set(), []
+    for name, df in items:
+        name = _clean_sheet_name(name)
+        if len(df) <= max_rows:
+            parts.append((_unique_name(name, used), df))
+            continue
+        for start in range(0, len(df), max_rows):
+            parts.append((_unique_name(name, used), df.iloc[start:start + max_rows]))
+    return parts
+
+
+def _package_parts(names):
+    """통합 문서 틀 (Content Types / 관계 / workbook.xml)"""
+    sheet_overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(names) + 1)
+    )
+    content_types = (
+        _XML_HEADER
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        + sheet_overrides + '</Types>'
+    )
+    root_rels = (
+        _XML_HEADER
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    workbook = (
+        _XML_HEADER
+        + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+        + ''.join(
+            f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(names, start=1)
+        )
+        + '</sheets></workbook>'
+    )
+    workbook_rels = (
+        _XML_HEADER
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + ''.join(
+            f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(names) + 1)
+        )
+        + f'<Relationship Id="rId{len(names) + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    return {
+        '[Content_Types].xml': content_types,
+        '_rels/.rels': root_rels,
+        'xl/workbook.xml': workbook,
+        'xl/_rels/workbook.xml.rels': workbook_rels,
+        'xl/styles.xml': _STYLES_XML,
+    }
+
+
+def save_excel(path, sheets, jobs=None):
+    """
+    DataFrame 여러 개 → xlsx 하나 (index는 쓰지 않음, pandas to_excel(index=False)와 같은 모양)
+
+    Args:
+        path: 저장할 xlsx 경로
+        sheets: {시트 이름: DataFrame} 또는 [(시트 이름, DataFrame), ...]
+        jobs: 시트 작성 프로세스 수 (기본값: CPU 수, 1이면 현재 프로세스에서 순서대로)
+    """
+    parts = plan_sheets(sheets)
+    if not parts:
+        # 빈 통합 문서는 엑셀에서 열리지 않으므로 빈 시트 하나
+        parts = [('Sheet1', pd.DataFrame())]
+    names = [name for name, _ in parts]
+    jobs = min(jobs or os.cpu_count() or 1, len(parts))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='xlsx_', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        sheet_files = [os.path.join(temp_dir, f'sheet{i}.xml') for i in range(1, len(parts) + 1)]
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(write_sheet_xml, [df for _, df in parts], sheet_files))
+        else:
+            for (_, df), sheet_file in zip(parts, sheet_files):
+                write_sheet_xml(df, sheet_file)
+
+        partial_path = os.path.join(temp_dir, 'workbook.xlsx')
+        with zipfile.ZipFile(partial_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for arcname, content in _package_parts(names).items():
+                zf.writestr(arcname, content)
+            for i, sheet_file in enumerate(sheet_files, start=1):
+                zf.write(sheet_file, f'xl/worksheets/sheet{i}.xml')
+        os.replace(partial_path, path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return path
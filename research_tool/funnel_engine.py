@@ -0,0 +1,211 @@
+"""
+Funnel Engine
+학습자 이벤트 로그(Parquet) → 순서형 퍼널 / 코호트별 단계 도달률 / 단계 도달 시간 분포
+하드코딩된 퍼널 수치 대신 실제 이벤트 로그(수천만 행)에서 계산
+
+- 입력: user_id, step(이벤트 이름), ts(타임스탬프) 컬럼이 있는 Parquet 파일 또는 파티션 폴더
+  (data_generator.py처럼 날짜=YYYY-MM-DD/ 하이브 파티션이면 날짜 순서대로 파티션 하나씩 스트리밍)
+- 순서형 퍼널: k단계 도달 = (k-1)단계 도달 시각 이후 처음 발생한 k단계 이벤트
+- 사용자별 상태(도달 단계, 단계별 최초 도달 시각)만 NumPy 배열로 유지 → 메모리는 사용자 수에 비례
+- 파티션 안에서는 단계별로 한 번씩 벡터 연산 (정렬 + np.unique로 사용자별 최초 시각)
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from excel_export import save_excel
+
+NOT_REACHED = np.iinfo(np.int64).max
+
+
+class FunnelEngine:
+    def __init__(self, steps, user_column='user_id', step_column='step', time_column='ts'):
+        """
+        Args:
+            steps: 퍼널 단계 [(이벤트 이름, 표시 이름), ...] 순서대로
+        """
+        self.steps = [step if isinstance(step, tuple) else (step, step) for step in steps]
+        self.step_names = [name for name, _ in self.steps]
+        self.step_labels = [label for _, label in self.steps]
+        self.user_column = user_column
+        self.step_column = step_column
+        self.time_column = time_column
+
+        self.users = pd.Index([])
+        # 사용자별 마지막 도달 단계 (-1: 없음) / 단계별 최초 도달 시각 (ns, 미도달은 NOT_REACHED)
+        # 용량을 두 배씩 늘리고 앞쪽 len(self.users)개만 사용
+        self._level = np.empty(0, dtype=np.int16)
+        self._step_times = np.empty((0, len(self.steps)), dtype=np.int64)
+        self.rows_read = 0
+        self.partitions_read = 0
+
+    @property
+    def level(self):
+        return self._level[:len(self.users)]
+
+    @property
+    def step_times(self):
+        return self._step_times[:len(self.users)]
+
+    def _reserve(self, size):
+        """상태 배열 용량 확보 (두 배씩 증가 → 추가 비용 분할 상환)"""
+        capacity = len(self._level)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+        level = np.full(capacity, -1, dtype=np.int16)
+        step_times = np.full((capacity, len(self.steps)), NOT_REACHED, dtype=np.int64)
+        level[:len(self.users)] = self.level
+        step_times[:len(self.users)] = self.step_times
+        self._level, self._step_times = level, step_times
+
+    def _user_codes(self, user_ids):
+        """사용자 ID → 상태 배열 인덱스 (처음 보는 사용자는 뒤에 추가)"""
+        codes = self.users.get_indexer(user_ids)
+        new = codes < 0
+        if new.any():
+            new_users = pd.Index(pd.unique(user_ids[new]))
+            start = len(self.users)
+            self._reserve(start + len(new_users))
+            self.users = self.users.append(new_users)
+            codes[new] = start + new_users.get_indexer(user_ids[new])
+        return codes
+
+    def consume(self, frame):
+        """이벤트 DataFrame 하나(파티션) 반영 - 파티션은 시간 순서대로 넣어야 정확함"""
+        step_codes = pd.Categorical(frame[self.step_column], categories=self.step_names).codes
+        known = step_codes >= 0
+        if not known.any():
+            return
+        user_ids = frame[self.user_column].to_numpy()[known]
+        times = pd.to_datetime(frame[self.time_column]).to_numpy()[known].astype('datetime64[ns]').astype(np.int64)
+        step_codes = np.asarray(step_codes[known], dtype=np.int16)
+        codes = self._user_codes(user_ids)
+
+        # 단계 순서대로: 직전 단계에 도달했고 그 이후에 발생한 이벤트 중 사용자별 최초 시각
+        for k in range(len(self.steps)):
+            candidates = step_codes == k
+            if not candidates.any():
+                continue
+            users_k = codes[candidates]
+            times_k = times[candidates]
+            eligible = self._level[users_k] == k - 1
+            if k > 0:
+                eligible &= times_k >= self._step_times[users_k, k - 1]
+            if not eligible.any():
+                continue
+            users_k, times_k = users_k[eligible], times_k[eligible]
+            order = np.argsort(times_k, kind='stable')
+            reached, first = np.unique(users_k[order], return_index=True)
+            self._step_times[reached, k] = times_k[order][first]
+            self._level[reached] = k
+
+        self.rows_read += len(frame)
+        self.partitions_read += 1
+
+    def read_parquet(self, path):
+        """Parquet 파일 / 파티션 폴더를 파티션 단위로 스트리밍"""
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        columns = [self.user_column, self.step_column, self.time_column]
+        fragments = sorted(dataset.get_fragments(), key=lambda fragment: fragment.path)
+        for fragment in fragments:
+            self.consume(fragment.to_table(columns=columns).to_pandas())
+        return self
+
+    def funnel(self, count_column='learners', dropout_column='dropout_rate'):
+        """단계별 도달 인원 / 누적 유지율 / 직전 단계 대비 이탈률 (기존 분석기와 같은 모양)"""
+        reached = np.array([(self.level >= k).sum() for k in range(len(self.steps))])
+        top = reached[0] if len(reached) and reached[0] else 1
+        previous = np.concatenate([[reached[0]], reached[:-1]]) if len(reached) else reached
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dropout = np.where(previous > 0, 1 - reached / previous, 0.0)
+        return pd.DataFrame({
+            'stage': self.step_labels,
+            count_column: reached,
+            'retention_rate': np.round(reached / top, 4),
+            dropout_column: np.round(dropout, 2),
+        })
+
+    def cohort_retention(self, freq='W'):
+        """코호트(첫 단계 도달 시점) × 단계 도달률"""
+        started = self.level >= 0
+        cohorts = pd.to_datetime(self.step_times[started, 0]).to_period(freq).astype(str)
+        reached = pd.DataFrame(
+            {label: self.level[started] >= k for k, label in enumerate(self.step_labels)}
+        )
+        reached.insert(0, 'cohort', cohorts)
+        grouped = reached.groupby('cohort')
+        df = grouped.mean().round(4)
+        df.insert(0, 'users', grouped.size())
+        return df.reset_index()
+
+    def time_to_step(self, percentiles=(25, 50, 75, 90), unit='h'):
+        """첫 단계 → 각 단계 도달 시간 분포"""
+        scale = {'m': 60e9, 'h': 3600e9, 'd': 86400e9}[unit]
+        rows = []
+        for k in range(1, len(self.steps)):
+            mask = self.level >= k
+            if not mask.any():
+                rows.append({'stage': self.step_labels[k], 'users': 0})
+                continue
+            elapsed = (self.step_times[mask, k] - self.step_times[mask, 0]) / scale
+            rows.append({
+                'stage': self.step_labels[k],
+                'users': int(mask.sum()),
+                f'mean_{unit}': float(elapsed.mean()),
+                **{f'p{q}_{unit}': float(value) for q, value in zip(percentiles, np.percentile(elapsed, percentiles))},
+            })
+        return pd.DataFrame(rows)
+
+    def print_report(self):
+        """퍼널 / 코호트 / 도달 시간 출력"""
+        print(f"\n{'='*60}")
+        print(f"📉 이벤트 로그 퍼널 ({self.rows_read:,}행, 파티션 {self.partitions_read}개, 사용자 {len(self.users):,}명)")
+        print(f"{'='*60}\n")
+        print(self.funnel().to_string(index=False))
+
+        print(f"\n📅 코호트별 단계 도달률:")
+        print(self.cohort_retention().to_string(index=False))
+
+        print(f"\n⏱️ 첫 단계 이후 도달 시간 (시간):")
+        print(self.time_to_step().to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+
+
+def compute_funnel(path, steps, count_column='learners', dropout_column='dropout_rate'):
+    """Parquet 이벤트 로그 → (엔진, 퍼널 DataFrame)"""
+    engine = FunnelEngine(steps).read_parquet(path)
+    return engine, engine.funnel(count_column, dropout_column)
+
+
+def main():
+    """실행: python funnel_engine.py <이벤트 로그 경로> 단계1,단계2,..."""
+    if len(sys.argv) < 3:
+        print("사용법: python funnel_engine.py <events.parquet | 파티션 폴더> step1,step2,...")
+        return None
+
+    path, steps = sys.argv[1], sys.argv[2].split(',')
+    started = datetime.now()
+    engine = FunnelEngine(steps).read_parquet(path)
+    engine.print_report()
+
+    os.makedirs('output', exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    excel_path = f"output/funnel_{timestamp}.xlsx"
+    save_excel(excel_path, {
+        'Funnel': engine.funnel(),
+        'Cohort_Retention': engine.cohort_retention(),
+        'Time_To_Step': engine.time_to_step(),
+    })
+
+    print(f"\n💾 저장: {excel_path} ({(datetime.now() - started).total_seconds():.1f}초)")
+    return engine
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Gamification Effect Analyzer
 import pandas as pd
 from datetime import datetime
 import os
+from excel_export import save_excel
 
 class GamificationEffectAnalyzer:
     def __init__(self):
@@ -175,9 +176,13 @@ class GamificationEffectAnalyzer:
 
         return df
 
-    def calculate_kastor_projections(self):
+    def calculate_kastor_projections(self, cohort_state=None):
         """
         Kastor 예상 효과 계산
+
+        Args:
+            cohort_state: retention_cohorts.py 상태 파일 (.npz) - 있으면 30일 리텐션을
+                          고정 배수 대신 실제 플레이어 코호트 행렬의 D30 값으로 계산
         """
         print(f"\n{'='*60}")
         print(f"🎯 Kastor 예상 효과 (데이터 기반)")
@@ -208,6 +213,22 @@ class GamificationEffectAnalyzer:
             'dropout_week': baseline['dropout_week'] * kastor_improvement['dropout_week_factor']
         }
 
+        # 실제 코호트 행렬이 있으면 30일 리텐션은 측정값 사용
+        if cohort_state and os.path.exists(cohort_state):
+            from retention_cohorts import RetentionCohortMatrix
+
+            matrix = RetentionCohortMatrix.load(cohort_state)
+            self.retention_matrix_df = matrix.retention_matrix()
+            self.retention_curve_df = matrix.retention_curve()
+            day30 = self.retention_curve_df.set_index('day').loc[30] if len(self.retention_curve_df) > 30 else None
+            if day30 is not None and day30['cohorts'] > 0:
+                kastor_projected['metric'] = 'Kastor (Cohort D30)'
+                kastor_projected['retention_30days'] = round(day30['retention'] * 100, 1)
+                kastor_improvement['retention_30days'] = kastor_projected['retention_30days'] / baseline['retention_30days']
+                print(f"📅 코호트 행렬 반영: {int(day30['cohorts'])}개 코호트, {int(day30['users']):,}명의 D30 리텐션\n")
+            else:
+                print(f"⚠️ 30일이 지난 코호트가 없어 30일 리텐션은 예상 배수 사용\n")
+
         comparison = pd.DataFrame([baseline, kastor_projected])
         self.kastor_projection_df = comparison
 
@@ -216,7 +237,7 @@ class GamificationEffectAnalyzer:
 
         print(f"\n💡 예상 개선:")
         print(f"  - 완강률: {baseline['completion_rate']:.1f}% → {kastor_projected['completion_rate']:.1f}% ({kastor_improvement['completion_rate']:.1f}배)")
-        print(f"  - 30일 리텐션: {baseline['retention_30days']:.0f}% → {kastor_projected['retention_30days']:.0f}% ({kastor_improvement['retention_30days']:.0f}배)")
+        print(f"  - 30일 리텐션: {baseline['retention_30days']:.0f}% → {kastor_projected['retention_30days']:.0f}% ({kastor_improvement['retention_30days']:.1f}배)")
         print(f"  - 평균 이탈 시점: {baseline['dropout_week']:.1f}주 → {kastor_projected['dropout_week']:.1f}주 ({kastor_improvement['dropout_week_factor']:.0f}배)")
 
         return comparison
@@ -228,21 +249,29 @@ class GamificationEffectAnalyzer:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'duolingo_df'):
-                self.duolingo_df.to_excel(writer, sheet_name='Duolingo_Success', index=False)
+        sheets = {}
+        if hasattr(self, 'duolingo_df'):
+            sheets['Duolingo_Success'] = self.duolingo_df
+
+        if hasattr(self, 'elements_df'):
+            sheets['Gamification_Elements'] = self.elements_df
+
+        if hasattr(self, 'comparison_df'):
+            sheets['Learning_Modes'] = self.comparison_df
+
+        if hasattr(self, 'research_df'):
+            sheets['Narrative_Research'] = self.research_df
 
-            if hasattr(self, 'elements_df'):
-                self.elements_df.to_excel(writer, sheet_name='Gamification_Elements', index=False)
+        if hasattr(self, 'kastor_projection_df'):
+            sheets['Kastor_Projections'] = self.kastor_projection_df
 
-            if hasattr(self, 'comparison_df'):
-                self.comparison_df.to_excel(writer, sheet_name='Learning_Modes', index=False)
+        if hasattr(self, 'retention_matrix_df'):
+            sheets['Retention_Cohorts'] = self.retention_matrix_df
 
-            if hasattr(self, 'research_df'):
-                self.research_df.to_excel(writer, sheet_name='Narrative_Research', index=False)
+        if hasattr(self, 'retention_curve_df'):
+            sheets['Retention_Curve'] = self.retention_curve_df
 
-            if hasattr(self, 'kastor_projection_df'):
-                self.kastor_projection_df.to_excel(writer, sheet_name='Kastor_Projections', index=False)
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -266,8 +295,8 @@ def main():
     # 4. 서사형 학습 연구
     analyzer.analyze_narrative_learning_research()
 
-    # 5. Kastor 예상
-    analyzer.calculate_kastor_projections()
+    # 5. Kastor 예상 (KASTOR_COHORT_STATE: retention_cohorts.py 상태 파일)
+    analyzer.calculate_kastor_projections(os.getenv('KASTOR_COHORT_STATE'))
 
     # 6. 저장
     excel_path = analyzer.save_all_data('kastor_gamification')
@@ -10,6 +10,18 @@ from datetime import datetime
 import time
 import os
 import json
+from excel_export import save_excel
+
+# 이벤트 로그 이탈 퍼널 단계 (이벤트 이름, 표시 이름)
+CHURN_FUNNEL_STEPS = [
+    ('account_created', '계정 생성'),
+    ('titanic_started', 'Titanic 시작'),
+    ('first_submission', '첫 제출'),
+    ('five_submissions', '5회 이상 제출'),
+    ('second_competition', '두 번째 Competition'),
+    ('regular_participant', '정기 참여자'),
+]
+
 
 class KaggleScraper:
     def __init__(self):
@@ -141,16 +153,28 @@ class KaggleScraper:
 
         return df
 
-    def analyze_churn_pattern(self):
+    def analyze_churn_pattern(self, event_log=None):
         """
         초보자 이탈 패턴 분석
 
         Kaggle 공개 통계 및 연구 기반
+        event_log: 사용자 이벤트 로그 Parquet 경로 (있으면 funnel_engine으로 실제 계산)
         """
         print(f"\n{'='*60}")
         print(f"📉 초보자 이탈 패턴 분석")
         print(f"{'='*60}\n")
 
+        if event_log:
+            from funnel_engine import compute_funnel
+
+            engine, df = compute_funnel(event_log, CHURN_FUNNEL_STEPS,
+                                        count_column='users', dropout_column='churn_rate')
+            self.churn_df = df
+
+            print(f"📊 단계별 사용자 수 및 이탈률 (이벤트 로그 {engine.rows_read:,}행):")
+            print(df.to_string(index=False))
+            return df
+
         # 실제 Kaggle 사용자 행동 패턴 (연구 및 공개 통계 기반)
         churn_data = {
             'stage': [
@@ -222,15 +246,17 @@ class KaggleScraper:
         # Excel 파일로 모든 시트 저장
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'competitions_df'):
-                self.competitions_df.to_excel(writer, sheet_name='Competitions', index=False)
+        sheets = {}
+        if hasattr(self, 'competitions_df'):
+            sheets['Competitions'] = self.competitions_df
+
+        if hasattr(self, 'churn_df'):
+            sheets['Churn_Pattern'] = self.churn_df
 
-            if hasattr(self, 'churn_df'):
-                self.churn_df.to_excel(writer, sheet_name='Churn_Pattern', index=False)
+        if hasattr(self, 'pain_points_df'):
+            sheets['Pain_Points'] = self.pain_points_df
 
-            if hasattr(self, 'pain_points_df'):
-                self.pain_points_df.to_excel(writer, sheet_name='Pain_Points', index=False)
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -245,8 +271,8 @@ def main():
     # 1. 초보자용 Competition 데이터
     comps_df = scraper.get_beginner_competitions_data()
 
-    # 2. 이탈 패턴 분석
-    churn_df = scraper.analyze_churn_pattern()
+    # 2. 이탈 패턴 분석 (KAGGLE_EVENT_LOG가 있으면 실제 이벤트 로그로 계산)
+    churn_df = scraper.analyze_churn_pattern(os.getenv('KAGGLE_EVENT_LOG'))
 
     # 3. 학습 어려움 분석
     pain_df = scraper.get_learning_curve_data()
@@ -3,9 +3,103 @@ Market Size Analyzer (TAM / SAM / SOM)
 데이터 기반 시장 규모 추정
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import os
+from excel_export import save_excel
+
+# 몬테카를로 가정 분포 (calculate_tam_sam_som의 점추정값을 최빈값/중앙값으로 사용)
+# dist: fixed(value) / uniform(low, high) / triangular(low, mode, high)
+#       pert(low, mode, high) / normal(mean, std, 선택: min, max) / lognormal(median, sigma)
+MONTE_CARLO_ASSUMPTIONS = {
+    'sam_population_k': {'dist': 'triangular', 'low': 151.5, 'mode': 215.75, 'high': 291.5,
+                         'label': 'SAM 한국 DS 학습자 (K명)'},
+    'beginner_ratio': {'dist': 'triangular', 'low': 0.60, 'mode': 0.70, 'high': 0.80,
+                       'label': '초보자 비율'},
+    'churn_experience_ratio': {'dist': 'triangular', 'low': 0.75, 'mode': 0.85, 'high': 0.92,
+                               'label': '이탈 경험자 비율'},
+    'reach_rate': {'dist': 'triangular', 'low': 0.01, 'mode': 0.03, 'high': 0.05,
+                   'label': 'Kastor 도달률'},
+    'arpu_krw': {'dist': 'lognormal', 'median': 120_000, 'sigma': 0.25,
+                 'label': '연 ARPU (원)'},
+}
+
+MONTE_CARLO_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# 한 번에 평가하는 표본 수 (메모리 상한: 가정 5개 + 결과 4개 × 8바이트 × 청크 크기 ≈ 72MB)
+MONTE_CARLO_CHUNK_SIZE = 1_000_000
+
+
+def _sample_assumption(rng, spec, size):
+    """가정 하나를 분포에서 size개 추출 (역변환 / 넘파이 벡터 연산)"""
+    dist = spec['dist']
+    if dist == 'fixed':
+        return np.full(size, float(spec['value']))
+    if dist == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], size)
+    if dist == 'triangular':
+        # 역CDF 방식 (rng.triangular보다 2배 빠름)
+        low, mode, high = spec['low'], spec['mode'], spec['high']
+        u = rng.random(size)
+        return np.where(u < (mode - low) / (high - low),
+                        low + np.sqrt(u * ((high - low) * (mode - low))),
+                        high - np.sqrt((1 - u) * ((high - low) * (high - mode))))
+    if dist == 'pert':
+        low, mode, high = spec['low'], spec['mode'], spec['high']
+        alpha = 1 + 4 * (mode - low) / (high - low)
+        beta = 1 + 4 * (high - mode) / (high - low)
+        return low + rng.beta(alpha, beta, size) * (high - low)
+    if dist == 'normal':
+        out = rng.normal(spec['mean'], spec['std'], size)
+        return np.clip(out, spec.get('min', -np.inf), spec.get('max', np.inf))
+    if dist == 'lognormal':
+        out = rng.standard_normal(size)
+        out *= spec['sigma']
+        out += np.log(spec['median'])
+        return np.exp(out, out=out)
+    raise ValueError(f"지원하지 않는 분포: {dist}")
+
+
+def _chunk_percentiles(values, percentiles):
+    """청크 분위수 (float32 정렬 - np.percentile보다 4~5배 빠름, 유효숫자 7자리)"""
+    ordered = np.sort(values.astype(np.float32))
+    position = np.asarray(percentiles, dtype=float) / 100 * (len(ordered) - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return ordered[lower] * (1 - fraction) + ordered[upper] * fraction
+
+
+def _assumption_quantile(spec, q, n=200_000, seed=0):
+    """가정 분포의 q 분위수 (토네이도 차트의 저/고 값)"""
+    if spec['dist'] == 'fixed':
+        return float(spec['value'])
+    return float(np.quantile(_sample_assumption(np.random.default_rng(seed), spec, n), q))
+
+
+def _assumption_center(spec):
+    """토네이도 차트 기준값 (최빈값 / 중앙값)"""
+    for key in ('value', 'mode', 'median', 'mean'):
+        if key in spec:
+            return float(spec[key])
+    return (spec['low'] + spec['high']) / 2
+
+
+def _tam_sam_som_model(samples):
+    """가정 배열 dict → 결과 배열 dict (calculate_tam_sam_som과 같은 식)"""
+    sam_users_k = samples['sam_population_k']
+    arpu_m_krw = samples['arpu_krw'] / 1000  # K명 × 원 → 백만원
+    som_users_k = sam_users_k * samples['beginner_ratio']
+    som_users_k *= samples['churn_experience_ratio']
+    som_users_k *= samples['reach_rate']
+    return {
+        'sam_users_k': sam_users_k,
+        'sam_revenue_m_krw': sam_users_k * arpu_m_krw,
+        'som_users_k': som_users_k,
+        'som_revenue_m_krw': som_users_k * arpu_m_krw,
+    }
+
 
 class MarketSizeAnalyzer:
     def __init__(self):
@@ -203,6 +297,95 @@ class MarketSizeAnalyzer:
 
         return df
 
+    def run_monte_carlo(self, n_draws=10_000_000, assumptions=None, chunk_size=MONTE_CARLO_CHUNK_SIZE,
+                        percentiles=MONTE_CARLO_PERCENTILES, seed=42):
+        """
+        TAM / SAM / SOM 몬테카를로 민감도 분석
+        모든 가정을 분포에서 한 번에 배열로 추출해서 계산 (청크 단위 → 메모리 일정)
+        - 분위수: 청크별 분위수의 표본 수 가중 평균 (청크 100만 개 기준 오차 < 0.1%)
+        - 토네이도: 가정 하나만 P10/P90으로 바꾸고 나머지는 기준값일 때 SOM 매출 변화폭
+        """
+        print(f"\n{'='*60}")
+        print(f"🎲 TAM / SAM / SOM 몬테카를로 분석 ({n_draws:,}회)")
+        print(f"{'='*60}\n")
+
+        assumptions = {**MONTE_CARLO_ASSUMPTIONS, **(assumptions or {})}
+        rng = np.random.default_rng(seed)
+        started = datetime.now()
+
+        outputs = list(_tam_sam_som_model({name: np.ones(1) for name in assumptions}))
+        chunk_percentiles = {name: [] for name in outputs}
+        weights = []
+        totals = {name: 0.0 for name in outputs}
+        squares = {name: 0.0 for name in outputs}
+
+        remaining = n_draws
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            samples = {name: _sample_assumption(rng, spec, size) for name, spec in assumptions.items()}
+            results = _tam_sam_som_model(samples)
+            for name, values in results.items():
+                chunk_percentiles[name].append(_chunk_percentiles(values, percentiles))
+                totals[name] += values.sum()
+                squares[name] += np.square(values).sum()
+            weights.append(size)
+            remaining -= size
+
+        elapsed = (datetime.now() - started).total_seconds()
+        weights = np.array(weights, dtype=float)
+
+        rows = []
+        for name in outputs:
+            combined = np.average(np.vstack(chunk_percentiles[name]), axis=0, weights=weights)
+            mean = totals[name] / n_draws
+            std = np.sqrt(max(squares[name] / n_draws - mean ** 2, 0.0))
+            rows.append({'metric': name, 'mean': mean, 'std': std,
+                         **{f'p{q}': value for q, value in zip(percentiles, combined)}})
+
+        df = pd.DataFrame(rows)
+        self.monte_carlo_df = df
+
+        print(f"📊 결과 분포 (K명 / 백만원, {elapsed:.2f}초, {n_draws / max(elapsed, 1e-9) / 1e6:.1f}M회/초)")
+        print(df.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+        self.tornado_df = self.calculate_tornado(assumptions)
+
+        som = df.set_index('metric').loc['som_revenue_m_krw']
+        print(f"\n💡 SOM 매출 (연): P10 {som['p10']:,.0f}백만원 ~ P90 {som['p90']:,.0f}백만원 (중앙값 {som['p50']:,.0f}백만원)")
+        print(f"  - 가장 민감한 가정: {self.tornado_df.iloc[0]['label']}")
+
+        return df
+
+    def calculate_tornado(self, assumptions=None, metric='som_revenue_m_krw', low_q=0.10, high_q=0.90):
+        """토네이도 차트용 민감도 (변화폭이 큰 가정 순)"""
+        assumptions = assumptions or MONTE_CARLO_ASSUMPTIONS
+        base = {name: np.array([_assumption_center(spec)]) for name, spec in assumptions.items()}
+        base_value = float(_tam_sam_som_model(base)[metric][0])
+
+        rows = []
+        for name, spec in assumptions.items():
+            low_input = _assumption_quantile(spec, low_q)
+            high_input = _assumption_quantile(spec, high_q)
+            low_value = float(_tam_sam_som_model({**base, name: np.array([low_input])})[metric][0])
+            high_value = float(_tam_sam_som_model({**base, name: np.array([high_input])})[metric][0])
+            rows.append({
+                'assumption': name,
+                'label': spec.get('label', name),
+                'input_low': low_input,
+                'input_high': high_input,
+                'output_low': low_value,
+                'output_high': high_value,
+                'swing': abs(high_value - low_value),
+            })
+
+        df = pd.DataFrame(rows).sort_values('swing', ascending=False).reset_index(drop=True)
+
+        print(f"\n🌪️ 토네이도 민감도 ({metric}, 기준값 {base_value:,.1f}, P{low_q*100:.0f}~P{high_q*100:.0f})")
+        print(df[['label', 'input_low', 'input_high', 'output_low', 'output_high', 'swing']].to_string(
+            index=False, float_format=lambda v: f"{v:,.3f}"))
+
+        return df
+
     def analyze_growth_trends(self):
         """
         성장 트렌드 분석 (Google Trends 패턴)
@@ -245,21 +428,29 @@ class MarketSizeAnalyzer:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'global_market_df'):
-                self.global_market_df.to_excel(writer, sheet_name='Global_Market', index=False)
+        sheets = {}
+        if hasattr(self, 'global_market_df'):
+            sheets['Global_Market'] = self.global_market_df
 
-            if hasattr(self, 'platform_users_df'):
-                self.platform_users_df.to_excel(writer, sheet_name='Platform_Users', index=False)
+        if hasattr(self, 'platform_users_df'):
+            sheets['Platform_Users'] = self.platform_users_df
 
-            if hasattr(self, 'korean_market_df'):
-                self.korean_market_df.to_excel(writer, sheet_name='Korean_Market', index=False)
+        if hasattr(self, 'korean_market_df'):
+            sheets['Korean_Market'] = self.korean_market_df
 
-            if hasattr(self, 'tam_sam_som_df'):
-                self.tam_sam_som_df.to_excel(writer, sheet_name='TAM_SAM_SOM', index=False)
+        if hasattr(self, 'tam_sam_som_df'):
+            sheets['TAM_SAM_SOM'] = self.tam_sam_som_df
 
-            if hasattr(self, 'trends_df'):
-                self.trends_df.to_excel(writer, sheet_name='Growth_Trends', index=False)
+        if hasattr(self, 'trends_df'):
+            sheets['Growth_Trends'] = self.trends_df
+
+        if hasattr(self, 'monte_carlo_df'):
+            sheets['Monte_Carlo'] = self.monte_carlo_df
+
+        if hasattr(self, 'tornado_df'):
+            sheets['Tornado'] = self.tornado_df
+
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -283,10 +474,13 @@ def main():
     # 4. TAM/SAM/SOM 계산
     analyzer.calculate_tam_sam_som()
 
-    # 5. 성장 트렌드
+    # 5. 몬테카를로 민감도 분석
+    analyzer.run_monte_carlo()
+
+    # 6. 성장 트렌드
     analyzer.analyze_growth_trends()
 
-    # 6. 저장
+    # 7. 저장
     excel_path = analyzer.save_all_data('kastor_market_size')
 
     print(f"\n{'='*60}")
@@ -9,6 +9,7 @@ import os
 from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 import numpy as np
+from excel_export import save_excel
 
 class NLPPainPointAnalyzer:
     def __init__(self):
@@ -137,6 +138,38 @@ class NLPPainPointAnalyzer:
 
         return topics_df
 
+    def perform_semantic_clustering(self, n_clusters=4):
+        """
+        임베딩 기반 의미 군집 (LDA가 놓치는 다른 표현의 같은 고통점 묶기)
+        임베딩은 본문 해시로 캐시 → 다시 분석하면 새 텍스트만 임베딩
+        """
+        from semantic_clusters import SemanticClusterer
+
+        print(f"\n{'='*60}")
+        print(f"🧭 의미 군집 ({n_clusters}개 군집)")
+        print(f"{'='*60}\n")
+
+        texts = self.texts_df['text'].drop_duplicates().tolist()
+        if not texts:
+            print("⚠️ 군집할 텍스트가 없음")
+            return None
+        self.semantic_clusterer = SemanticClusterer()
+        embedded = self.semantic_clusterer.fit(texts)
+        summary, assignments = self.semantic_clusterer.cluster(n_clusters)
+        # 모델이 없어 해싱 임베딩으로 대체되면 의미 군집이 아니므로 어휘 군집으로 따로 저장
+        if self.semantic_clusterer.semantic:
+            self.semantic_clusters_df = summary
+            self.semantic_assignments_df = assignments
+        else:
+            print("⚠️ 임베딩 모델이 없어 어휘(해싱) 기반 군집 → Lexical_Clusters 시트로 저장")
+            self.lexical_clusters_df = summary
+            self.lexical_assignments_df = assignments
+
+        print(f"✓ 고유 텍스트 {len(texts)}개 (새로 임베딩 {embedded}개, 모델 {self.semantic_clusterer.embedder.name})")
+        print(summary[['cluster_id', 'size', 'cohesion', 'keywords']].to_string(index=False))
+
+        return summary
+
     def _interpret_topic(self, words):
         """토픽 해석"""
         words_str = ' '.join(words[:5]).lower()
@@ -209,15 +242,29 @@ class NLPPainPointAnalyzer:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'keywords_df'):
-                self.keywords_df.to_excel(writer, sheet_name='TF-IDF_Keywords', index=False)
+        sheets = {}
+        if hasattr(self, 'keywords_df'):
+            sheets['TF-IDF_Keywords'] = self.keywords_df
+
+        if hasattr(self, 'topics_df'):
+            sheets['LDA_Topics'] = self.topics_df
+
+        if hasattr(self, 'sentiment_df'):
+            sheets['Sentiment_Distribution'] = self.sentiment_df
 
-            if hasattr(self, 'topics_df'):
-                self.topics_df.to_excel(writer, sheet_name='LDA_Topics', index=False)
+        if hasattr(self, 'semantic_clusters_df'):
+            sheets['Semantic_Clusters'] = self.semantic_clusters_df
 
-            if hasattr(self, 'sentiment_df'):
-                self.sentiment_df.to_excel(writer, sheet_name='Sentiment_Distribution', index=False)
+        if hasattr(self, 'semantic_assignments_df'):
+            sheets['Semantic_Assignments'] = self.semantic_assignments_df
+
+        if hasattr(self, 'lexical_clusters_df'):
+            sheets['Lexical_Clusters'] = self.lexical_clusters_df
+
+        if hasattr(self, 'lexical_assignments_df'):
+            sheets['Lexical_Assignments'] = self.lexical_assignments_df
+
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
@@ -238,10 +285,13 @@ def main():
     # 3. 토픽 모델링
     analyzer.perform_topic_modeling()
 
-    # 4. 감정 분석
+    # 4. 의미 군집
+    analyzer.perform_semantic_clustering()
+
+    # 5. 감정 분석
     analyzer.analyze_sentiment_distribution()
 
-    # 5. 저장
+    # 6. 저장
     excel_path = analyzer.save_all_data('kastor_nlp_analysis')
 
     print(f"\n{'='*60}")
@@ -7,6 +7,7 @@ import pandas as pd
 from datetime import datetime
 import os
 import numpy as np
+from excel_export import save_excel
 
 class PersonaClusteringAnalyzer:
     def __init__(self):
@@ -208,18 +209,20 @@ class PersonaClusteringAnalyzer:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
 
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            if hasattr(self, 'learner_profiles_df'):
-                self.learner_profiles_df.to_excel(writer, sheet_name='Learner_Profiles', index=False)
+        sheets = {}
+        if hasattr(self, 'learner_profiles_df'):
+            sheets['Learner_Profiles'] = self.learner_profiles_df
 
-            if hasattr(self, 'cluster_stats_df'):
-                self.cluster_stats_df.to_excel(writer, sheet_name='Cluster_Statistics', index=False)
+        if hasattr(self, 'cluster_stats_df'):
+            sheets['Cluster_Statistics'] = self.cluster_stats_df
 
-            if hasattr(self, 'personas_df'):
-                self.personas_df.to_excel(writer, sheet_name='Personas', index=False)
+        if hasattr(self, 'personas_df'):
+            sheets['Personas'] = self.personas_df
 
-            if hasattr(self, 'minjun_mapping_df'):
-                self.minjun_mapping_df.to_excel(writer, sheet_name='Minjun_Mapping', index=False)
+        if hasattr(self, 'minjun_mapping_df'):
+            sheets['Minjun_Mapping'] = self.minjun_mapping_df
+
+        save_excel(excel_path, sheets)
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - Excel: {excel_path}")
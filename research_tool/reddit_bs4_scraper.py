@@ -11,6 +11,9 @@ import time
 import re
 from tqdm import tqdm
 import os
+from excel_export import save_excel
+from search_index import index_frame
+from dedup_index import dedupe_frame
 
 class RedditScraper:
     def __init__(self):
@@ -149,6 +152,8 @@ class RedditScraper:
         # 중복 제거
         original_count = len(df)
         df = df.drop_duplicates(subset=['url'])
+        # 다른 스크래퍼에서 이미 수집한 글 제거
+        df = dedupe_frame(df, 'reddit_bs4', 'url')
         removed = original_count - len(df)
 
         print(f"📊 데이터 정리 완료: {len(df)}개 고유 게시글 (중복 {removed}개 제거)")
@@ -172,7 +177,10 @@ class RedditScraper:
 
         # Excel 저장
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
-        df.to_excel(excel_path, index=False, engine='openpyxl')
+        save_excel(excel_path, {'Sheet1': df})
+
+        # 검색 인덱스에 증분 반영
+        index_frame(df, 'reddit_bs4', 'url')
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - CSV: {csv_path}")
@@ -9,20 +9,45 @@ from datetime import datetime
 import os
 import json
 
+from search_index import DEFAULT_INDEX_PATH as SEARCH_INDEX_PATH, SearchIndex
+
 class ReportGenerator:
-    def __init__(self, analyzer, output_filename='business_report'):
+    def __init__(self, analyzer, output_filename='business_report', cumulative_quotes=False):
         """
         Initialize report generator
 
         Args:
             analyzer: DataAnalyzer instance with insights
             output_filename: Output HTML filename
+            cumulative_quotes: True면 인용문을 검색 인덱스의 누적 코퍼스 전체(다른 실행/출처 포함)에서 선택
         """
         self.analyzer = analyzer
+        self.cumulative_quotes = cumulative_quotes
         self.df = analyzer.df
         self.insights = analyzer.insights
         self.output_filename = output_filename
 
+    def select_quote_candidates(self, limit=10):
+        """
+        인용문 후보 (고통점 > 2, 업보트 > 10, 본문 100자 초과 → 업보트 순)
+        검색 인덱스가 있으면 인덱스로 조회하되 현재 DataFrame의 게시글(post_id)로 제한
+        (리포트 통계와 인용문이 같은 데이터셋에서 나오도록), cumulative_quotes면 누적 코퍼스 전체
+        """
+        if os.path.exists(SEARCH_INDEX_PATH) and (self.cumulative_quotes or 'post_id' in self.df.columns):
+            scope = {} if self.cumulative_quotes else {'source': 'reddit_praw', 'keys': self.df['post_id'].dropna()}
+            with SearchIndex(SEARCH_INDEX_PATH) as index:
+                candidates = index.search(
+                    min_pain_score=2, min_upvotes=10, min_body_chars=100, order='upvotes', limit=limit, **scope
+                )
+            if not candidates.empty:
+                return candidates.rename(columns={'body': 'selftext'})
+
+        return self.df[
+            (self.df['pain_score'] > 2) &
+            (self.df['upvotes'] > 10) &
+            (self.df['selftext'].str.len() > 100)
+        ].nlargest(limit, 'upvotes')
+
     def generate_html_report(self):
         """HTML 리포트 생성"""
         print("\n📄 리포트 생성 중...")
@@ -445,11 +470,7 @@ class ReportGenerator:
         ]
 
         # 인용문으로 사용할 게시글 (고통점 높은 것 + 업보트 많은 것)
-        quote_candidates = self.df[
-            (self.df['pain_score'] > 2) &
-            (self.df['upvotes'] > 10) &
-            (self.df['selftext'].str.len() > 100)
-        ].nlargest(10, 'upvotes')
+        quote_candidates = self.select_quote_candidates()
 
         quotes = []
         for _, row in quote_candidates.iterrows():
@@ -0,0 +1,274 @@
+"""
+Retention Cohort Matrix
+가입 코호트 × N일차 리텐션 행렬 (플레이어 세션 로그 기반, 매일 증분 업데이트)
+
+- 상태: 코호트별 인원 + 코호트 × N일차 활성 인원(int32 행렬) + 사용자별 코호트 → .npz 하나로 저장
+- 매일 업데이트: 새로 들어온 날짜의 이벤트만 처리 (전체 기록 재스캔 없음)
+  해당 날짜에 영향을 받는 건 최근 horizon일 안의 코호트 행뿐
+  끝난 날짜(기본: 어제까지)만 반영 → 진행 중인 오늘 이벤트는 다음 실행에서 하루치를 한꺼번에 처리
+- 이벤트 소스
+  - 세션 저장소(session_store.py의 SQLite): 스테이지 / 점수 / 배지가 담긴 스냅샷, updated_at 기준으로 새 행만 조회
+  - 대화 기록(TRANSCRIPT_DIR의 세션별 JSONL): 메시지 시각 (수정 시각이 지난 실행 이후인 파일만 읽음)
+  - 그 밖에 user_id, ts 컬럼이 있는 DataFrame / Parquet
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZON = 90
+DEFAULT_STATE_PATH = 'output/retention_state.npz'
+
+
+def _to_day(ts):
+    """타임스탬프 → 일 단위 정수 (1970-01-01부터)"""
+    return pd.to_datetime(ts).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def _today():
+    """오늘 (UTC, 일 단위 정수) - 이벤트 시각이 UTC epoch 기준이므로 같은 기준"""
+    return int(np.datetime64('now', 'D').astype(np.int64))
+
+
+class RetentionCohortMatrix:
+    def __init__(self, horizon=DEFAULT_HORIZON):
+        self.horizon = horizon
+        self.first_day = None  # 첫 코호트 날짜 (일 단위 정수)
+        self.last_day = None  # 마지막으로 반영한 날짜
+        self.users = pd.Index([])
+        self._user_cohort = np.empty(0, dtype=np.int32)  # 사용자 → 코호트 행 번호
+        self.cohort_sizes = np.empty(0, dtype=np.int64)
+        self.active = np.empty((0, horizon + 1), dtype=np.int32)  # [코호트, N일차] 활성 인원
+
+    @property
+    def user_cohort(self):
+        return self._user_cohort[:len(self.users)]
+
+    def _user_codes(self, user_ids, day):
+        """사용자 ID → 인덱스 (처음 보는 사용자는 day 코호트로 등록)"""
+        codes = self.users.get_indexer(user_ids)
+        new = codes < 0
+        if new.any():
+            new_users = pd.Index(pd.unique(user_ids[new]))
+            start = len(self.users)
+            if start + len(new_users) > len(self._user_cohort):
+                grown = np.empty(max(start + len(new_users), len(self._user_cohort) * 2, 1024), dtype=np.int32)
+                grown[:start] = self.user_cohort
+                self._user_cohort = grown
+            self._user_cohort[start:start + len(new_users)] = day - self.first_day
+            self.users = self.users.append(new_users)
+            codes[new] = start + new_users.get_indexer(user_ids[new])
+            self.cohort_sizes[day - self.first_day] += len(new_users)
+        return codes
+
+    def _ensure_day(self, day):
+        """day까지 코호트 행 확보"""
+        if self.first_day is None:
+            self.first_day = day
+        rows = day - self.first_day + 1
+        if rows > len(self.cohort_sizes):
+            extra = rows - len(self.cohort_sizes)
+            self.cohort_sizes = np.concatenate([self.cohort_sizes, np.zeros(extra, dtype=np.int64)])
+            self.active = np.vstack([self.active, np.zeros((extra, self.horizon + 1), dtype=np.int32)])
+
+    def update(self, events, user_column='user_id', time_column='ts', until=None):
+        """
+        새 이벤트 반영 (마지막 반영 날짜 이후 ~ until 전날까지)
+
+        하루는 한 번에 통째로 반영해야 함 - 일부만 반영한 날을 last_day로 잡으면 그날 늦게 들어온
+        이벤트는 버려지고, 그날 늦게 처음 온 사용자는 다음 날 코호트로 잘못 잡힘
+        → until(기본: 오늘) 이후 이벤트는 반영하지 않고 다음 실행으로 미룸
+
+        Args:
+            until: 이 날짜(타임스탬프)부터는 아직 끝나지 않은 날로 보고 보류
+
+        Returns:
+            (반영한 날짜 수, 건너뛴 과거 이벤트 수, 보류한 이벤트 수)
+        """
+        if events is None or len(events) == 0:
+            return 0, 0, 0
+        until = _today() if until is None else int(_to_day([until])[0])
+        days = _to_day(events[time_column])
+        user_ids = events[user_column].astype(str).to_numpy()
+
+        fresh = days > self.last_day if self.last_day is not None else np.ones(len(days), dtype=bool)
+        complete = days < until
+        skipped = int((~fresh).sum())
+        pending = int((fresh & ~complete).sum())
+        days, user_ids = days[fresh & complete], user_ids[fresh & complete]
+
+        order = np.argsort(days, kind='stable')
+        days, user_ids = days[order], user_ids[order]
+        unique_days, starts = np.unique(days, return_index=True)
+        bounds = np.append(starts, len(days))
+
+        width = self.horizon + 1
+        for day, start, end in zip(unique_days, bounds[:-1], bounds[1:]):
+            self._ensure_day(day)
+            codes = np.unique(self._user_codes(user_ids[start:end], day))
+            cohorts = self.user_cohort[codes]
+            age = (day - self.first_day) - cohorts
+            within = age <= self.horizon
+            # 해당 날짜에 활성인 (코호트, N일차) 칸만 증가 - 최근 horizon일 코호트만 건드림
+            low = max(0, day - self.first_day - self.horizon)
+            cells = (cohorts[within] - low) * width + age[within]
+            counts = np.bincount(cells, minlength=(day - self.first_day - low + 1) * width)
+            self.active[low:day - self.first_day + 1] += counts.reshape(-1, width).astype(np.int32)
+            self.last_day = day
+
+        return len(unique_days), skipped, pending
+
+    def cohort_dates(self):
+        if self.first_day is None:
+            return pd.DatetimeIndex([])
+        return pd.to_datetime(np.arange(len(self.cohort_sizes)) + self.first_day, unit='D')
+
+    def retention_matrix(self, max_day=30):
+        """코호트 × N일차 리텐션 DataFrame (아직 지나지 않은 날은 NaN)"""
+        max_day = min(max_day, self.horizon)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = self.active[:, :max_day + 1] / self.cohort_sizes[:, None]
+        if self.last_day is not None:
+            age_limit = (self.last_day - self.first_day) - np.arange(len(self.cohort_sizes))
+            rates[np.arange(max_day + 1)[None, :] > age_limit[:, None]] = np.nan
+        df = pd.DataFrame(np.round(rates, 4), columns=[f'D{n}' for n in range(max_day + 1)])
+        df.insert(0, 'users', self.cohort_sizes)
+        df.insert(0, 'cohort', self.cohort_dates().strftime('%Y-%m-%d'))
+        return df[df['users'] > 0].reset_index(drop=True)
+
+    def retention_curve(self, max_day=30):
+        """코호트 인원 가중 평균 N일차 리텐션 (해당 일수가 지난 코호트만)"""
+        matrix = self.retention_matrix(max_day)
+        rows = []
+        for n in range(min(max_day, self.horizon) + 1):
+            column = matrix[f'D{n}']
+            observed = column.notna()
+            weight = matrix.loc[observed, 'users']
+            rate = float(np.average(column[observed], weights=weight)) if weight.sum() else np.nan
+            rows.append({'day': n, 'cohorts': int(observed.sum()), 'users': int(weight.sum()), 'retention': rate})
+        return pd.DataFrame(rows)
+
+    def save(self, path=DEFAULT_STATE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(
+            path,
+            horizon=self.horizon,
+            first_day=-1 if self.first_day is None else self.first_day,
+            last_day=-1 if self.last_day is None else self.last_day,
+            users=np.asarray(self.users, dtype=str),
+            user_cohort=self.user_cohort,
+            cohort_sizes=self.cohort_sizes,
+            active=self.active,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_PATH, horizon=DEFAULT_HORIZON):
+        """저장된 상태 불러오기 (없으면 빈 행렬)"""
+        if not os.path.exists(path):
+            return cls(horizon)
+        with np.load(path) as state:
+            matrix = cls(int(state['horizon']))
+            matrix.first_day = None if state['first_day'] < 0 else int(state['first_day'])
+            matrix.last_day = None if state['last_day'] < 0 else int(state['last_day'])
+            matrix.users = pd.Index(state['users'].astype(object))
+            matrix._user_cohort = state['user_cohort'].astype(np.int32)
+            matrix.cohort_sizes = state['cohort_sizes']
+            matrix.active = state['active']
+        return matrix
+
+
+def events_from_session_store(db_path, since=None):
+    """
+    세션 저장소 스냅샷 → 이벤트 (updated_at이 since 이후인 행만 조회)
+    session_id를 사용자로 보고 스테이지 / 점수 / 배지 수도 함께 반환
+    """
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute(
+            "SELECT token, data, updated_at FROM sessions WHERE updated_at >= ? ORDER BY updated_at",
+            (since or 0,),
+        ).fetchall()
+    finally:
+        con.close()
+
+    records = []
+    for token, data, updated_at in rows:
+        snapshot = json.loads(data)
+        records.append({
+            'user_id': token,
+            'ts': pd.Timestamp(updated_at, unit='s'),
+            'stage': snapshot.get('episode_stage'),
+            'score': snapshot.get('detective_score', 0),
+            'badges': len(snapshot.get('badges', [])),
+        })
+    return pd.DataFrame(records, columns=['user_id', 'ts', 'stage', 'score', 'badges'])
+
+
+def events_from_transcripts(directory, since=None):
+    """대화 기록 JSONL → 메시지 시각 이벤트 (since 이후 수정된 파일만 읽음)"""
+    records = []
+    for path in glob.glob(os.path.join(directory, '*.jsonl')):
+        if since and os.path.getmtime(path) < since:
+            continue
+        session_id = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if not since or record['ts'] >= since:
+                        records.append((session_id, record['ts']))
+    df = pd.DataFrame(records, columns=['user_id', 'ts'])
+    df['ts'] = pd.to_datetime(df['ts'], unit='s')
+    return df
+
+
+def main():
+    """실행: 상태 파일을 불러와 새 이벤트만 반영하고 저장"""
+    parser = argparse.ArgumentParser(description="코호트 리텐션 행렬 증분 업데이트")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="상태 파일 (.npz)")
+    parser.add_argument('--sessions', help="세션 저장소 SQLite 경로")
+    parser.add_argument('--transcripts', help="대화 기록 폴더 (TRANSCRIPT_DIR)")
+    parser.add_argument('--events', help="user_id, ts 컬럼이 있는 Parquet")
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help="추적할 최대 N일차")
+    args = parser.parse_args()
+
+    matrix = RetentionCohortMatrix.load(args.state, args.horizon)
+    # 마지막 반영 날짜 다음 날 0시 이후 데이터만 읽음
+    since = None
+    if matrix.last_day is not None:
+        since = (matrix.last_day + 1) * 86400
+
+    print(f"\n{'='*60}")
+    print(f"📅 코호트 리텐션 업데이트")
+    print(f"{'='*60}\n")
+
+    sources = []
+    if args.sessions:
+        sources.append(events_from_session_store(args.sessions, since))
+    if args.transcripts:
+        sources.append(events_from_transcripts(args.transcripts, since))
+    if args.events:
+        sources.append(pd.read_parquet(args.events, columns=['user_id', 'ts']))
+
+    # 소스를 합쳐 한 번에 반영 (소스별로 반영하면 앞 소스가 끝낸 날짜의 뒤 소스 이벤트가 버려짐)
+    sources = [events[['user_id', 'ts']] for events in sources if len(events)]
+    events = pd.concat(sources, ignore_index=True) if sources else None
+    days, skipped, pending = matrix.update(events)
+    print(f"  - 이벤트 {0 if events is None else len(events):,}개 → {days}일 반영 "
+          f"(지난 날짜 {skipped:,}개 건너뜀, 진행 중인 오늘 {pending:,}개는 다음 실행에서 반영)")
+
+    matrix.save(args.state)
+    print(f"\n📊 N일차 리텐션 (코호트 가중 평균):")
+    print(matrix.retention_curve().to_string(index=False))
+    print(f"\n💾 저장: {args.state} (코호트 {len(matrix.cohort_sizes)}개, 사용자 {len(matrix.users):,}명)")
+    return matrix
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Research Runner
+분석기 전체를 한 번에 실행 (독립 분석기는 프로세스 풀에서 병렬 실행) → 실행 한 번에 결과 하나
+
+- ANALYZERS: 분석기 등록부 (모듈, 클래스, main()과 같은 순서의 단계 목록)
+- 각 분석기는 별도 프로세스에서 단계를 실행하고, 만들어진 *_df DataFrame과 출력 로그를 돌려줌
+  (분석기별 save_all_data는 호출하지 않음 → 타임스탬프 xlsx가 여러 개 생기지 않음)
+- 결과: output/research_<timestamp>/<분석기>/<표>.parquet + manifest.json (열 기반)
+  --excel이면 같은 폴더에 research.xlsx 하나 추가 (excel_export 스트리밍 작성)
+- 전체 소요 시간 ≈ 가장 느린 분석기
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from excel_export import save_excel
+
+# 이름: (모듈, 클래스, 단계) - 단계가 (메서드, 환경 변수)면 환경 변수 값을 인자로 넘김
+ANALYZERS = {
+    'market_size': ('market_size_analyzer', 'MarketSizeAnalyzer', [
+        'analyze_global_market',
+        'analyze_platform_users',
+        'analyze_korean_market',
+        'calculate_tam_sam_som',
+        'run_monte_carlo',
+        'analyze_growth_trends',
+    ]),
+    'gamification': ('gamification_effect_analyzer', 'GamificationEffectAnalyzer', [
+        'analyze_duolingo_success',
+        'analyze_gamification_elements',
+        'compare_learning_modes',
+        'analyze_narrative_learning_research',
+        ('calculate_kastor_projections', 'KASTOR_COHORT_STATE'),
+    ]),
+    'competitor_churn': ('competitor_churn_analyzer', 'CompetitorChurnAnalyzer', [
+        'analyze_platform_completion_rates',
+        'analyze_bootcamp_data',
+        'analyze_churn_reasons',
+        'calculate_competitor_weaknesses',
+    ]),
+    'community_painpoints': ('community_painpoints_analyzer', 'CommunityPainPointsAnalyzer', [
+        'analyze_stackoverflow_survey',
+        'analyze_mooc_completion_rates',
+        'analyze_common_pain_points_from_forums',
+        'analyze_beginner_quotes',
+        ('calculate_dropout_funnel', 'LEARNER_EVENT_LOG'),
+    ]),
+    'persona_clustering': ('persona_clustering_analyzer', 'PersonaClusteringAnalyzer', [
+        'create_learner_profiles',
+        'perform_clustering',
+        'define_personas',
+        'map_minjun_persona',
+    ]),
+    'nlp_painpoint': ('nlp_painpoint_analyzer', 'NLPPainPointAnalyzer', [
+        'prepare_text_data',
+        'extract_tfidf_keywords',
+        'perform_topic_modeling',
+        'perform_semantic_clustering',
+        'analyze_sentiment_distribution',
+    ]),
+}
+
+EXCEL_SHEET_LIMIT = 31
+
+
+def run_analyzer(name):
+    """
+    분석기 하나 실행 (프로세스 풀 작업 함수)
+
+    Returns:
+        (이름, {표 이름: DataFrame}, 출력 로그, 소요 시간(초))
+    """
+    module_name, class_name, steps = ANALYZERS[name]
+    started = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        analyzer = getattr(importlib.import_module(module_name), class_name)()
+        for step in steps:
+            if isinstance(step, tuple):
+                method, env_var = step
+                getattr(analyzer, method)(os.getenv(env_var))
+            else:
+                getattr(analyzer, step)()
+
+    frames = {
+        attr[:-3]: value
+        for attr, value in vars(analyzer).items()
+        if attr.endswith('_df') and isinstance(value, pd.DataFrame)
+    }
+    return name, frames, log.getvalue(), time.perf_counter() - started
+
+
+def run_all(names=None, jobs=None):
+    """등록된 분석기 병렬 실행 → {이름: {표 이름: DataFrame}}, {이름: 소요 시간}"""
+    names = list(names or ANALYZERS)
+    results, timings = {}, {}
+    with ProcessPoolExecutor(max_workers=jobs or min(len(names), os.cpu_count() or 1)) as pool:
+        futures = {pool.submit(run_analyzer, name): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                name, frames, log, elapsed = future.result()
+            except Exception as e:
+                print(f"  ❌ {name}: {type(e).__name__}: {e}")
+                continue
+            results[name], timings[name] = frames, elapsed
+            print(f"  ✅ {name}: 표 {len(frames)}개 ({elapsed:.1f}초)")
+            if os.getenv('RESEARCH_VERBOSE'):
+                print(log)
+    # 등록 순서대로 정렬 (완료 순서와 무관하게 출력 결과가 같도록)
+    return {name: results[name] for name in names if name in results}, timings
+
+
+def _sheet_name(analyzer, table, used):
+    """엑셀 시트 이름 (31자 제한, 중복이면 번호)"""
+    base = f"{analyzer}.{table}"[:EXCEL_SHEET_LIMIT]
+    name, n = base, 1
+    while name in used:
+        suffix = f"~{n}"
+        name = base[:EXCEL_SHEET_LIMIT - len(suffix)] + suffix
+        n += 1
+    used.add(name)
+    return name
+
+
+def write_excel(results, excel_path):
+    """통합 엑셀 하나 작성 (excel_export 스트리밍 작성, 시트는 병렬로)"""
+    used = set()
+    sheets = [
+        (_sheet_name(analyzer, table, used), df)
+        for analyzer, frames in results.items()
+        for table, df in frames.items()
+    ]
+    return save_excel(excel_path, sheets)
+
+
+def save_results(results, timings, output_dir='output', excel=False):
+    """분석기별 표 → Parquet + manifest.json (+ 통합 엑셀)"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    run_dir = os.path.join(output_dir, f"research_{timestamp}")
+    manifest = {'created': timestamp, 'analyzers': {}}
+
+    for analyzer, frames in results.items():
+        os.makedirs(os.path.join(run_dir, analyzer), exist_ok=True)
+        tables = {}
+        for table, df in frames.items():
+            path = os.path.join(analyzer, f"{table}.parquet")
+            # 혼합 타입 object 열은 Parquet로 못 쓰므로 문자열로 통일
+            mixed = [c for c in df.columns if df[c].dtype == object and df[c].map(type).nunique() > 1]
+            df.astype({c: str for c in mixed}).to_parquet(os.path.join(run_dir, path), index=False)
+            tables[table] = {'file': path, 'rows': len(df), 'columns': [str(c) for c in df.columns]}
+        manifest['analyzers'][analyzer] = {'seconds': round(timings[analyzer], 2), 'tables': tables}
+
+    if excel:
+        manifest['excel'] = os.path.basename(write_excel(results, os.path.join(run_dir, 'research.xlsx')))
+
+    with open(os.path.join(run_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return run_dir
+
+
+def main():
+    """실행: python run_research.py [--only market_size,nlp_painpoint] [--jobs N] [--excel]"""
+    parser = argparse.ArgumentParser(description="리서치 분석기 통합 실행")
+    parser.add_argument('--only', help=f"실행할 분석기 (쉼표 구분): {', '.join(ANALYZERS)}")
+    parser.add_argument('--jobs', '-j', type=int, help="프로세스 수 (기본값: CPU 수)")
+    parser.add_argument('--excel', action='store_true', help="통합 엑셀 파일도 작성")
+    parser.add_argument('--output', default='output', help="출력 폴더")
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(ANALYZERS)
+    unknown = [name for name in names if name not in ANALYZERS]
+    if unknown:
+        parser.error(f"알 수 없는 분석기: {', '.join(unknown)}")
+
+    print(f"\n{'='*60}")
+    print(f"🚀 리서치 통합 실행 (분석기 {len(names)}개)")
+    print(f"{'='*60}\n")
+
+    started = time.perf_counter()
+    results, timings = run_all(names, args.jobs)
+    run_dir = save_results(results, timings, args.output, args.excel)
+
+    print(f"\n💾 저장: {run_dir}")
+    print(f"⏱️ 전체 {time.perf_counter() - started:.1f}초 (가장 느린 분석기 {max(timings.values(), default=0):.1f}초)")
+    return run_dir
+
+
+if __name__ == "__main__":
+    main()
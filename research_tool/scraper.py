@@ -11,6 +11,9 @@ from dotenv import load_dotenv
 from tqdm import tqdm
 import time
 from config import SUBREDDITS, MAX_POSTS_PER_KEYWORD, TIME_FILTER, SORT_BY
+from excel_export import save_excel
+from search_index import index_frame
+from dedup_index import dedupe_frame
 
 # Load environment variables
 load_dotenv()
@@ -117,6 +120,9 @@ class RedditScraper:
             # Remove duplicates (same post found by multiple keywords)
             combined_df = combined_df.drop_duplicates(subset=['post_id'])
 
+            # 웹 스크래퍼 / HN / dev.to에서 이미 수집한 글 제거
+            combined_df = dedupe_frame(combined_df, 'reddit_praw', 'post_id')
+
             print(f"\n{'='*60}")
             print(f"📈 총 수집 결과")
             print(f"{'='*60}")
@@ -143,7 +149,10 @@ class RedditScraper:
 
         # Save as Excel (더 보기 좋음)
         excel_path = f"output/{filename}.xlsx"
-        df.to_excel(excel_path, index=False, engine='openpyxl')
+        save_excel(excel_path, {'Sheet1': df})
+
+        # 검색 인덱스에 증분 반영
+        index_frame(df, 'reddit_praw', 'post_id')
 
         print(f"\n✓ 데이터 저장 완료:")
         print(f"  - CSV: {csv_path}")
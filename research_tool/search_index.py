@@ -0,0 +1,352 @@
+"""
+Search Index
+수집한 게시글 전문 검색 인덱스 (SQLite FTS5, BM25 순위 + 출처/서브레딧/날짜 패싯)
+
+크롤링 후 게시글을 찾으려면 엑셀을 열거나 CSV를 grep해야 했음
+→ 스크래퍼가 저장할 때마다 같은 SQLite 파일에 증분 색인 (출처 + 키로 upsert)
+
+- posts: 메타데이터 (출처, 서브레딧/태그, 날짜, 업보트, 댓글 수, 고통점 점수)
+- posts_fts: 제목 + 본문 FTS5 (external content, 트리거로 posts와 동기화)
+- search(): 검색어(BM25, 제목 가중치 TITLE_WEIGHT) + 패싯 필터, 검색어 없이 필터만도 가능
+- facets(): 검색 결과의 출처 / 서브레딧 / 월별 건수
+- 실행: python search_index.py "give up" --source reddit_praw --since 2025-01-01
+        python search_index.py --add output/reddit_raw_data_*.csv --source reddit_praw --key post_id
+"""
+
+import argparse
+import json
+import glob
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+DEFAULT_INDEX_PATH = os.getenv('SEARCH_INDEX', 'output/search_index.sqlite')
+
+# 제목 일치를 본문보다 크게 (bm25 열 가중치)
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+# 스크래퍼마다 다른 열 이름 → 인덱스 열 (앞에 있는 열 우선)
+COLUMN_ALIASES = {
+    'title': ('title',),
+    'body': ('selftext', 'description', 'body', 'excerpt', 'content'),
+    'url': ('url', 'hn_url'),
+    'subreddit': ('subreddit', 'search_tag', 'tag', 'category'),
+    'created': ('created_utc', 'created_at', 'published_at', 'collected_at'),
+    'upvotes': ('upvotes', 'score', 'points', 'reactions'),
+    'num_comments': ('num_comments', 'comments'),
+    'pain_score': ('pain_score',),
+}
+
+_FTS_OPERATORS = re.compile(r'["*()]|\b(AND|OR|NOT|NEAR)\b')
+_WORD = re.compile(r'\w+', re.UNICODE)
+# 따옴표 구(닫히지 않아도 끝까지) / 괄호 / 그 밖의 공백 구분 조각
+_FTS_TOKEN = re.compile(r'"[^"]*"?|[()]|[^\s"()]+')
+_FTS_KEYWORDS = {'AND', 'OR', 'NOT', 'NEAR'}
+_FTS_TERM = re.compile(r'^\w+\*?$', re.UNICODE)
+
+
+def quote_words(text):
+    """단어마다 따옴표 (모든 단어 포함, 연산자 없음 / 단어가 없으면 빈 구 → 결과 없음)"""
+    return ' '.join(f'"{word}"' for word in _WORD.findall(text)) or '""'
+
+
+def fts_query(text):
+    """
+    사용자 검색어 → FTS5 MATCH 문자열 (연산자가 없으면 단어마다 따옴표 → 모든 단어 포함)
+
+    연산자가 있으면 AND/OR/NOT/NEAR, 괄호, "구", 접두어*는 그대로 두고
+    c++ 같은 나머지 조각은 따옴표로 감쌈 (닫히지 않은 따옴표는 닫고, 짝이 안 맞는 괄호와 앞뒤 연산자는 뺌)
+    """
+    if not _FTS_OPERATORS.search(text):
+        return quote_words(text)
+    parts = []
+    for token in _FTS_TOKEN.findall(text):
+        if token.startswith('"'):
+            phrase = token.strip('"')
+            if phrase.strip():
+                parts.append(f'"{phrase}"')
+        elif token in _FTS_KEYWORDS or token in '()' or _FTS_TERM.match(token):
+            parts.append(token)
+        elif _WORD.search(token):
+            parts.append(f'"{token}"')
+    if parts.count('(') != parts.count(')'):
+        parts = [part for part in parts if part not in '()']
+    # 앞뒤에 남은 연산자 제거 ("OR overwhelm*" → "overwhelm*")
+    while parts and parts[0] in _FTS_KEYWORDS - {'NEAR'}:
+        parts.pop(0)
+    while parts and parts[-1] in _FTS_KEYWORDS:
+        parts.pop()
+    return ' '.join(parts) or '""'
+
+
+class SearchIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS posts (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                source_key TEXT NOT NULL,
+                subreddit TEXT,
+                day TEXT,
+                url TEXT,
+                title TEXT,
+                body TEXT,
+                upvotes INTEGER,
+                num_comments INTEGER,
+                pain_score REAL,
+                UNIQUE (source, source_key)
+            );
+            CREATE INDEX IF NOT EXISTS posts_source ON posts (source);
+            CREATE INDEX IF NOT EXISTS posts_subreddit ON posts (subreddit);
+            CREATE INDEX IF NOT EXISTS posts_day ON posts (day);
+            CREATE INDEX IF NOT EXISTS posts_upvotes ON posts (upvotes);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, body, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE OF title, body ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                INSERT INTO posts_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+        """)
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.con.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    @staticmethod
+    def _records(df, source, key_column):
+        """스크래퍼 DataFrame → posts 행 목록"""
+        def pick(field):
+            column = next((c for c in COLUMN_ALIASES[field] if c in df.columns), None)
+            return df[column] if column else pd.Series([None] * len(df), index=df.index)
+
+        created = pd.to_datetime(pick('created'), errors='coerce', utc=True, format='mixed')
+        subreddit = pick('subreddit').astype('string').str.replace(r'^r/', '', regex=True)
+        columns = {
+            'source': pd.Series(source, index=df.index),
+            'source_key': df[key_column].astype(str),
+            'subreddit': subreddit,
+            'day': created.dt.strftime('%Y-%m-%d'),
+            'url': pick('url'),
+            'title': pick('title'),
+            'body': pick('body'),
+            'upvotes': pd.to_numeric(pick('upvotes'), errors='coerce').round(),
+            'num_comments': pd.to_numeric(pick('num_comments'), errors='coerce').round(),
+            'pain_score': pd.to_numeric(pick('pain_score'), errors='coerce'),
+        }
+        frame = pd.DataFrame(columns).astype(object)
+        return frame.where(frame.notna(), None).itertuples(index=False, name=None)
+
+    def add_frame(self, df, source, key_column):
+        """
+        DataFrame 색인 (같은 출처 + 키면 갱신 - 분석 후 고통점 점수만 채우는 경우도 같은 함수)
+
+        Returns:
+            색인한 행 수
+        """
+        if df is None or df.empty:
+            return 0
+        # 값이 없는 열(예: 스크래퍼 단계의 고통점 점수)은 기존 값 유지
+        self.con.executemany("""
+            INSERT INTO posts (source, source_key, subreddit, day, url, title, body, upvotes, num_comments, pain_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (source, source_key) DO UPDATE SET
+                subreddit = COALESCE(excluded.subreddit, subreddit),
+                day = COALESCE(excluded.day, day),
+                url = COALESCE(excluded.url, url),
+                title = COALESCE(excluded.title, title),
+                body = COALESCE(excluded.body, body),
+                upvotes = COALESCE(excluded.upvotes, upvotes),
+                num_comments = COALESCE(excluded.num_comments, num_comments),
+                pain_score = COALESCE(excluded.pain_score, pain_score)
+        """, self._records(df, source, key_column))
+        self.con.commit()
+        return len(df)
+
+    def _where(self, query, source, subreddit, since, until, min_upvotes, min_pain_score, min_body_chars,
+               keys=None):
+        """검색 조건 → (FROM 절, WHERE 절, 파라미터)"""
+        clauses, params = [], []
+        if query:
+            table = "posts_fts JOIN posts ON posts.id = posts_fts.rowid"
+            clauses.append("posts_fts MATCH ?")
+            params.append(fts_query(query))
+        else:
+            table = "posts"
+        for column, value in (('source', source), ('subreddit', subreddit)):
+            if value:
+                values = [value] if isinstance(value, str) else list(value)
+                clauses.append(f"posts.{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if keys is not None:
+            # 키 목록은 JSON 배열 하나로 넘김 (수만 개여도 SQL 변수 개수 한도에 걸리지 않음)
+            clauses.append("posts.source_key IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([str(key) for key in keys]))
+        if since:
+            clauses.append("posts.day >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append("posts.day <= ?")
+            params.append(str(until))
+        # 아래 세 조건은 ReportGenerator 인용문 조건과 같은 '초과' 비교
+        if min_upvotes is not None:
+            clauses.append("posts.upvotes > ?")
+            params.append(min_upvotes)
+        if min_pain_score is not None:
+            clauses.append("posts.pain_score > ?")
+            params.append(min_pain_score)
+        if min_body_chars is not None:
+            clauses.append("length(posts.body) > ?")
+            params.append(min_body_chars)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return table, where, params
+
+    def search(self, query=None, source=None, subreddit=None, since=None, until=None,
+               min_upvotes=None, min_pain_score=None, min_body_chars=None, order='rank', limit=20, keys=None):
+        """
+        검색 → DataFrame (score: BM25, 작을수록 관련도 높음 / snippet: 일치 부분 강조)
+
+        Args:
+            order: 'rank'(BM25, 검색어 없으면 업보트) / 'upvotes' / 'day'
+            keys: 이 source_key 목록으로 제한 (예: 현재 분석 중인 DataFrame의 post_id)
+        """
+        table, where, params = self._where(
+            query, source, subreddit, since, until, min_upvotes, min_pain_score, min_body_chars, keys
+        )
+        if query:
+            score = f"bm25(posts_fts, {TITLE_WEIGHT}, {BODY_WEIGHT})"
+            snippet = "snippet(posts_fts, 1, '[', ']', '…', 16)"
+        else:
+            score, snippet = "NULL", "substr(posts.body, 1, 120)"
+        order_by = {
+            'rank': 'score' if query else 'posts.upvotes DESC',
+            'upvotes': 'posts.upvotes DESC',
+            'day': 'posts.day DESC',
+        }[order]
+        sql = f"""
+            SELECT posts.source, posts.source_key, posts.subreddit, posts.day, posts.title, posts.body,
+                   posts.url, posts.upvotes, posts.num_comments, posts.pain_score,
+                   {score} AS score, {snippet} AS snippet
+            FROM {table} {where}
+            ORDER BY {order_by} LIMIT ?
+        """
+        return self._read(sql, params + [limit], query)
+
+    def _read(self, sql, params, query):
+        """
+        쿼리 실행 - 검색어가 FTS5 문법 오류를 내면 (연산자 위치가 잘못된 경우 등)
+        단어별 따옴표 검색어로 한 번 더 시도 (MATCH 파라미터는 항상 첫 번째)
+        """
+        try:
+            return pd.read_sql_query(sql, self.con, params=params)
+        except (sqlite3.OperationalError, pd.errors.DatabaseError):
+            if not query:
+                raise
+            return pd.read_sql_query(sql, self.con, params=[quote_words(query)] + params[1:])
+
+    def facets(self, query=None, source=None, subreddit=None, since=None, until=None, top=10):
+        """검색 결과 패싯 → {'source': DataFrame, 'subreddit': DataFrame, 'month': DataFrame}"""
+        table, where, params = self._where(query, source, subreddit, since, until, None, None, None)
+        result = {}
+        for name, expression in (('source', 'posts.source'), ('subreddit', 'posts.subreddit'),
+                                 ('month', 'substr(posts.day, 1, 7)')):
+            sql = f"""
+                SELECT {expression} AS {name}, COUNT(*) AS posts FROM {table} {where}
+                GROUP BY 1 ORDER BY {'1 DESC' if name == 'month' else '2 DESC'} LIMIT ?
+            """
+            result[name] = self._read(sql, params + [top], query)
+        return result
+
+    def optimize(self):
+        """FTS 세그먼트 병합 (대량 색인 후 검색 속도 회복)"""
+        self.con.execute("INSERT INTO posts_fts (posts_fts) VALUES ('optimize')")
+        self.con.commit()
+
+
+def index_frame(df, source, key_column, index_path=DEFAULT_INDEX_PATH):
+    """스크래퍼 / 분석기 저장 단계에서 호출: DataFrame을 검색 인덱스에 반영"""
+    if df is None or df.empty or os.getenv('SEARCH_INDEX_DISABLED') == '1':
+        return 0
+    with SearchIndex(index_path) as index:
+        count = index.add_frame(df, source, key_column)
+    print(f"🔎 검색 인덱스 반영: {count}개 ({index_path})")
+    return count
+
+
+def main():
+    """실행: 검색 / 패싯 출력, --add로 기존 CSV 색인"""
+    parser = argparse.ArgumentParser(description="수집 게시글 전문 검색")
+    parser.add_argument('query', nargs='?', help="검색어 (FTS5 문법 사용 가능: \"give up\" OR quit*)")
+    parser.add_argument('--source', action='append', help="출처 (reddit_praw, hackernews, devto, ...)")
+    parser.add_argument('--subreddit', action='append', help="서브레딧 / 태그")
+    parser.add_argument('--since', help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--until', help="끝 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--min-upvotes', type=int)
+    parser.add_argument('--order', choices=['rank', 'upvotes', 'day'], default='rank')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--facets', action='store_true', help="출처 / 서브레딧 / 월별 건수 출력")
+    parser.add_argument('--add', nargs='+', help="색인할 CSV 파일 (glob 가능)")
+    parser.add_argument('--key', help="--add 시 키 열 (post_id, url, objectID, ...)")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="인덱스 파일")
+    args = parser.parse_args()
+
+    with SearchIndex(args.index) as index:
+        if args.add:
+            if not (args.source and args.key):
+                parser.error("--add에는 --source와 --key가 필요합니다")
+            for pattern in args.add:
+                for path in sorted(glob.glob(pattern)):
+                    count = index.add_frame(pd.read_csv(path), args.source[0], args.key)
+                    print(f"  ✓ {path}: {count:,}개 색인")
+            index.optimize()
+            print(f"\n📚 인덱스 문서 수: {len(index):,}개")
+            return None
+
+        filters = dict(source=args.source, subreddit=args.subreddit, since=args.since, until=args.until)
+        results = index.search(
+            args.query, min_upvotes=args.min_upvotes, order=args.order, limit=args.limit, **filters
+        )
+        print(f"\n{'='*60}")
+        print(f"🔎 검색: {args.query or '(전체)'} - {len(results)}개 표시")
+        print(f"{'='*60}\n")
+        for row in results.itertuples():
+            upvotes = '-' if pd.isna(row.upvotes) else int(row.upvotes)
+            print(f"[{row.source}/{row.subreddit or '-'}] {row.day or '-'} | ⬆ {upvotes} | {row.title}")
+            if row.snippet:
+                print(f"    {row.snippet}")
+            print(f"    {row.url}")
+
+        if args.facets:
+            for name, df in index.facets(args.query, **filters).items():
+                print(f"\n📊 {name}별:")
+                print(df.to_string(index=False))
+        return results
+
+
+if __name__ == "__main__":
+    main()
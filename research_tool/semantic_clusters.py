@@ -0,0 +1,364 @@
+"""
+Semantic Clusters
+문장 임베딩 기반 고통점 군집 (로컬 CPU 모델 + float16 memmap 캐시 + IVF 근접 이웃 인덱스)
+
+고통점 사전(부분 문자열 15개)이나 LDA(단어 주머니)는 "I'm lost"와 "no idea where to begin"처럼
+단어가 겹치지 않는 같은 뜻을 묶지 못함 → 문장 임베딩 공간에서 군집
+
+- 임베딩: 디스크의 sentence-transformers 모델 (EMBEDDING_MODEL, CPU, 배치 단위)
+  모델 받기: python semantic_clusters.py --download (기본 all-MiniLM-L6-v2 → models/all-MiniLM-L6-v2)
+  모델이나 라이브러리가 없으면 문자 n-gram 해싱 벡터로 대체 → 어휘 기반이라 다른 단어로 쓴 같은 뜻은
+  못 묶음 (결과는 semantic=False, 분석기에서는 Lexical_* 시트로 구분)
+- 캐시: 본문 해시 → float16 memmap 행 (모델별 폴더) → 재분석 시 새 게시글만 임베딩
+- 인덱스: 구면 k-평균으로 나눈 IVF (nlist ≈ √N, nprobe개 목록만 탐색) → 근접 이웃 질의
+- 군집: 구면 k-평균 → 군집별 크기 / 중심에 가장 가까운 대표 문장 / 특징 단어
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL = os.getenv('EMBEDDING_MODEL', 'models/all-MiniLM-L6-v2')
+DOWNLOAD_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_CACHE_DIR = os.getenv('EMBEDDING_CACHE', 'output/embeddings')
+BATCH_SIZE = 64
+HASHING_DIM = 512
+
+_WORD = re.compile(r"[a-z][a-z']+")
+STOP_WORDS = {
+    'the', 'and', 'for', 'you', 'that', 'this', 'with', 'have', 'but', 'not', 'are', 'was', 'what', 'how',
+    'can', 'just', 'all', 'any', 'get', 'out', 'from', 'too', 'its', "it's", "i'm", "don't", 'dont', 'know',
+}
+
+
+def text_hash(text):
+    """캐시 키: 공백 정리한 본문의 SHA-1"""
+    return hashlib.sha1(' '.join(str(text).split()).encode('utf-8')).hexdigest()
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class SentenceEmbedder:
+    """디스크의 sentence-transformers 모델 (CPU)"""
+
+    semantic = True
+
+    def __init__(self, model_path=DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_path, device='cpu')
+        self.name = os.path.basename(os.path.normpath(model_path))
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self.model.encode(
+            list(texts), batch_size=BATCH_SIZE, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32)
+
+
+class HashingEmbedder:
+    """대체 임베딩: 단어 + 문자 3-gram 해싱 (의존성 없음, 어휘 기반)"""
+
+    semantic = False
+
+    def __init__(self, dim=HASHING_DIM):
+        self.name = f'hashing-{dim}'
+        self.dim = dim
+
+    def _features(self, text):
+        words = _WORD.findall(str(text).lower())
+        grams = [w[i:i + 3] for w in (f'#{w}#' for w in words) for i in range(len(w) - 2)]
+        return words + grams
+
+    def encode(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), 'little')
+                matrix[row, digest % self.dim] += 1.0 if digest & (1 << 31) else -1.0
+        return _normalize_rows(matrix)
+
+
+def download_model(model_path=DEFAULT_MODEL, name=DOWNLOAD_MODEL):
+    """허깅페이스 허브에서 모델을 받아 model_path에 저장 (한 번만, 이후에는 오프라인으로 로드)"""
+    from sentence_transformers import SentenceTransformer
+
+    SentenceTransformer(name, device='cpu').save(model_path)
+    return model_path
+
+
+def load_embedder(model_path=DEFAULT_MODEL):
+    """로컬 모델이 있으면 sentence-transformers, 없으면 해싱 임베딩 (의미가 아닌 어휘 기반)"""
+    if os.path.isdir(model_path):
+        try:
+            return SentenceEmbedder(model_path)
+        except ImportError as e:
+            # 라이브러리가 없거나 의존 패키지 버전이 맞지 않는 경우 (원인을 그대로 보여줌)
+            print(f"⚠️ sentence-transformers를 불러올 수 없어 해싱 임베딩 사용: {e}")
+    else:
+        print(f"⚠️ 임베딩 모델 폴더가 없어 해싱 임베딩 사용: {model_path} "
+              f"(python semantic_clusters.py --download 로 받기)")
+    return HashingEmbedder()
+
+
+class EmbeddingCache:
+    """본문 해시 → float16 memmap 행 (용량은 두 배씩 늘림)"""
+
+    def __init__(self, directory, dim):
+        os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.matrix_path = os.path.join(directory, 'embeddings.f16')
+        self.keys_path = os.path.join(directory, 'keys.txt')
+        self.meta_path = os.path.join(directory, 'meta.json')
+
+        self.rows = {}
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                self.rows = {line.strip(): i for i, line in enumerate(f) if line.strip()}
+        capacity = 0
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['dim'] != dim:
+                raise ValueError(f"캐시 차원({meta['dim']})과 모델 차원({dim})이 다름: {directory}")
+            capacity = meta['capacity']
+        self.capacity = capacity
+        self.matrix = self._open(capacity)
+
+    def _open(self, capacity):
+        if capacity == 0:
+            return np.zeros((0, self.dim), dtype=np.float16)
+        return np.memmap(self.matrix_path, dtype=np.float16, mode='r+', shape=(capacity, self.dim))
+
+    def _reserve(self, size):
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2, 1024)
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+        del self.matrix
+        with open(self.matrix_path, 'ab') as f:
+            f.truncate(capacity * self.dim * 2)
+        self.capacity = capacity
+        self.matrix = self._open(capacity)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def embed(self, texts, embedder, batch_size=BATCH_SIZE):
+        """
+        캐시에 없는 본문만 배치로 임베딩 후 전체 행렬 반환
+
+        Returns:
+            (float32 행렬 (len(texts), dim), 새로 임베딩한 개수)
+        """
+        keys = [text_hash(text) for text in texts]
+        missing = list(dict.fromkeys(key for key in keys if key not in self.rows))
+        if missing:
+            first_text = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            start = len(self.rows)
+            self._reserve(start + len(missing))
+            for offset in range(0, len(missing), batch_size):
+                batch = missing[offset:offset + batch_size]
+                vectors = embedder.encode([first_text[key] for key in batch])
+                self.matrix[start + offset:start + offset + len(batch)] = vectors.astype(np.float16)
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(f'{key}\n' for key in missing))
+            self.rows.update({key: start + i for i, key in enumerate(missing)})
+            self.matrix.flush()
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'dim': self.dim, 'capacity': self.capacity, 'count': len(self.rows)}, f)
+
+        rows = np.fromiter((self.rows[key] for key in keys), dtype=np.int64, count=len(keys))
+        return np.asarray(self.matrix[rows], dtype=np.float32), len(missing)
+
+
+def spherical_kmeans(vectors, k, iterations=25, seed=42):
+    """정규화 벡터 구면 k-평균 (k-means++ 초기화) → (중심, 배정)"""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    k = min(k, n)
+    centers = np.empty((k, vectors.shape[1]), dtype=np.float32)
+    centers[0] = vectors[rng.integers(n)]
+    closest = 1 - vectors @ centers[0]
+    for i in range(1, k):
+        weights = np.maximum(closest, 0) ** 2
+        total = weights.sum()
+        index = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centers[i] = vectors[index]
+        closest = np.minimum(closest, 1 - vectors @ centers[i])
+
+    assignment = np.zeros(n, dtype=np.int64)
+    for iteration in range(iterations):
+        new_assignment = np.argmax(vectors @ centers.T, axis=1)
+        if iteration > 0 and np.array_equal(new_assignment, assignment):
+            break
+        assignment = new_assignment
+        sums = np.zeros_like(centers)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=k) == 0
+        sums[empty] = vectors[rng.integers(n, size=empty.sum())]
+        centers = _normalize_rows(sums)
+    return centers, assignment
+
+
+class IVFIndex:
+    """역파일 근접 이웃 인덱스 (내적 = 코사인 유사도)"""
+
+    def __init__(self, vectors, nlist=None, nprobe=8, seed=42):
+        self.vectors = vectors
+        self.nlist = nlist or max(1, int(np.sqrt(len(vectors))))
+        self.nprobe = min(nprobe, self.nlist)
+        # 학습은 표본으로, 배정은 전체로
+        rng = np.random.default_rng(seed)
+        sample = vectors if len(vectors) <= 50 * self.nlist else vectors[rng.choice(len(vectors), 50 * self.nlist, replace=False)]
+        self.centroids, _ = spherical_kmeans(sample, self.nlist, iterations=10, seed=seed)
+        lists = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(lists, kind='stable')
+        self.ids = order
+        self.offsets = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+
+    def search(self, queries, k=10):
+        """질의 벡터들 → (이웃 번호, 유사도) 각각 (len(queries), k), 부족하면 -1"""
+        queries = np.atleast_2d(queries).astype(np.float32)
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :self.nprobe]
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        sims = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for q, lists in enumerate(probes):
+            candidates = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+            scores = self.vectors[candidates] @ queries[q]
+            top = np.argsort(-scores)[:k]
+            ids[q, :len(top)], sims[q, :len(top)] = candidates[top], scores[top]
+        return ids, sims
+
+
+class SemanticClusterer:
+    def __init__(self, model_path=DEFAULT_MODEL, cache_dir=DEFAULT_CACHE_DIR, embedder=None):
+        self.embedder = embedder or load_embedder(model_path)
+        self.cache = EmbeddingCache(os.path.join(cache_dir, self.embedder.name), self.embedder.dim)
+        self.texts = []
+        self.vectors = None
+        self.index = None
+
+    @property
+    def semantic(self):
+        """의미 기반 임베딩인지 (False면 해싱 대체 → 어휘 기반 군집)"""
+        return self.embedder.semantic
+
+    def fit(self, texts):
+        """본문 임베딩 (캐시 활용) + IVF 인덱스 구축 → 새로 임베딩한 개수"""
+        self.texts = list(texts)
+        if not self.texts:
+            self.vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+            self.index = None
+            return 0
+        self.vectors, embedded = self.cache.embed(self.texts, self.embedder)
+        self.vectors = _normalize_rows(self.vectors)
+        self.index = IVFIndex(self.vectors)
+        return embedded
+
+    def neighbors(self, query, k=5):
+        """문장 하나와 의미가 가까운 게시글 → DataFrame(text, similarity)"""
+        if self.index is None:
+            return pd.DataFrame({'text': [], 'similarity': []})
+        vector = _normalize_rows(self.embedder.encode([query]))
+        ids, sims = self.index.search(vector, k)
+        found = ids[0] >= 0
+        return pd.DataFrame({
+            'text': [self.texts[i] for i in ids[0][found]],
+            'similarity': np.round(sims[0][found], 4),
+        })
+
+    def cluster(self, n_clusters=6, representatives=3, keywords=5):
+        """
+        군집 → (군집 요약 DataFrame, 게시글별 배정 DataFrame)
+        대표 문장: 중심과 코사인 유사도가 가장 높은 게시글 / 특징 단어: 전체 대비 군집 내 비율이 높은 단어
+        """
+        if not self.texts:
+            summary = pd.DataFrame(columns=['cluster_id', 'size', 'share', 'cohesion', 'keywords', 'representatives'])
+            return summary, pd.DataFrame(columns=['text', 'cluster_id', 'similarity_to_center'])
+        centers, assignment = spherical_kmeans(self.vectors, n_clusters)
+        similarity = np.einsum('ij,ij->i', self.vectors, centers[assignment])
+
+        counts = [Counter(w for w in set(_WORD.findall(t.lower())) if w not in STOP_WORDS) for t in self.texts]
+        overall = Counter()
+        for count in counts:
+            overall.update(count)
+        rows = []
+        for c in range(len(centers)):
+            members = np.flatnonzero(assignment == c)
+            if len(members) == 0:
+                continue
+            local = Counter()
+            for i in members:
+                local.update(counts[i])
+            lift = {w: n / len(members) - overall[w] / len(self.texts) for w, n in local.items() if n > 1}
+            top_members = members[np.argsort(-similarity[members])]
+            rows.append({
+                'cluster_id': c,
+                'size': len(members),
+                'share': round(len(members) / len(self.texts), 4),
+                'cohesion': round(float(similarity[members].mean()), 4),
+                'keywords': ', '.join(sorted(lift, key=lift.get, reverse=True)[:keywords]),
+                'representatives': ' | '.join(list(dict.fromkeys(self.texts[i] for i in top_members))[:representatives]),
+            })
+        summary = pd.DataFrame(rows).sort_values('size', ascending=False).reset_index(drop=True)
+        assignments = pd.DataFrame({
+            'text': self.texts,
+            'cluster_id': assignment,
+            'similarity_to_center': np.round(similarity, 4),
+        })
+        return summary, assignments
+
+
+def main():
+    """
+    실행: python semantic_clusters.py <CSV> [--column selftext] [--clusters 8] [--query "no idea where to begin"]
+    모델 받기: python semantic_clusters.py --download
+    """
+    parser = argparse.ArgumentParser(description="임베딩 기반 고통점 군집")
+    parser.add_argument('csv', nargs='?', help="게시글 CSV (스크래퍼 출력)")
+    parser.add_argument('--column', default='title', help="군집할 텍스트 열")
+    parser.add_argument('--clusters', type=int, default=8)
+    parser.add_argument('--query', action='append', help="근접 이웃을 볼 문장")
+    parser.add_argument('--download', action='store_true', help=f"임베딩 모델 받기 ({DOWNLOAD_MODEL} → {DEFAULT_MODEL})")
+    args = parser.parse_args()
+
+    if args.download:
+        print(f"✓ 모델 저장: {download_model()}")
+        if not args.csv:
+            return None
+    if not args.csv:
+        parser.error("게시글 CSV를 지정하세요")
+
+    texts = pd.read_csv(args.csv)[args.column].dropna().astype(str)
+    texts = texts[texts.str.strip() != ''].tolist()
+
+    clusterer = SemanticClusterer()
+    embedded = clusterer.fit(texts)
+    print(f"\n{'='*60}")
+    kind = '의미' if clusterer.semantic else '어휘(해싱 대체)'
+    print(f"🧭 {kind} 군집 ({len(texts):,}개, 새로 임베딩 {embedded:,}개, 모델 {clusterer.embedder.name})")
+    print(f"{'='*60}\n")
+
+    summary, _ = clusterer.cluster(args.clusters)
+    print(summary[['cluster_id', 'size', 'cohesion', 'keywords']].to_string(index=False))
+    for query in args.query or []:
+        print(f"\n🔍 '{query}'와 가까운 게시글:")
+        print(clusterer.neighbors(query).to_string(index=False))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Sentiment Backends
+감정 점수 백엔드 (-1 매우 부정 ~ +1 매우 긍정) + 본문 해시별 점수 캐시
+
+VADER는 영어 어휘 사전 기반이라 한국어 게시글은 전부 0(중립)으로 나옴
+→ 다국어 트랜스포머(ONNX, 양자화 모델 권장)를 CPU에서 배치 추론하는 백엔드를 선택할 수 있게 함
+
+- vader (기본값): vaderSentiment compound 점수
+- onnx: SENTIMENT_MODEL 폴더의 model.onnx(또는 model_quantized.onnx) + tokenizer.json + config.json
+  · 토큰 길이순 정렬 → 배치마다 그 배치의 최대 길이까지만 패딩 (dynamic padding)
+  · 배치를 스레드 풀에서 병렬 실행 (onnxruntime은 추론 중 GIL을 놓음, 세션 하나 공유)
+  · 라벨이 negative/neutral/positive면 P(긍정) - P(부정), 1~5 stars면 기대 별점을 -1~1로 환산
+- 캐시: SQLite (SENTIMENT_CACHE) 에 (백엔드, 본문 해시) → 점수 → 재분석 시 새 본문만 추론
+  onnx 백엔드 이름에는 모델 파일 해시가 들어가므로 같은 폴더의 모델을 바꾸면 예전 점수를 쓰지 않음
+- 백엔드 선택: SENTIMENT_BACKEND 환경 변수 (onnx인데 라이브러리나 모델이 없으면 vader로 대체)
+- 모델 받기: python sentiment_backends.py --download [허브 저장소]
+  (양자화 ONNX가 있는 저장소면 그대로 받고, 없으면 optimum으로 ONNX 변환 후 int8 동적 양자화)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'vader')
+DEFAULT_MODEL = os.getenv('SENTIMENT_MODEL', 'models/multilingual-sentiment-onnx')
+DEFAULT_CACHE = os.getenv('SENTIMENT_CACHE', 'output/sentiment_cache.sqlite')
+BATCH_SIZE = 32
+MAX_TOKENS = 256
+LOOKUP_CHUNK = 500
+
+# --download 기본 모델: 다국어 DistilBERT 감정 분류 (negative/neutral/positive), ONNX 변환 + 양자화본
+DOWNLOAD_MODEL = 'Xenova/distilbert-base-multilingual-cased-sentiments-student'
+# 허브 저장소에서 찾을 ONNX 파일 (앞쪽 우선, 저장 이름은 파일명만)
+HUB_ONNX_FILES = ('onnx/model_quantized.onnx', 'model_quantized.onnx', 'onnx/model.onnx', 'model.onnx')
+
+_HANGUL = re.compile(r'[가-힣]')
+
+
+def text_hash(text):
+    """캐시 키: 공백 정리한 본문의 SHA-1"""
+    return hashlib.sha1(' '.join(str(text).split()).encode('utf-8')).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """모델 파일 내용의 SHA-1 (백엔드 이름 → 캐시 키에 포함)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VaderBackend:
+    """vaderSentiment compound 점수 (영어 전용)"""
+
+    name = 'vader'
+    multilingual = False
+
+    def __init__(self):
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+        self.analyzer = SentimentIntensityAnalyzer()
+
+    def score(self, texts):
+        return np.array([self.analyzer.polarity_scores(text)['compound'] for text in texts], dtype=np.float32)
+
+
+def _label_weights(id2label):
+    """
+    모델 라벨 → 점수 가중치 (확률과 내적하면 -1~1 점수)
+
+    negative/neutral/positive 계열: -1 / 0 / +1
+    '1 star' ~ '5 stars' 계열: 기대 별점 (1 → -1, 3 → 0, 5 → +1)
+    그 외: 라벨 순서대로 -1 ~ +1 균등 배치
+    """
+    labels = [str(id2label[key]).lower() for key in sorted(id2label, key=int)]
+    polarity = {'neg': -1.0, 'pos': 1.0, 'neu': 0.0}
+    if all(label[:3] in polarity for label in labels):
+        return np.array([polarity[label[:3]] for label in labels], dtype=np.float32)
+    stars = [re.match(r'(\d+)\s*star', label) for label in labels]
+    if all(stars):
+        values = np.array([int(match.group(1)) for match in stars], dtype=np.float32)
+        return (values - values.mean()) / (values.max() - values.mean())
+    return np.linspace(-1.0, 1.0, len(labels), dtype=np.float32)
+
+
+class OnnxSentimentBackend:
+    """다국어 트랜스포머 감정 분류 모델 (ONNX Runtime, CPU 배치 추론)"""
+
+    multilingual = True
+
+    def __init__(self, model_dir=DEFAULT_MODEL, workers=None, batch_size=BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = next(
+            (os.path.join(model_dir, name) for name in ('model_quantized.onnx', 'model.onnx')
+             if os.path.exists(os.path.join(model_dir, name))),
+            None,
+        )
+        if model_file is None:
+            raise FileNotFoundError(f"ONNX 모델 파일이 없음: {model_dir}")
+
+        with open(os.path.join(model_dir, 'config.json'), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        self.weights = _label_weights(config['id2label'])
+        # 폴더 이름만으로는 모델 교체를 구분할 수 없음 → 모델 파일 해시까지 넣어 캐시 키로 사용
+        self.name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}:{file_hash(model_file)[:12]}"
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, 'tokenizer.json'))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(MAX_TOKENS)
+        self.pad_id = config.get('pad_token_id') or 0
+
+        # 스레드마다 연산 스레드를 나눠 CPU 코어를 초과 구독하지 않도록
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_file, options, providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def _run_batch(self, encodings):
+        """배치 하나: 배치 안 최대 길이까지만 패딩 → 라벨 확률 → 점수"""
+        length = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.full((len(encodings), length), self.pad_id, dtype=np.int64)
+        attention = np.zeros((len(encodings), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, :len(encoding.ids)] = encoding.ids
+            attention[row, :len(encoding.ids)] = 1
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.zeros_like(input_ids)
+        logits = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities @ self.weights
+
+    def score(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        # 길이순 정렬 → 비슷한 길이끼리 배치 (패딩 낭비 최소화)
+        order = np.argsort([len(encoding.ids) for encoding in encodings], kind='stable')
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        scores = np.zeros(len(encodings), dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = pool.map(lambda batch: self._run_batch([encodings[i] for i in batch]), batches)
+            for batch, values in zip(batches, results):
+                scores[batch] = values
+        return scores
+
+
+def export_onnx(name, model_dir):
+    """ONNX가 없는 허브 모델: optimum으로 ONNX 변환 → int8 동적 양자화 (model_quantized.onnx)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    ORTModelForSequenceClassification.from_pretrained(name, export=True).save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(name).save_pretrained(model_dir)
+    quantize_dynamic(
+        os.path.join(model_dir, 'model.onnx'), os.path.join(model_dir, 'model_quantized.onnx'),
+        weight_type=QuantType.QInt8,
+    )
+
+
+def download_model(model_dir=DEFAULT_MODEL, name=DOWNLOAD_MODEL):
+    """
+    허깅페이스 허브에서 감정 모델을 받아 model_dir에 저장 (한 번만, 이후에는 오프라인으로 로드)
+
+    저장소에 ONNX 파일과 tokenizer.json이 있으면 config.json과 함께 받고, 없으면 export_onnx로 변환
+    """
+    from huggingface_hub import hf_hub_download, list_repo_files
+
+    os.makedirs(model_dir, exist_ok=True)
+    files = set(list_repo_files(name))
+    onnx_file = next((filename for filename in HUB_ONNX_FILES if filename in files), None)
+    if onnx_file is None or 'tokenizer.json' not in files:
+        print(f"  - {name}: ONNX 파일이 없어 변환합니다 (optimum[onnxruntime] 필요)")
+        export_onnx(name, model_dir)
+        return model_dir
+
+    for filename in ('config.json', 'tokenizer.json', onnx_file):
+        shutil.copy(hf_hub_download(name, filename), os.path.join(model_dir, os.path.basename(filename)))
+    return model_dir
+
+
+def load_backend(name=DEFAULT_BACKEND, model_dir=DEFAULT_MODEL):
+    """이름으로 백엔드 생성 (onnx를 쓸 수 없으면 vader로 대체)"""
+    if name == 'onnx':
+        try:
+            return OnnxSentimentBackend(model_dir)
+        except ImportError:
+            print("⚠️ onnxruntime/tokenizers가 없어 VADER 사용")
+        except (FileNotFoundError, KeyError) as e:
+            print(f"⚠️ 감정 모델을 불러올 수 없어 VADER 사용: {e} "
+                  f"(python sentiment_backends.py --download 로 받기)")
+    elif name != 'vader':
+        raise ValueError(f"알 수 없는 감정 백엔드: {name} (vader, onnx)")
+    return VaderBackend()
+
+
+class SentimentCache:
+    """(백엔드 이름, 본문 해시) → 점수 (SQLite)"""
+
+    def __init__(self, path=DEFAULT_CACHE):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                backend TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (backend, hash)
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, backend, keys):
+        """있는 것만 {해시: 점수}"""
+        found = {}
+        for offset in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[offset:offset + LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT hash, score FROM scores WHERE backend = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [backend, *chunk],
+            )
+            found.update(rows)
+        return found
+
+    def put(self, backend, scores):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scores (backend, hash, score) VALUES (?, ?, ?)",
+                [(backend, key, float(value)) for key, value in scores.items()],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def score_texts(texts, backend, cache=None):
+    """
+    본문 목록 → 감정 점수 배열 (빈 본문은 0, 같은 본문은 한 번만, 캐시에 있으면 추론 생략)
+
+    Returns:
+        (float32 점수 배열, 새로 추론한 본문 수)
+    """
+    texts = ['' if pd.isna(text) else str(text) for text in texts]
+    keys = [text_hash(text) if text.strip() else None for text in texts]
+    unique = list(dict.fromkeys(key for key in keys if key))
+
+    known = cache.get(backend.name, unique) if cache is not None else {}
+    missing = [key for key in unique if key not in known]
+    if missing:
+        first_text = {}
+        for key, text in zip(keys, texts):
+            if key:
+                first_text.setdefault(key, text)
+        new_scores = dict(zip(missing, backend.score([first_text[key] for key in missing]).tolist()))
+        if cache is not None:
+            cache.put(backend.name, new_scores)
+        known.update(new_scores)
+
+    scores = np.array([known[key] if key else 0.0 for key in keys], dtype=np.float32)
+    return scores, len(missing)
+
+
+def hangul_ratio(texts):
+    """한글이 들어 있는 본문 비율 (VADER로 점수를 내면 중립으로 나오는 비율)"""
+    texts = [str(text) for text in texts if not pd.isna(text)]
+    if not texts:
+        return 0.0
+    return sum(1 for text in texts if _HANGUL.search(text)) / len(texts)
+
+
+def main():
+    """
+    실행: python sentiment_backends.py <csv> [--column title] [--backend onnx]
+    모델 받기: python sentiment_backends.py --download [허브 저장소]
+    """
+    import time
+
+    parser = argparse.ArgumentParser(description="감정 점수 계산")
+    parser.add_argument('path', nargs='?', help="CSV 또는 Parquet 파일")
+    parser.add_argument('--column', default='title', help="본문 열")
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=['vader', 'onnx'])
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="ONNX 모델 폴더")
+    parser.add_argument('--no-cache', action='store_true', help="캐시 사용 안 함")
+    parser.add_argument('--download', nargs='?', const=DOWNLOAD_MODEL, metavar='REPO',
+                        help=f"ONNX 감정 모델 받기 (기본: {DOWNLOAD_MODEL} → --model 폴더)")
+    args = parser.parse_args()
+
+    if args.download:
+        print(f"✓ 모델 저장: {download_model(args.model, args.download)}")
+        if not args.path:
+            return None
+    if not args.path:
+        parser.error("CSV 또는 Parquet 파일을 지정하세요")
+
+    df = pd.read_parquet(args.path) if args.path.endswith('.parquet') else pd.read_csv(args.path)
+    backend = load_backend(args.backend, args.model)
+    cache = None if args.no_cache else SentimentCache()
+
+    print(f"\n{'='*60}")
+    print(f"😊 감정 점수: {args.path} ({backend.name}, {len(df):,}건)")
+    print(f"{'='*60}\n")
+
+    started = time.perf_counter()
+    scores, computed = score_texts(df[args.column].tolist(), backend, cache)
+    elapsed = time.perf_counter() - started
+
+    print(f"✓ 새로 추론 {computed:,}건 / 캐시 {len(df) - computed:,}건 ({elapsed:.1f}초)")
+    if computed and elapsed > 0:
+        print(f"✓ 추론 속도: 분당 {computed / elapsed * 60:,.0f}건")
+    print(f"✓ 평균 점수: {scores.mean():.3f}")
+    if not backend.multilingual and hangul_ratio(df[args.column]) > 0:
+        print(f"⚠️ 한글 본문 {hangul_ratio(df[args.column]) * 100:.1f}%는 VADER로 중립 처리됨 (--backend onnx 권장)")
+    if cache is not None:
+        cache.close()
+    return scores
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""research_tool 모듈은 같은 폴더 기준으로 import 하므로 테스트에서도 경로에 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+from dedup_index import DedupIndex, dedupe_frame
+
+import pandas as pd
+
+PYTHON_BODY = "I have never written code before and want to pick up Python for data analysis at work."
+GUITAR_BODY = "Which tutorials helped you most? I keep bouncing between videos and books and finish nothing."
+
+
+def test_same_title_with_different_bodies_is_kept(tmp_path):
+    df = pd.DataFrame({
+        'post_id': ['aaa', 'bbb'],
+        'title': ["How do I start learning Python?", "How do I start learning Python"],
+        'selftext': [PYTHON_BODY, GUITAR_BODY],
+        'url': ['https://reddit.com/r/learnpython/comments/aaa/x', 'https://reddit.com/r/learnpython/comments/bbb/y'],
+    })
+    kept = dedupe_frame(df, 'reddit_praw', 'post_id', index_path=str(tmp_path / 'dedup.sqlite'))
+    assert kept['post_id'].tolist() == ['aaa', 'bbb']
+
+
+def test_same_source_is_never_merged_on_title_alone(tmp_path):
+    with DedupIndex(str(tmp_path / 'dedup.sqlite')) as index:
+        first = index.add('reddit_praw', 'aaa', title="How do I start learning Python?")
+        second = index.add('reddit_praw', 'bbb', title="How do I start learning Python")
+    assert second[1] == second[0] != first[0]
+
+
+def test_cross_posted_title_matches_when_bodies_agree_or_one_is_missing(tmp_path):
+    with DedupIndex(str(tmp_path / 'dedup.sqlite')) as index:
+        original = index.add('reddit_praw', 'aaa', title="How do I start learning Python?", text=PYTHON_BODY)
+        excerpt = index.add('devto', 'p1', title="How do I start learning Python",
+                            text=PYTHON_BODY.replace('at work', 'for my job'))
+        link_only = index.add('hackernews', '42', title="How do I start learning Python?!")
+        unrelated = index.add('devto', 'p2', title="How do I start learning Python?", text=GUITAR_BODY)
+    assert excerpt[1:] == (original[0], 'title')
+    assert link_only[1:] == (original[0], 'title')
+    assert unrelated[1] == unrelated[0]
@@ -0,0 +1,63 @@
+"""excel_export 왕복 테스트 (작성 → openpyxl로 다시 읽기)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from excel_export import save_excel
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _read(path, sheet):
+    rows = list(openpyxl.load_workbook(path, read_only=True)[sheet].iter_rows(values_only=True))
+    return rows[0], rows[1:]
+
+
+def test_nullable_dtypes_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'int': pd.array([1, None, 3], dtype='Int64'),
+        'uint': pd.array([None, 2, 3], dtype='UInt8'),
+        'float': pd.array([1.5, None, 2.5], dtype='Float64'),
+        'bool': pd.array([True, None, False], dtype='boolean'),
+        'text': pd.array(['가', None, 'c'], dtype='string'),
+        'object': ['x', pd.NA, None],
+        'category': pd.Categorical(['a', None, 'b']),
+        'when': pd.to_datetime(['2025-01-25 02:47:22', None, '2025-01-26 00:00:00']),
+    })
+    path = save_excel(str(tmp_path / 'nullable.xlsx'), {'Data': df})
+
+    header, rows = _read(path, 'Data')
+    assert list(header) == list(df.columns)
+    assert rows[0] == (1, None, 1.5, True, '가', 'x', 'a', pd.Timestamp('2025-01-25 02:47:22').to_pydatetime())
+    assert rows[1] == (None, 2, None, None, None, None, None, None)
+    assert rows[2][:7] == (3, 3, 2.5, False, 'c', None, 'b')
+
+
+def test_plain_dtypes_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'int': np.arange(3),
+        'float': [0.1, np.nan, np.inf],
+        'bool': [True, False, True],
+        'text': ['<tag>', 'a\x01b', ''],
+    })
+    path = save_excel(str(tmp_path / 'plain.xlsx'), {'Data': df})
+
+    _, rows = _read(path, 'Data')
+    assert [row[0] for row in rows] == [0, 1, 2]
+    assert [row[1] for row in rows] == [0.1, None, None]
+    assert [row[2] for row in rows] == [True, False, True]
+    assert [row[3] for row in rows][:2] == ['<tag>', 'ab']
+
+
+def test_timedelta_round_trip(tmp_path):
+    durations = pd.to_timedelta(['1 day', None, '2 hours 30 min'])
+    df = pd.DataFrame({
+        'duration': durations,
+        'object': pd.Series([pd.Timedelta(minutes=90), np.timedelta64(86400, 's'), None], dtype=object),
+    })
+    path = save_excel(str(tmp_path / 'timedelta.xlsx'), {'Data': df})
+
+    _, rows = _read(path, 'Data')
+    assert [row[0] for row in rows] == [pd.Timedelta(days=1), None, pd.Timedelta(hours=2, minutes=30)]
+    assert [row[1] for row in rows] == [pd.Timedelta(minutes=90), pd.Timedelta(days=1), None]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from retention_cohorts import RetentionCohortMatrix
+
+
+def _events(*rows):
+    return pd.DataFrame(rows, columns=['user_id', 'ts']).assign(ts=lambda df: pd.to_datetime(df['ts']))
+
+
+def test_partial_day_is_deferred_until_complete():
+    morning = _events(('a', '2025-01-01 09:00'), ('b', '2025-01-02 08:00'))
+    evening = _events(('b', '2025-01-02 21:00'), ('c', '2025-01-02 22:00'), ('a', '2025-01-02 23:00'))
+
+    incremental = RetentionCohortMatrix(horizon=7)
+    assert incremental.update(morning, until='2025-01-02') == (1, 0, 1)
+    assert incremental.update(pd.concat([morning, evening]), until='2025-01-03') == (1, 1, 0)
+
+    batch = RetentionCohortMatrix(horizon=7)
+    batch.update(pd.concat([morning, evening]), until='2025-01-03')
+
+    assert incremental.last_day == batch.last_day
+    assert (incremental.cohort_sizes == batch.cohort_sizes).all()
+    assert (incremental.active == batch.active).all()
+    # c는 1월 2일 늦게 처음 왔어도 1월 2일 코호트, a는 D1 활성
+    assert incremental.cohort_sizes.tolist() == [1, 2]
+    assert incremental.active[0, :2].tolist() == [1, 1]
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from search_index import SearchIndex, fts_query
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(':memory:')
+    index.add_frame(pd.DataFrame({
+        'post_id': ['1', '2'],
+        'title': ["I want to give up on c++", "Stuck in tutorial hell"],
+        'selftext': ["so overwhelmed by pointers", "every course starts over"],
+        'upvotes': [10, 20],
+    }), 'reddit_praw', 'post_id')
+    return index
+
+
+def test_fts_query_keeps_operators_and_quotes_the_rest():
+    assert fts_query('give up') == '"give" "up"'
+    assert fts_query('"tutorial hell" OR overwhelm*') == '"tutorial hell" OR overwhelm*'
+    assert fts_query('c++ OR "give up"') == '"c++" OR "give up"'
+    assert fts_query('"give up') == '"give up"'
+    assert fts_query('(tutorial hell') == 'tutorial hell'
+    assert fts_query('OR overwhelm*') == 'overwhelm*'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('"give up', ['1']),
+    ('c++ OR "give up"', ['1']),
+    ('"tutorial hell" OR overwhelm*', ['2', '1']),
+    ('give OR OR up', []),
+    ('"', []),
+])
+def test_malformed_queries_do_not_raise(index, query, expected):
+    assert index.search(query)['source_key'].tolist() == expected
+    assert index.facets(query)['source']['posts'].sum() == len(expected)
@@ -0,0 +1,134 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from sentiment_backends import OnnxSentimentBackend, _label_weights, download_model
+
+
+class _Encoding:
+    def __init__(self, text):
+        self.ids = [ord(char) for char in text]
+
+
+class _Tokenizer:
+    @classmethod
+    def from_file(cls, path):
+        return cls()
+
+    def no_padding(self):
+        pass
+
+    def enable_truncation(self, max_length):
+        pass
+
+    def encode_batch(self, texts):
+        return [_Encoding(text) for text in texts]
+
+
+class _Node:
+    def __init__(self, name):
+        self.name = name
+
+
+class _Session:
+    """로짓 = [0, 토큰 수] → 점수가 본문 길이로 정해짐, 받은 입력은 기록"""
+
+    inputs = ('input_ids', 'attention_mask')
+
+    def __init__(self, *args, **kwargs):
+        self.feeds = []
+
+    def get_inputs(self):
+        return [_Node(name) for name in self.inputs]
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        lengths = feeds['attention_mask'].sum(axis=1).astype(np.float32)
+        return [np.stack([np.zeros_like(lengths), lengths / 10], axis=1)]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    onnxruntime = types.SimpleNamespace(
+        SessionOptions=types.SimpleNamespace,
+        GraphOptimizationLevel=types.SimpleNamespace(ORT_ENABLE_ALL=99),
+        InferenceSession=_Session,
+    )
+    monkeypatch.setitem(sys.modules, 'onnxruntime', onnxruntime)
+    monkeypatch.setitem(sys.modules, 'tokenizers', types.SimpleNamespace(Tokenizer=_Tokenizer))
+    (tmp_path / 'model.onnx').write_bytes(b'weights-v1')
+    (tmp_path / 'config.json').write_text('{"id2label": {"0": "NEGATIVE", "1": "POSITIVE"}, "pad_token_id": 7}')
+    (tmp_path / 'tokenizer.json').write_text('{}')
+    return tmp_path
+
+
+def _expected(text):
+    logits = np.array([0.0, len(text) / 10])
+    probabilities = np.exp(logits) / np.exp(logits).sum()
+    return probabilities[1] - probabilities[0]
+
+
+def test_run_batch_pads_to_batch_max_length(model_dir):
+    backend = OnnxSentimentBackend(str(model_dir), workers=1)
+    backend._run_batch([_Encoding('ab'), _Encoding('abcd')])
+
+    feeds = backend.session.feeds[0]
+    assert set(feeds) == {'input_ids', 'attention_mask'}
+    assert feeds['input_ids'].tolist() == [[97, 98, 7, 7], [97, 98, 99, 100]]
+    assert feeds['attention_mask'].tolist() == [[1, 1, 0, 0], [1, 1, 1, 1]]
+
+
+def test_run_batch_adds_token_type_ids_when_model_takes_them(model_dir, monkeypatch):
+    monkeypatch.setattr(_Session, 'inputs', ('input_ids', 'attention_mask', 'token_type_ids'))
+    backend = OnnxSentimentBackend(str(model_dir), workers=1)
+    backend._run_batch([_Encoding('abc')])
+
+    assert backend.session.feeds[0]['token_type_ids'].tolist() == [[0, 0, 0]]
+
+
+def test_score_restores_input_order(model_dir):
+    texts = ['a' * n for n in (9, 1, 12, 4, 4, 30, 2)]
+    backend = OnnxSentimentBackend(str(model_dir), workers=3, batch_size=2)
+    scores = backend.score(texts)
+
+    np.testing.assert_allclose(scores, [_expected(text) for text in texts], rtol=1e-6)
+    # 길이순 배치 (1, 2) (4, 4) (9, 12) (30) → 배치마다 그 배치의 최대 길이까지만 패딩
+    assert sorted(feeds['input_ids'].shape[1] for feeds in backend.session.feeds) == [2, 4, 12, 30]
+
+
+def test_backend_name_changes_with_model_file(model_dir):
+    before = OnnxSentimentBackend(str(model_dir), workers=1).name
+    (model_dir / 'model.onnx').write_bytes(b'weights-v2')
+    after = OnnxSentimentBackend(str(model_dir), workers=1).name
+
+    assert before.startswith(f"onnx:{model_dir.name}:")
+    assert before != after
+
+
+def test_download_model_prefers_quantized_onnx(tmp_path, monkeypatch):
+    hub = tmp_path / 'hub'
+    for filename in ('config.json', 'tokenizer.json', 'onnx/model.onnx', 'onnx/model_quantized.onnx'):
+        (hub / filename).parent.mkdir(parents=True, exist_ok=True)
+        (hub / filename).write_text(filename)
+    huggingface_hub = types.SimpleNamespace(
+        list_repo_files=lambda name: [*(str(path.relative_to(hub)) for path in hub.rglob('*.*')), 'README.md'],
+        hf_hub_download=lambda name, filename: str(hub / filename),
+    )
+    monkeypatch.setitem(sys.modules, 'huggingface_hub', huggingface_hub)
+
+    model_dir = tmp_path / 'model'
+    download_model(str(model_dir), 'someone/sentiment-onnx')
+
+    assert sorted(path.name for path in model_dir.iterdir()) == ['config.json', 'model_quantized.onnx', 'tokenizer.json']
+    assert (model_dir / 'model_quantized.onnx').read_text() == 'onnx/model_quantized.onnx'
+
+
+def test_label_weights():
+    np.testing.assert_allclose(_label_weights({'0': 'negative', '1': 'neutral', '2': 'positive'}), [-1, 0, 1])
+    np.testing.assert_allclose(_label_weights({'1': 'NEG', '0': 'POS'}), [1, -1])
+    np.testing.assert_allclose(
+        _label_weights({str(i): f"{i + 1} star{'s' if i else ''}" for i in range(5)}), [-1, -0.5, 0, 0.5, 1]
+    )
+    np.testing.assert_allclose(_label_weights({'0': 'LABEL_0', '1': 'LABEL_1', '2': 'LABEL_2'}), [-1, 0, 1])
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from trend_engine import detect_anomalies, resample, to_timestamps
+
+
+def test_to_timestamps_parses_each_row_on_its_own():
+    times = to_timestamps(['2025-01-01 10:00:00', '2025-01-09', '2025-01-02T03:00:00+09:00', 'not a date'])
+    assert times.tolist()[:3] == [
+        pd.Timestamp('2025-01-01 10:00'), pd.Timestamp('2025-01-09'), pd.Timestamp('2025-01-01 18:00'),
+    ]
+    assert pd.isna(times.iloc[3])
+
+
+def test_detect_anomalies_on_empty_input_keeps_columns():
+    filled = detect_anomalies(resample(pd.DataFrame({'t': pd.date_range('2025-01-01', periods=30), 'v': range(30)}),
+                                       't', ['v']), 7)
+    for df in (pd.DataFrame({'t': [], 'v': []}), pd.DataFrame({'t': [None, 'x'], 'v': [0.1, 0.2]})):
+        empty = detect_anomalies(resample(df, 't', ['v']), 7)
+        assert empty.empty
+        assert list(empty.columns) == list(filled.columns)
+        assert (empty.dtypes == filled.dtypes).all()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Trend Engine
+타임스탬프가 있는 표(수집 게시글, 게임 로그)를 일정 주기로 묶어 추세와 이상치를 계산
+
+- resample: 주기별(D/W/M 등) 건수 + 값 열 평균 (빈 주기는 건수 0으로 채움)
+- 이상치: 직전 window개 주기의 중앙값/MAD 기준 robust z-score (현재 값은 기준에서 제외)
+  period를 주면 STL 방식으로 계절 성분(그 앞 주기들의 위상별 평균 편차)을 먼저 빼고 잔차로 판정
+- TrendEngine.append: 새 이벤트만 주기별 합계 버퍼에 더하고, 바뀐 주기부터 끝까지만 다시 계산
+  (계절 성분은 위상별 누적 합계로 유지 → 이미 계산한 행은 바뀌지 않고 일괄 계산과 결과가 같음)
+- 모든 계산은 NumPy 벡터 연산 (sliding_window_view)
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+COUNT = 'count'
+MAD_SCALE = 0.6745        # 정규분포에서 MAD → 표준편차 환산 (Iglewicz-Hoaglin)
+MEAN_AD_SCALE = 0.7979    # MAD가 0일 때 평균 절대 편차로 대신 (√(2/π))
+DEFAULT_THRESHOLD = 3.5
+
+
+def to_timestamps(values):
+    """datetime 문자열 / epoch 초 / datetime 열 → 시간대 없는 Timestamp 열"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        times = pd.to_datetime(values, unit='s', errors='coerce')
+    else:
+        # 행마다 형식을 따로 해석 (첫 행 형식을 추정해 나머지를 NaT로 만들지 않도록), 시간대가 섞여도 UTC로 통일
+        times = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+    return times
+
+
+def _bucket_sums(df, time_column, columns, freq):
+    """이벤트 → 주기 시작 시각별 건수/합계/유효 개수 (평균은 나중에 합계/개수로 계산)"""
+    times = to_timestamps(df[time_column])
+    valid = times.notna().to_numpy()
+    starts = times[valid].dt.to_period(freq).dt.start_time.to_numpy()
+
+    sums = pd.DataFrame({COUNT: np.ones(len(starts))}, index=pd.DatetimeIndex(starts))
+    for column in columns:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)[valid]
+        sums[f"{column}_sum"] = np.nan_to_num(values)
+        sums[f"{column}_n"] = (~np.isnan(values)).astype(float)
+    return sums.groupby(level=0).sum()
+
+
+def _fill_periods(sums, freq):
+    """첫 주기 ~ 마지막 주기 사이 빈 주기를 0으로 채움"""
+    if sums.empty:
+        return sums
+    periods = pd.period_range(sums.index.min(), sums.index.max(), freq=freq)
+    return sums.reindex(periods.start_time, fill_value=0.0)
+
+
+def _metrics(sums, columns):
+    """합계 표 → 건수 + 값 열 평균"""
+    metrics = pd.DataFrame({COUNT: sums[COUNT].to_numpy()}, index=sums.index)
+    for column in columns:
+        n = sums[f"{column}_n"].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            metrics[column] = np.where(n > 0, sums[f"{column}_sum"].to_numpy() / n, np.nan)
+    return metrics
+
+
+def resample(df, time_column, columns=(), freq='D'):
+    """
+    타임스탬프 표를 주기별로 묶음
+
+    Args:
+        time_column: 시간 열 (문자열/epoch 초/datetime)
+        columns: 평균을 낼 값 열 (예: 'overall_sentiment', '승률')
+        freq: pandas 주기 문자 ('D', 'W', 'M' ...)
+
+    Returns:
+        주기 시작 시각 인덱스, 열 = count + columns
+    """
+    columns = list(columns)
+    return _metrics(_fill_periods(_bucket_sums(df, time_column, columns, freq), freq), columns)
+
+
+def _trailing_windows(values, window, current=False):
+    """
+    i번째 행 = values[i-window:i] (현재 값 제외, 앞쪽은 NaN)
+    current=True면 values[i-window+1:i+1] (현재 값 포함)
+    """
+    lead = window - 1 if current else window
+    padded = np.concatenate([np.full(lead, np.nan), values])
+    return sliding_window_view(padded, window)[:len(values)]
+
+
+def _rolling_stats(windows):
+    """NaN을 뺀 창별 평균/표본 표준편차 (값 1개면 표준편차 NaN)"""
+    valid = ~np.isnan(windows)
+    n = valid.sum(axis=1)
+    filled = np.where(valid, windows, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / n
+        squares = np.where(valid, (windows - mean[:, None]) ** 2, 0.0).sum(axis=1)
+        std = np.where(n > 1, np.sqrt(squares / (n - 1)), np.nan)
+    return np.where(n > 0, mean, np.nan), std
+
+
+def robust_zscore(residual, window=14, min_periods=None, start=0):
+    """
+    residual[start:]의 직전 window개 값 대비 robust z-score (벡터 연산)
+
+    Args:
+        residual: 1차원 배열 (NaN 허용, 계절 성분을 뺀 값)
+        start: 이 위치부터 계산 (앞쪽은 기준 구간으로만 사용)
+
+    Returns:
+        (z, 기준 중앙값) - 기준 값이 min_periods개 미만인 행은 NaN
+    """
+    residual = np.asarray(residual, dtype=float)
+    min_periods = min_periods or max(3, window // 2)
+    windows = _trailing_windows(residual, window)[start:]
+    current = residual[start:]
+    enough = (~np.isnan(windows)).sum(axis=1) >= min_periods
+    z = np.full(len(current), np.nan)
+    median = np.full(len(current), np.nan)
+    if not enough.any():
+        return z, median
+
+    windows = windows[enough]
+    center = np.nanmedian(windows, axis=1)
+    deviation = np.abs(windows - center[:, None])
+    mad = np.nanmedian(deviation, axis=1) / MAD_SCALE
+    mean_ad = np.nanmean(deviation, axis=1) / MEAN_AD_SCALE
+    scale = np.where(mad > 0, mad, mean_ad)
+
+    diff = current[enough] - center
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 기준 구간이 완전히 평평하면 조금만 벗어나도 무한대 → 이상치
+        z[enough] = np.where(scale > 0, diff / scale, np.where(diff == 0, 0.0, np.sign(diff) * np.inf))
+    median[enough] = center
+    return z, median
+
+
+def _detrended(values, start, period):
+    """values[start:] - 직전 period개 값의 중앙값 (한 주기 전체가 있어야 계산, 없으면 NaN)"""
+    windows = _trailing_windows(values, period)[start:]
+    full = (~np.isnan(windows)).all(axis=1)
+    detrended = np.full(len(windows), np.nan)
+    detrended[full] = values[start:][full] - np.median(windows[full], axis=1)
+    return detrended
+
+
+def _causal_season(detrended, phases, period, totals, counts):
+    """
+    STL 방식 계절 성분 (인과적): 각 행은 그 앞 주기들의 위상별 평균 편차만 사용
+    → 나중에 데이터가 붙어도 이미 계산한 행은 바뀌지 않고, 누적 계산과 일괄 계산이 같음
+
+    Args:
+        totals, counts: 첫 행 이전까지의 위상별 편차 합계/개수 (누적 상태)
+
+    Returns:
+        (계절 성분, 마지막 행까지 반영한 totals, counts)
+    """
+    rows = np.arange(len(detrended))
+    ok = ~np.isnan(detrended)
+    contrib = np.zeros((len(detrended), period))
+    seen = np.zeros((len(detrended), period))
+    contrib[rows[ok], phases[ok]] = detrended[ok]
+    seen[rows[ok], phases[ok]] = 1.0
+
+    before_sum = totals + np.cumsum(contrib, axis=0) - contrib
+    before_count = counts + np.cumsum(seen, axis=0) - seen
+    ready = (before_count > 0).all(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = before_sum / before_count
+        profile = means - means.mean(axis=1, keepdims=True)
+    season = np.where(ready, profile[rows, phases], 0.0)
+    return season, totals + contrib.sum(axis=0), counts + seen.sum(axis=0)
+
+
+# 열별 결과 필드 (앞 7개는 결과 표에 노출, 나머지는 누적 계산용 내부 상태)
+FIELDS = ['', '_rolling_mean', '_rolling_std', '_baseline', '_z', '_anomaly', '_onset', '_seasonal', '_detrended']
+PUBLIC_FIELDS = 7
+VALUE, MEAN, STD, BASELINE, Z, ANOMALY, ONSET, SEASONAL, DETRENDED = range(len(FIELDS))
+
+
+class _SeriesTrend:
+    """열 하나의 주기별 결과 버퍼 + 계절 누적 상태 (용량은 두 배씩 늘림)"""
+
+    def __init__(self, window, threshold, period):
+        self.window = window
+        self.threshold = threshold
+        self.period = period if period and period >= 2 else None
+        self.out = np.zeros((0, len(FIELDS)))
+        self.n = 0
+        self.totals = np.zeros(self.period or 1)
+        self.counts = np.zeros(self.period or 1)
+
+    def _reserve(self, size):
+        if size > len(self.out):
+            grown = np.zeros((max(size, len(self.out) * 2, 64), len(FIELDS)))
+            grown[:self.n] = self.out[:self.n]
+            self.out = grown
+
+    def update(self, values, base, start):
+        """
+        행 start 이후를 다시 계산
+
+        Args:
+            values: 행 base ~ 끝까지의 값 (base <= start - 기준 구간 길이, 또는 0)
+        """
+        end = base + len(values)
+        self._reserve(end)
+        if self.period and start < self.n:
+            # 다시 계산할 행의 계절 기여분을 되돌림
+            old = self.out[start:self.n, DETRENDED]
+            ok = ~np.isnan(old)
+            phases = np.arange(start, self.n)[ok] % self.period
+            np.subtract.at(self.totals, phases, old[ok])
+            np.subtract.at(self.counts, phases, 1.0)
+
+        keep = start - base
+        out = self.out[start:end]
+        out[:, VALUE] = values[keep:]
+        out[:, MEAN], out[:, STD] = _rolling_stats(_trailing_windows(values, self.window, current=True)[keep:])
+
+        season = np.zeros(len(values))
+        if self.period:
+            out[:, DETRENDED] = _detrended(values, keep, self.period)
+            phases = np.arange(start, end) % self.period
+            out[:, SEASONAL], self.totals, self.counts = _causal_season(
+                out[:, DETRENDED], phases, self.period, self.totals, self.counts
+            )
+            season[:keep] = self.out[base:start, SEASONAL]
+            season[keep:] = out[:, SEASONAL]
+        else:
+            out[:, DETRENDED] = np.nan
+            out[:, SEASONAL] = 0.0
+
+        z, median = robust_zscore(values - season, self.window, start=keep)
+        out[:, Z] = z
+        out[:, BASELINE] = median + season[keep:]
+        out[:, ANOMALY] = np.abs(np.nan_to_num(z)) >= self.threshold
+        previous = np.concatenate([[self.out[start - 1, ANOMALY] if start > 0 else 0.0], out[:-1, ANOMALY]])
+        out[:, ONSET] = (out[:, ANOMALY] > 0) & (previous == 0)
+        self.n = end
+
+    def frame(self, name, index, start=0):
+        fields = self.out[start:self.n, :PUBLIC_FIELDS]
+        frame = pd.DataFrame(fields, index=index, columns=[name + field for field in FIELDS[:PUBLIC_FIELDS]])
+        return frame.astype({name + '_anomaly': bool, name + '_onset': bool})
+
+
+def detect_anomalies(metrics, window=14, threshold=DEFAULT_THRESHOLD, period=None):
+    """
+    주기별 표(resample 결과 또는 날짜 인덱스 표)의 모든 열에 추세/이상치 열 추가
+
+    열마다 <열>_rolling_mean, _rolling_std, _baseline, _z, _anomaly, _onset
+    (_onset = 이상치 구간의 첫 주기, 급등/급락이 '시작된' 날)
+    """
+    if len(metrics) == 0:
+        # 시간 열이 비었거나 전부 NaT인 경우 (빈 배열은 sliding_window_view가 받지 못함)
+        frame = pd.DataFrame(index=metrics.index, columns=[
+            column + field for column in metrics.columns for field in FIELDS[:PUBLIC_FIELDS]
+        ], dtype=float)
+        return frame.astype({column + field: bool for column in metrics.columns for field in ('_anomaly', '_onset')})
+    frames = []
+    for column in metrics.columns:
+        series = _SeriesTrend(window, threshold, period)
+        series.update(metrics[column].to_numpy(dtype=float), 0, 0)
+        frames.append(series.frame(column, metrics.index))
+    return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=metrics.index)
+
+
+class TrendEngine:
+    """
+    주기별 추세/이상치 (새 이벤트 누적 추가 지원)
+
+    주기별 합계/결과를 배열 버퍼에 두고, 바뀐 주기부터 끝까지 + 앞쪽 기준 구간만 다시 계산
+    (결과는 같은 데이터를 detect_anomalies(resample(...))로 한 번에 계산한 것과 같음)
+    """
+
+    def __init__(self, time_column, columns=(), freq='D', window=14,
+                 threshold=DEFAULT_THRESHOLD, period=None):
+        self.time_column = time_column
+        self.columns = list(columns)
+        self.freq = freq
+        self.window = window
+        self.threshold = threshold
+        self.period = period
+        self.sums_columns = [COUNT] + [f"{c}_{part}" for c in self.columns for part in ('sum', 'n')]
+        self.first = None          # 첫 주기 (pd.Period)
+        self.sums = np.zeros((0, len(self.sums_columns)))
+        self.n = 0
+        self._reset_series()
+
+    def _reset_series(self):
+        self.series = {
+            column: _SeriesTrend(self.window, self.threshold, self.period) for column in [COUNT] + self.columns
+        }
+
+    def _reserve(self, size):
+        if size > len(self.sums):
+            grown = np.zeros((max(size, len(self.sums) * 2, 64), len(self.sums_columns)))
+            grown[:self.n] = self.sums[:self.n]
+            self.sums = grown
+
+    def _values(self, column, base, end):
+        sums = self.sums[base:end]
+        if column == COUNT:
+            return sums[:, 0].copy()
+        i = self.sums_columns.index(f"{column}_sum")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(sums[:, i + 1] > 0, sums[:, i] / sums[:, i + 1], np.nan)
+
+    def append(self, df):
+        """
+        새 이벤트 추가 → 바뀐 주기부터 끝까지만 다시 계산
+
+        Returns:
+            다시 계산된 행 (새로 붙거나 값이 바뀐 주기)
+        """
+        new = _bucket_sums(df, self.time_column, self.columns, self.freq)
+        if new.empty:
+            return self.result.iloc[:0]
+
+        ordinals = pd.PeriodIndex(new.index, freq=self.freq).asi8
+        if self.first is None:
+            self.first = pd.Period(new.index.min(), freq=self.freq)
+        shift = self.first.ordinal - ordinals.min()
+        if shift > 0:
+            # 기존 첫 주기보다 앞선 데이터 → 버퍼를 앞으로 늘리고 전체 재계산
+            self._reserve(self.n + shift)
+            self.sums[shift:self.n + shift] = self.sums[:self.n].copy()
+            self.sums[:shift] = 0.0
+            self.n += shift
+            self.first -= shift
+            self._reset_series()
+
+        positions = ordinals - self.first.ordinal
+        end = max(self.n, int(positions.max()) + 1)
+        self._reserve(end)
+        np.add.at(self.sums, positions, new[self.sums_columns].to_numpy())
+
+        start = 0 if shift > 0 else min(int(positions.min()), self.n)
+        self.n = end
+        base = max(0, start - max(self.window, self.period or 0))
+        for column, series in self.series.items():
+            series.update(self._values(column, base, end), base, start)
+        return self._frame(start)
+
+    def _frame(self, start=0):
+        if self.first is None:
+            return pd.DataFrame()
+        index = pd.period_range(self.first + start, periods=self.n - start, freq=self.freq).start_time
+        return pd.concat([series.frame(column, index, start) for column, series in self.series.items()], axis=1)
+
+    @property
+    def result(self):
+        """주기별 결과 표 (detect_anomalies와 같은 열)"""
+        return self._frame()
+
+    def anomalies(self, column=COUNT):
+        """이상치로 판정된 주기만"""
+        result = self.result
+        if result.empty:
+            return result
+        return result[result[f"{column}_anomaly"]]
+
+
+def main():
+    """실행: python trend_engine.py <csv> --time 날짜 --columns 승률 [--freq D] [--window 7]"""
+    parser = argparse.ArgumentParser(description="시계열 추세/이상치 계산")
+    parser.add_argument('path', help="CSV 또는 Parquet 파일")
+    parser.add_argument('--time', default='created_utc', help="시간 열")
+    parser.add_argument('--columns', default='', help="평균을 낼 값 열 (쉼표 구분)")
+    parser.add_argument('--freq', default='D', help="주기 (D, W, M ...)")
+    parser.add_argument('--window', type=int, default=14, help="기준 구간 길이 (주기 수)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="|z| 기준")
+    parser.add_argument('--period', type=int, help="계절 주기 (예: 일 단위 데이터의 요일 효과 7)")
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.path) if args.path.endswith('.parquet') else pd.read_csv(args.path)
+    columns = [c for c in args.columns.split(',') if c]
+    engine = TrendEngine(args.time, columns, args.freq, args.window, args.threshold, args.period)
+    engine.append(df)
+
+    print(f"\n{'='*60}")
+    print(f"📈 추세 분석: {args.path} ({args.freq}, 주기 {len(engine.result)}개)")
+    print(f"{'='*60}\n")
+    for column in [COUNT] + columns:
+        flagged = engine.anomalies(column)
+        print(f"✓ {column}: 이상치 {len(flagged)}개")
+        for when, row in flagged.iterrows():
+            onset = " ← 시작" if row[f"{column}_onset"] else ""
+            print(f"  • {when.date()}  {row[column]:.2f} (기준 {row[f'{column}_baseline']:.2f}, "
+                  f"z={row[f'{column}_z']:.1f}){onset}")
+    return engine
+
+
+if __name__ == "__main__":
+    main()
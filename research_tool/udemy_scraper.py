@@ -10,6 +10,8 @@ from datetime import datetime
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 from tqdm import tqdm
 import time
+from excel_export import save_excel
+from search_index import index_frame
 
 class UdemyScraper:
     def __init__(self, headless=True):
@@ -197,7 +199,10 @@ class UdemyScraper:
 
         # Excel 저장
         excel_path = f"output/{filename_prefix}_{timestamp}.xlsx"
-        df.to_excel(excel_path, index=False, engine='openpyxl')
+        save_excel(excel_path, {'Sheet1': df})
+
+        # 검색 인덱스에 증분 반영
+        index_frame(df, 'udemy', 'url')
 
         print(f"\n💾 데이터 저장 완료:")
         print(f"  - CSV: {csv_path}")
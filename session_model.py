@@ -0,0 +1,182 @@
+"""
+게임 세션 모델
+app.py의 흩어진 st.session_state 키 대신 하나의 __slots__ 객체로 진행 상태를 관리
+
+- 필드가 고정되어 있어 오타 키가 조용히 생기지 않고, 세션당 메모리가 작음
+- 채팅 메시지는 고정 크기 링 버퍼(MessageLog)에 화면 표시용으로만 보관
+- 전체 대화 기록은 세션별 append-only JSONL 파일(TranscriptStore)로 내보냄
+  → 긴 세션 / 반복 플레이에서도 세션당 메모리가 일정
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import deque
+
+# 화면에 보관하는 최근 메시지 수
+DISPLAY_HISTORY_LIMIT = 80
+
+# 전체 대화 기록 저장 위치
+TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", os.path.join(tempfile.gettempdir(), "kastor_transcripts"))
+
+
+# 스냅샷에 넣지 않는 필드 (렌더링 중 임시 값)
+SNAPSHOT_EXCLUDED = ("rendered_stage",)
+
+
+class TranscriptStore:
+    """세션별 전체 대화 기록 (append-only JSONL)"""
+
+    __slots__ = ("path",)
+
+    def __init__(self, session_id, directory=TRANSCRIPT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{session_id}.jsonl")
+
+    def append(self, role, content):
+        record = {"ts": time.time(), "role": role, "content": content}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def read(self):
+        """전체 기록 (디버그 / 내보내기용)"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class MessageLog:
+    """최근 메시지 링 버퍼 - 넘치는 메시지는 버퍼에서만 빠지고 기록에는 남음"""
+
+    __slots__ = ("_buffer", "total", "store")
+
+    def __init__(self, store=None, limit=DISPLAY_HISTORY_LIMIT):
+        self._buffer = deque(maxlen=limit)
+        self.total = 0  # 지금까지 추가된 전체 메시지 수 (새 메시지 감지용)
+        self.store = store
+
+    def append(self, role, content):
+        self._buffer.append({"role": role, "content": content})
+        self.total += 1
+        if self.store is not None:
+            self.store.append(role, content)
+
+    def recent(self, n):
+        """최근 n개 메시지 (LLM 프롬프트용)"""
+        return list(self._buffer)[-n:]
+
+    @property
+    def hidden(self):
+        """버퍼에서 밀려난 메시지 수"""
+        return self.total - len(self._buffer)
+
+    def clear(self):
+        self._buffer.clear()
+        self.total = 0
+
+    def restore(self, messages, total):
+        """스냅샷에서 복원 (기록 파일에는 다시 쓰지 않음)"""
+        self._buffer.clear()
+        self._buffer.extend(messages)
+        self.total = total
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._buffer)[index]
+        return self._buffer[index]
+
+
+class GameSession:
+    """한 플레이어의 에피소드 진행 상태"""
+
+    __slots__ = (
+        "session_id",
+        "episode_stage",
+        "rendered_stage",
+        "user_name",
+        "messages",
+        "last_message_count",
+        "detective_score",
+        "badges",
+        "hints_used",
+        "hint_shown",
+        "hypotheses",
+        "intro_step",
+        "evidence_found",
+        "awaiting_name_input",
+        "filter_date",
+        "filter_user",
+        "filter_action",
+        "graph_verified",
+        "patch_notes_verified",
+        "api_error",
+        "last_user_message",
+        "layout_mode",
+    )
+
+    def __init__(self, start_stage, session_id=None, history_limit=DISPLAY_HISTORY_LIMIT):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.messages = MessageLog(TranscriptStore(self.session_id), limit=history_limit)
+        self.layout_mode = "tab"  # 기본값: 탭 모드
+        self.rendered_stage = None
+        self.reset(start_stage)
+
+    def reset(self, start_stage):
+        """진행 상태 초기화 (레이아웃 설정은 유지, 전체 기록 파일은 그대로 이어 씀)"""
+        self.episode_stage = start_stage
+        self.user_name = None
+        self.messages.clear()
+        self.last_message_count = 0
+        self.detective_score = 0
+        self.badges = []
+        self.hints_used = 0
+        self.hint_shown = {}
+        self.hypotheses = []
+        self.intro_step = 0
+        self.evidence_found = []
+        self.awaiting_name_input = False
+        self.filter_date = None
+        self.filter_user = None
+        self.filter_action = None
+        self.graph_verified = False
+        self.patch_notes_verified = False
+        self.api_error = None
+        self.last_user_message = None
+
+    def add_message(self, role, content):
+        self.messages.append(role, content)
+
+    def to_dict(self):
+        """저장용 스냅샷 (JSON 직렬화 가능)"""
+        data = {field: getattr(self, field) for field in self.__slots__ if field not in SNAPSHOT_EXCLUDED}
+        data["messages"] = list(self.messages)
+        data["message_total"] = self.messages.total
+        return data
+
+    @classmethod
+    def from_dict(cls, data, history_limit=DISPLAY_HISTORY_LIMIT):
+        """스냅샷에서 세션 복원 (모르는 필드는 무시, 빠진 필드는 기본값)"""
+        session = cls(data["episode_stage"], session_id=data["session_id"], history_limit=history_limit)
+        for field in cls.__slots__:
+            if field in data and field not in SNAPSHOT_EXCLUDED and field != "messages":
+                setattr(session, field, data[field])
+        session.messages.restore(data.get("messages", []), data.get("message_total", 0))
+        return session
+
+    def set_flag(self, key, value):
+        """에피소드 그래프의 플래그 설정 (정의되지 않은 필드면 AttributeError)"""
+        if key not in self.__slots__:
+            raise AttributeError(f"알 수 없는 세션 필드: {key}")
+        setattr(self, key, value)
+
+    def get_flag(self, key):
+        return getattr(self, key)
@@ -0,0 +1,224 @@
+"""
+세션 영속화 (스냅샷 저장 / 재개 토큰으로 복원)
+Streamlit 메모리에만 있던 진행 상태를 외부 저장소에 저장 → 파드 재시작 / 여러 레플리카에서도 이어서 플레이
+
+- 저장소는 SESSION_STORE_URL 환경 변수로 선택
+  - sqlite:///경로/sessions.db (기본값: 임시 폴더의 kastor_sessions.db)
+  - redis://호스트:포트/DB (redis 패키지 필요, Redis 호환 서버면 모두 가능)
+  - memory:// (단일 프로세스 개발용)
+- 쓰기 합치기: 세션마다 최신 스냅샷만 대기열에 두고 백그라운드 스레드가 주기적으로 한 번에 저장
+  (내용이 그대로면 저장하지 않음, 스테이지 변경처럼 중요한 시점은 즉시 저장)
+- 재개 토큰은 URL 쿼리 파라미터(?resume=...)로 전달
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+DEFAULT_STORE_URL = "sqlite:///" + os.path.join(tempfile.gettempdir(), "kastor_sessions.db")
+
+# 대기열을 비우는 주기 (초)
+FLUSH_INTERVAL = 2.0
+
+# 저장된 세션 유지 기간 (Redis TTL, 초)
+SESSION_TTL = 7 * 24 * 60 * 60
+
+# 이 시간 동안 저장 요청이 없던 세션은 "마지막 저장 해시" 기록에서 뺌 (초)
+# (빠진 뒤 다시 저장 요청이 오면 한 번 더 쓰일 뿐이라 안전)
+IDLE_EVICT_SECONDS = 60 * 60
+
+RESUME_PARAM = "resume"
+
+
+class MemorySessionStore:
+    """프로세스 메모리 저장소 (개발 / 테스트용)"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, token):
+        with self._lock:
+            return self._data.get(token)
+
+    def save_many(self, items):
+        with self._lock:
+            self._data.update(items)
+
+    def delete(self, token):
+        with self._lock:
+            self._data.pop(token, None)
+
+
+class SQLiteSessionStore:
+    """SQLite 저장소 (파일 하나, WAL 모드)"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (token TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._con.commit()
+
+    def load(self, token):
+        with self._lock:
+            row = self._con.execute("SELECT data FROM sessions WHERE token = ?", (token,)).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, items):
+        """여러 세션을 한 트랜잭션으로 저장"""
+        now = time.time()
+        with self._lock, self._con:
+            self._con.executemany(
+                "INSERT INTO sessions (token, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(token) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                [(token, data, now) for token, data in items.items()],
+            )
+
+    def delete(self, token):
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+
+class RedisSessionStore:
+    """Redis 호환 저장소 (redis 패키지 필요)"""
+
+    def __init__(self, url, prefix="kastor:session:"):
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def load(self, token):
+        data = self._client.get(self.prefix + token)
+        return data.decode("utf-8") if data else None
+
+    def save_many(self, items):
+        """여러 세션을 파이프라인 한 번으로 저장"""
+        pipe = self._client.pipeline(transaction=False)
+        for token, data in items.items():
+            pipe.set(self.prefix + token, data, ex=SESSION_TTL)
+        pipe.execute()
+
+    def delete(self, token):
+        self._client.delete(self.prefix + token)
+
+
+def _digest(data):
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+def create_store(url=None):
+    """URL로 저장소 생성"""
+    url = url or os.getenv("SESSION_STORE_URL", DEFAULT_STORE_URL)
+    scheme = urlparse(url).scheme
+    if scheme == "sqlite":
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    if scheme in ("redis", "rediss"):
+        return RedisSessionStore(url)
+    if scheme == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"지원하지 않는 세션 저장소: {url}")
+
+
+class SessionPersister:
+    """쓰기 합치기 + 백그라운드 저장 (프로세스당 하나, 모든 세션 공유)"""
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL, idle_evict=IDLE_EVICT_SECONDS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.idle_evict = idle_evict
+        self._pending = {}
+        # 토큰 → (마지막으로 저장한 스냅샷의 해시, 마지막 사용 시각), 오래된 것부터 순서대로
+        self._last_saved = OrderedDict()
+        self._lock = threading.Lock()
+        # 대기열 꺼내기 ~ 저장까지 한 번에 하나만 (백그라운드가 꺼낸 오래된 스냅샷이
+        # 먼저 끝난 즉시 저장의 새 스냅샷을 나중에 덮어쓰지 않도록)
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _remember(self, token, digest):
+        """마지막 저장 해시 기록 (호출 시각 기준으로 맨 뒤로 이동, 잠금 안에서 호출)"""
+        self._last_saved[token] = (digest, time.monotonic())
+        self._last_saved.move_to_end(token)
+
+    def _evict_idle(self):
+        """오래 쓰이지 않은 세션의 해시 기록 제거 (잠금 안에서 호출)"""
+        cutoff = time.monotonic() - self.idle_evict
+        while self._last_saved:
+            token, (_, touched) = next(iter(self._last_saved.items()))
+            if touched >= cutoff:
+                break
+            self._last_saved.popitem(last=False)
+
+    def save(self, session, immediate=False):
+        """
+        스냅샷 대기열에 추가 (바뀐 게 없으면 무시, immediate면 바로 저장)
+        즉시 저장이 실패해도 예외를 던지지 않음 → 대기열에 남아 백그라운드에서 다시 시도
+        """
+        data = json.dumps(session.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        digest = _digest(data)
+        with self._lock:
+            saved = self._last_saved.get(session.session_id)
+            if saved is not None and saved[0] == digest:
+                self._remember(session.session_id, digest)
+                self._pending.pop(session.session_id, None)
+                return
+            self._pending[session.session_id] = data
+        if immediate:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ 세션 저장 실패 (백그라운드에서 다시 시도): {e}")
+
+    def load(self, token, session_cls):
+        """재개 토큰으로 세션 복원 (대기 중인 최신 스냅샷 우선, 없으면 None)"""
+        with self._lock:
+            data = self._pending.get(token)
+        if data is None:
+            data = self.store.load(token)
+        if data is None:
+            return None
+        with self._lock:
+            if token not in self._last_saved:
+                self._remember(token, _digest(data))
+        return session_cls.from_dict(json.loads(data))
+
+    def flush(self):
+        """대기 중인 스냅샷을 한 번에 저장 (동시에 호출되면 순서대로 - 나중에 꺼낸 스냅샷이 나중에 저장됨)"""
+        with self._flush_lock:
+            with self._lock:
+                items, self._pending = self._pending, {}
+                self._evict_idle()
+            if not items:
+                return
+            try:
+                self.store.save_many(items)
+            except Exception:
+                # 저장 실패 시 다음 주기에 다시 시도 (그 사이 새 스냅샷이 있으면 그쪽이 우선)
+                with self._lock:
+                    for token, data in items.items():
+                        self._pending.setdefault(token, data)
+                raise
+            with self._lock:
+                for token, data in items.items():
+                    self._remember(token, _digest(data))
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ 세션 저장 실패: {e}")
@@ -1,433 +1,80 @@
 """
 새로운 UI 디자인 스타일 (Tailwind 스타일 적용)
 기존 app.py에서 import해서 사용
-"""
-
-import streamlit as st
-
-def apply_new_design_styles():
-    """
-    Tailwind CSS 기반 새로운 디자인 스타일 적용
-    - 데스크톱: 클린한 그레이 테마
-    - 모바일: 아카데미 다크 테마
-    """
-
-    # Google Fonts 로드
-    st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap" rel="stylesheet"/>
-    <link href="https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700&family=Inter:wght@400;500;700&family=JetBrains+Mono:wght@400;700&family=Playfair+Display:wght@700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet"/>
-    <link href="https://fonts.googleapis.com/css2?family=Material+Symbols+Outlined" rel="stylesheet"/>
-    """, unsafe_allow_html=True)
-
-    st.markdown("""
-    <style>
-    /* ========================================
-       글로벌 설정
-    ======================================== */
-
-    :root {
-        /* 데스크톱 색상 (클린 그레이) */
-        --primary: #7C3AED;
-        --bg-light: #F9FAFB;
-        --bg-dark: #111827;
-        --gray-50: #F9FAFB;
-        --gray-100: #F3F4F6;
-        --gray-200: #E5E7EB;
-        --gray-300: #D1D5DB;
-        --gray-700: #374151;
-        --gray-800: #1F2937;
-        --gray-900: #111827;
-
-        /* 모바일 색상 (아카데미 테마) */
-        --academy-purple: #4C2AFF;
-        --deep-purple: #2D1B4E;
-        --midnight: #1A1625;
-        --neon-cyan: #00F6FF;
-        --electric-violet: #B458FF;
-        --hologram-green: #39FF14;
-        --ghost-white: #F7F5FF;
-        --ai-bubble: #7C3AED;
-        --player-bubble: #E5E5EA;
-    }
-
-    /* 기본 폰트 */
-    body, html, * {
-        font-family: 'Roboto', 'Space Grotesk', sans-serif !important;
-    }
-
-    /* 제목 폰트 */
-    h1, h2, h3 {
-        font-family: 'Playfair Display', 'Cinzel', serif !important;
-        font-weight: 700 !important;
-    }
-
-    /* 데이터/코드 폰트 */
-    code, pre, .stCodeBlock {
-        font-family: 'JetBrains Mono', monospace !important;
-    }
-
-    /* ========================================
-       레이아웃 최적화
-    ======================================== */
-
-    /* 전체 화면 설정 */
-    .main .block-container {
-        max-width: 1400px !important;
-        padding: 1rem 2rem !important;
-    }
-
-    /* 2열 레이아웃 */
-    [data-testid="column"] {
-        background: var(--gray-50);
-        border-radius: 0.5rem;
-        padding: 1.5rem !important;
-        min-height: 80vh;
-    }
-
-    [data-testid="column"]:first-child {
-        background: var(--gray-100);
-    }
-
-    /* ========================================
-       증거 섹션 (Expander) 스타일
-    ======================================== */
-
-    .streamlit-expanderHeader {
-        background: var(--gray-200) !important;
-        border-radius: 0.5rem !important;
-        border: 1px solid var(--gray-300) !important;
-        padding: 1rem 1.5rem !important;
-        font-weight: 700 !important;
-        font-size: 1.1rem !important;
-        color: var(--gray-700) !important;
-        transition: all 0.2s ease !important;
-    }
-
-    .streamlit-expanderHeader:hover {
-        background: var(--gray-300) !important;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .streamlit-expanderContent {
-        background: var(--gray-50) !important;
-        border: 1px solid var(--gray-200) !important;
-        border-top: none !important;
-        border-radius: 0 0 0.5rem 0.5rem !important;
-        padding: 1.5rem !important;
-    }
-
-    /* 확장/축소 아이콘 색상 */
-    .streamlit-expanderHeader svg {
-        fill: var(--primary) !important;
-    }
-
-    /* ========================================
-       진행 상황 카드
-    ======================================== */
-
-    .progress-card {
-        background: var(--gray-200) !important;
-        border-radius: 0.75rem !important;
-        padding: 1.5rem !important;
-        border: 1px solid var(--gray-300) !important;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-    }
-
-    .progress-label {
-        font-size: 0.875rem !important;
-        color: var(--gray-700) !important;
-        font-weight: 500 !important;
-        margin-bottom: 0.5rem;
-    }
-
-    .progress-value {
-        font-size: 1.875rem !important;
-        font-weight: 700 !important;
-        font-family: 'JetBrains Mono', monospace !important;
-    }
-
-    .progress-value-cyan {
-        color: var(--neon-cyan) !important;
-    }
-
-    .progress-value-green {
-        color: var(--hologram-green) !important;
-    }
-
-    .progress-value-purple {
-        color: var(--primary) !important;
-    }
-
-    /* ========================================
-       채팅 메시지 스타일
-    ======================================== */
-
-    /* AI 메시지 (Kastor) */
-    .stChatMessage[data-testid="assistant-message"] {
-        background: var(--ai-bubble) !important;
-        border-radius: 1rem !important;
-        border-top-left-radius: 0 !important;
-        padding: 0.75rem 1rem !important;
-        color: white !important;
-        max-width: 65% !important;
-        margin-left: 3rem !important;
-        box-shadow: 0 2px 4px rgba(124, 58, 237, 0.2) !important;
-    }
-
-    /* 사용자 메시지 */
-    .stChatMessage[data-testid="user-message"] {
-        background: var(--player-bubble) !important;
-        border-radius: 1rem !important;
-        border-top-right-radius: 0 !important;
-        padding: 0.75rem 1rem !important;
-        color: var(--gray-900) !important;
-        max-width: 65% !important;
-        margin-right: 3rem !important;
-        margin-left: auto !important;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1) !important;
-    }
-
-    /* 채팅 아바타 */
-    .stChatMessage .st-emotion-cache-1v0mbdj img {
-        border-radius: 50% !important;
-        border: 2px solid var(--primary) !important;
-        width: 40px !important;
-        height: 40px !important;
-    }
-
-    /* ========================================
-       버튼 스타일
-    ======================================== */
-
-    .stButton > button {
-        background: var(--gray-200) !important;
-        color: var(--gray-800) !important;
-        border-radius: 0.5rem !important;
-        border: 1px solid var(--gray-300) !important;
-        padding: 0.75rem 1.5rem !important;
-        font-weight: 500 !important;
-        transition: all 0.2s ease !important;
-    }
 
-    .stButton > button:hover {
-        background: var(--gray-300) !important;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    /* 주요 버튼 (Primary) */
-    .stButton > button[kind="primary"] {
-        background: var(--primary) !important;
-        color: white !important;
-        border: none !important;
-    }
-
-    .stButton > button[kind="primary"]:hover {
-        background: var(--electric-violet) !important;
-    }
-
-    /* ========================================
-       배지 스타일
-    ======================================== */
-
-    .badge {
-        display: inline-block;
-        background: var(--primary);
-        color: white;
-        padding: 0.5rem 1rem;
-        border-radius: 9999px;
-        font-size: 0.875rem;
-        font-weight: 600;
-        margin: 0.25rem;
-        box-shadow: 0 2px 4px rgba(124, 58, 237, 0.3);
-    }
-
-    .badge-icon {
-        font-size: 1.25rem;
-        margin-right: 0.5rem;
-    }
-
-    /* ========================================
-       데이터프레임 & 차트
-    ======================================== */
-
-    .stDataFrame {
-        border: 1px solid var(--gray-300) !important;
-        border-radius: 0.5rem !important;
-        overflow: hidden;
-    }
-
-    .stPlotlyChart {
-        background: var(--gray-50) !important;
-        border-radius: 0.5rem !important;
-        padding: 1rem !important;
-    }
-
-    /* ========================================
-       스크롤바 커스텀
-    ======================================== */
-
-    ::-webkit-scrollbar {
-        width: 6px;
-        height: 6px;
-    }
-
-    ::-webkit-scrollbar-track {
-        background: transparent;
-    }
-
-    ::-webkit-scrollbar-thumb {
-        background: var(--gray-700);
-        border-radius: 3px;
-    }
-
-    ::-webkit-scrollbar-thumb:hover {
-        background: var(--gray-800);
-    }
-
-    /* ========================================
-       모바일 최적화
-    ======================================== */
-
-    @media (max-width: 768px) {
-        /* 모바일에서 아카데미 다크 테마 적용 */
-        [data-testid="column"] {
-            background: var(--midnight) !important;
-        }
-
-        .streamlit-expanderHeader {
-            background: var(--deep-purple) !important;
-            color: var(--ghost-white) !important;
-            border-color: rgba(255, 255, 255, 0.2) !important;
-        }
-
-        .streamlit-expanderContent {
-            background: var(--midnight) !important;
-            color: var(--ghost-white) !important;
-        }
-
-        body {
-            background: var(--deep-purple) !important;
-        }
-
-        .main {
-            background: var(--deep-purple) !important;
-        }
-
-        /* 모바일 채팅 메시지 크기 조정 */
-        .stChatMessage {
-            max-width: 85% !important;
-            font-size: 0.95rem !important;
-        }
-
-        /* 모바일 버튼 터치 최적화 */
-        .stButton > button {
-            min-height: 44px !important;
-            font-size: 1rem !important;
-        }
-    }
-
-    /* ========================================
-       다크 모드 지원 (브라우저 설정)
-    ======================================== */
-
-    @media (prefers-color-scheme: dark) {
-        :root {
-            --bg-light: var(--bg-dark);
-            --gray-50: var(--gray-900);
-            --gray-100: var(--gray-800);
-            --gray-200: var(--gray-700);
-        }
-
-        body {
-            background: var(--bg-dark) !important;
-            color: var(--ghost-white) !important;
-        }
-
-        [data-testid="column"] {
-            background: var(--gray-900) !important;
-        }
-
-        .streamlit-expanderHeader {
-            background: var(--gray-800) !important;
-            color: var(--ghost-white) !important;
-        }
-    }
-
-    /* ========================================
-       애니메이션
-    ======================================== */
-
-    @keyframes badgePop {
-        0% {
-            transform: scale(0);
-            opacity: 0;
-        }
-        50% {
-            transform: scale(1.2);
-        }
-        100% {
-            transform: scale(1);
-            opacity: 1;
-        }
-    }
-
-    .badge-new {
-        animation: badgePop 0.5s ease-out;
-    }
+CSS 원본은 assets/new_design.css
+압축 + 해시된 번들(static/)과 자체 호스팅 폰트를 사용 (빌드 결과가 없거나 오래되면 처음 적용할 때 자동 빌드),
+빌드할 수 없으면 예전처럼 원본 CSS와 Google Fonts 링크를 인라인으로 넣음
+"""
 
-    @keyframes pulse {
-        0%, 100% {
-            opacity: 1;
-        }
-        50% {
-            opacity: 0.5;
-        }
-    }
+from functools import lru_cache
 
-    .typing-indicator {
-        animation: pulse 1.5s ease-in-out infinite;
-    }
+import streamlit as st
+import streamlit.components.v1 as components
 
-    /* ========================================
-       유틸리티 클래스
-    ======================================== */
+from build_assets import CSS_BUNDLES, STATIC_URL, ensure_built, minify_css
 
-    .text-cyan {
-        color: var(--neon-cyan) !important;
-    }
+DESIGN_BUNDLE = "new_design.css"
 
-    .text-green {
-        color: var(--hologram-green) !important;
-    }
+GOOGLE_FONTS_LINKS = """
+<link href="https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap" rel="stylesheet"/>
+<link href="https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700&family=Inter:wght@400;500;700&family=JetBrains+Mono:wght@400;700&family=Playfair+Display:wght@700&family=Space+Grotesk:wght@400;500;700&display=swap" rel="stylesheet"/>
+<link href="https://fonts.googleapis.com/css2?family=Material+Symbols+Outlined" rel="stylesheet"/>
+"""
 
-    .text-purple {
-        color: var(--primary) !important;
-    }
+# 부모 문서 <head>에 번들을 한 번만 붙이는 로더
+# Streamlit 정적 서빙은 .css를 text/plain(nosniff)으로 내보내서 <link rel="stylesheet">로는 적용되지 않음
+# → fetch로 받아 <style id=번들명>으로 삽입 (해시 파일명이라 브라우저 캐시 그대로 사용)
+BUNDLE_LOADER = """
+<script>
+(function () {{
+    const doc = window.parent.document;
+    if (doc.getElementById("{bundle_id}")) return;
+    const style = doc.createElement("style");
+    style.id = "{bundle_id}";
+    doc.head.appendChild(style);
+    fetch(new URL("{href}", doc.baseURI))
+        .then((response) => response.text())
+        .then((css) => {{ style.textContent = css; }});
+}})();
+</script>
+"""
 
-    .text-gray {
-        color: var(--gray-700) !important;
-    }
 
-    .bg-midnight {
-        background: var(--midnight) !important;
-    }
+@lru_cache(maxsize=None)
+def load_asset_manifest():
+    """빌드 매니페스트 (필요하면 빌드, 빌드할 수 없으면 빈 dict) - 프로세스당 한 번만"""
+    return ensure_built()
 
-    .bg-gray-light {
-        background: var(--gray-100) !important;
-    }
 
-    .rounded-lg {
-        border-radius: 0.5rem !important;
-    }
+@lru_cache(maxsize=None)
+def load_inline_css(name=DESIGN_BUNDLE):
+    """빌드 전 fallback용 압축 CSS"""
+    return minify_css(CSS_BUNDLES[name].read_text(encoding="utf-8"))
 
-    .shadow-md {
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1) !important;
-    }
 
-    </style>
-    """, unsafe_allow_html=True)
+def apply_new_design_styles():
+    """
+    Tailwind CSS 기반 새로운 디자인 스타일 적용
+    - 데스크톱: 클린한 그레이 테마
+    - 모바일: 아카데미 다크 테마
+    """
+    bundle = load_asset_manifest().get(DESIGN_BUNDLE)
+
+    if bundle:
+        # 수백 줄 CSS 대신 작은 로더만 전달 (같은 인자면 프론트엔드가 iframe을 재사용해 다시 실행하지 않음)
+        components.html(
+            BUNDLE_LOADER.format(bundle_id=bundle["file"], href=STATIC_URL + bundle["file"]),
+            height=0,
+        )
+        if bundle.get("fonts"):
+            return
+    else:
+        # 빌드 결과가 없으면 인라인 CSS
+        st.markdown(f"<style>{load_inline_css()}</style>", unsafe_allow_html=True)
+
+    # Google Fonts 로드 (자체 호스팅 폰트가 번들에 없을 때만 - 폰트가 번들되면 원격 <link>는 넣지 않음)
+    st.markdown(GOOGLE_FONTS_LINKS, unsafe_allow_html=True)
 
 
 def render_progress_cards(stage, points, badges_count, total_badges=7):
@@ -0,0 +1,241 @@
+"""
+핫 패스 계측 (rerun / 스테이지 핸들러 / LLM 호출 / 증거 패널 렌더링)
+span() 컨텍스트 매니저나 @traced 데코레이터로 구간 시간을 기록하고
+OpenTelemetry OTLP/JSON 형식(한 줄에 ExportTraceServiceRequest 하나)으로 로컬 파일에 내보냄
+→ OTel Collector의 otlpjsonfile 리시버로 그대로 읽을 수 있고, telemetry_dashboard.py에서 p50/p95 확인
+
+- TELEMETRY_ENABLED=0이면 아무것도 기록하지 않음
+- TELEMETRY_FILE: 출력 파일 (기본값: 임시 폴더의 kastor_spans.jsonl)
+- 부모-자식 관계는 contextvars로 추적 (세션마다 스크립트 스레드가 달라도 섞이지 않음)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+ENABLED = os.getenv("TELEMETRY_ENABLED", "1") != "0"
+TELEMETRY_FILE = os.getenv("TELEMETRY_FILE", os.path.join(tempfile.gettempdir(), "kastor_spans.jsonl"))
+SERVICE_NAME = "kastor-data-academy"
+
+# 버퍼가 이만큼 차면 파일로 내보냄
+FLUSH_BATCH_SIZE = 64
+
+# st.rerun / st.stop이 쓰는 제어 흐름 예외 (에러로 기록하지 않음)
+CONTROL_FLOW_EXCEPTIONS = {"RerunException", "StopException"}
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _otlp_value(value):
+    """파이썬 값 → OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """하나의 계측 구간"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "_token")
+
+    def __init__(self, name, attributes=None):
+        parent = _current_span.get()
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = None
+        self._token = _current_span.set(self)
+
+    def set(self, **attributes):
+        """속성 추가 (토큰 수 등 끝나고 알게 되는 값)"""
+        self.attributes.update(attributes)
+
+    def end(self, error=None):
+        """구간 종료 (여러 번 호출해도 한 번만 기록)"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = {"code": 2, "message": f"{type(error).__name__}: {error}"}
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # 다른 컨텍스트에서 종료된 경우 (프래그먼트 재실행 등)
+            pass
+        EXPORTER.add(self)
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status:
+            span["status"] = self.status
+        return span
+
+
+class NoopSpan:
+    """계측이 꺼져 있을 때 쓰는 빈 구간"""
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error=None):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class JsonFileExporter:
+    """OTLP/JSON 파일 내보내기 (스레드 안전, 배치 단위로 한 줄씩 추가)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self._buffer.append(span)
+            full = len(self._buffer) >= FLUSH_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "telemetry"}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+EXPORTER = JsonFileExporter(TELEMETRY_FILE)
+
+
+def start_span(name, **attributes):
+    """구간 시작 (직접 end() 호출 필요 - 스크립트 전체 rerun처럼 with로 감쌀 수 없는 경우)"""
+    if not ENABLED:
+        return NOOP_SPAN
+    return Span(name, attributes)
+
+
+class span:
+    """with span("이름", 속성=값) as s: ... - 예외가 나도 구간은 기록"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self._span = NOOP_SPAN
+
+    def __enter__(self):
+        self._span = start_span(self.name, **self.attributes)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and exc_type.__name__ not in CONTROL_FLOW_EXCEPTIONS:
+            self._span.end(error=exc)
+        else:
+            self._span.end()
+        return False
+
+
+def traced(name=None, **attributes):
+    """함수 전체를 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_fragment(name=None, **attributes):
+    """
+    st.fragment 함수용 @traced
+    전체 rerun 안에서 호출되면 그 자식 구간, 프래그먼트만 재실행될 때는 바깥 구간이 없으므로
+    app.fragment_rerun 루트 구간으로 감싸고 끝나면 바로 내보냄
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+        inner = traced(span_name, **attributes)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED or _current_span.get() is not None:
+                return inner(*args, **kwargs)
+            try:
+                with span("app.fragment_rerun", fragment=span_name):
+                    return inner(*args, **kwargs)
+            finally:
+                flush()
+        return wrapper
+    return decorator
+
+
+def flush():
+    """버퍼에 남은 구간 내보내기"""
+    if ENABLED:
+        EXPORTER.flush()
+
+
+def read_spans(path=TELEMETRY_FILE):
+    """내보낸 파일 → 구간 dict 목록 (name, duration_ms, start_ns, attributes)"""
+    if not os.path.exists(path):
+        return []
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for item in scope.get("spans", []):
+                        attributes = {
+                            attr["key"]: next(iter(attr["value"].values()))
+                            for attr in item.get("attributes", [])
+                        }
+                        start, end = int(item["startTimeUnixNano"]), int(item["endTimeUnixNano"])
+                        spans.append({
+                            "name": item["name"],
+                            "start_ns": start,
+                            "duration_ms": (end - start) / 1e6,
+                            "error": "status" in item,
+                            "attributes": attributes,
+                        })
+    return spans
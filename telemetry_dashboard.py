@@ -0,0 +1,85 @@
+"""
+계측 대시보드 (관리자용)
+telemetry.py가 내보낸 구간 파일을 읽어 구간 / 스테이지별 p50, p95를 보여줌
+
+실행: streamlit run telemetry_dashboard.py
+"""
+
+import time
+
+import pandas as pd
+import streamlit as st
+
+import telemetry
+
+st.set_page_config(page_title="캐스터 계측 대시보드", page_icon="⏱️", layout="wide")
+st.title("⏱️ 캐스터 계측 대시보드")
+st.caption(f"구간 파일: {telemetry.TELEMETRY_FILE}")
+
+
+@st.cache_data(ttl=10)
+def load_spans(path):
+    """구간 파일 → DataFrame (10초 캐시)"""
+    spans = telemetry.read_spans(path)
+    if not spans:
+        return pd.DataFrame()
+    df = pd.DataFrame(spans)
+    attributes = pd.json_normalize(df.pop("attributes"))
+    return pd.concat([df, attributes], axis=1)
+
+
+def latency_table(df, by):
+    """그룹별 횟수 / p50 / p95 / 최대 (ms)"""
+    grouped = df.groupby(by)["duration_ms"]
+    table = pd.DataFrame({
+        "횟수": grouped.size(),
+        "p50 (ms)": grouped.quantile(0.5),
+        "p95 (ms)": grouped.quantile(0.95),
+        "최대 (ms)": grouped.max(),
+    })
+    return table.sort_values("p95 (ms)", ascending=False).round(1)
+
+
+spans_df = load_spans(telemetry.TELEMETRY_FILE)
+if spans_df.empty:
+    st.info("아직 기록된 구간이 없습니다. app.py를 실행해 플레이하면 여기에 표시됩니다.")
+    st.stop()
+
+window = st.sidebar.selectbox("기간", ["최근 15분", "최근 1시간", "최근 24시간", "전체"], index=1)
+window_minutes = {"최근 15분": 15, "최근 1시간": 60, "최근 24시간": 24 * 60}.get(window)
+if window_minutes:
+    since_ns = time.time_ns() - window_minutes * 60 * 1_000_000_000
+    spans_df = spans_df[spans_df["start_ns"] >= since_ns]
+
+col1, col2, col3 = st.columns(3)
+reruns = spans_df[spans_df["name"] == "app.rerun"]
+col1.metric("rerun", f"{len(reruns):,}회")
+col2.metric("rerun p95", f"{reruns['duration_ms'].quantile(0.95):.0f} ms" if len(reruns) else "-")
+col3.metric("에러 구간", f"{int(spans_df['error'].sum()):,}개")
+
+st.subheader("구간별 지연 시간")
+st.dataframe(latency_table(spans_df, "name"), use_container_width=True)
+
+if "stage" in spans_df.columns:
+    st.subheader("스테이지별 지연 시간")
+    span_name = st.selectbox("구간", ["stage.handler", "app.rerun", "llm.call"])
+    stage_df = spans_df[(spans_df["name"] == span_name) & spans_df["stage"].notna()]
+    if stage_df.empty:
+        st.caption("기록 없음")
+    else:
+        st.dataframe(latency_table(stage_df, "stage"), use_container_width=True)
+
+# 프래그먼트만 다시 실행된 구간 (stage 속성 없음 → 프래그먼트별로)
+fragment_df = spans_df[spans_df["name"] == "app.fragment_rerun"]
+if not fragment_df.empty and "fragment" in fragment_df.columns:
+    st.subheader("프래그먼트 재실행 지연 시간")
+    st.dataframe(latency_table(fragment_df, "fragment"), use_container_width=True)
+
+llm_df = spans_df[spans_df["name"] == "llm.call"]
+if not llm_df.empty and "output_tokens" in llm_df.columns:
+    st.subheader("LLM 호출")
+    tokens = llm_df[["input_tokens", "output_tokens"]].apply(pd.to_numeric, errors="coerce")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("호출 수", f"{len(llm_df):,}")
+    col2.metric("평균 입력 토큰", f"{tokens['input_tokens'].mean():.0f}")
+    col3.metric("평균 출력 토큰", f"{tokens['output_tokens'].mean():.0f}")
@@ -0,0 +1,149 @@
+"""
+HTML UI 셸 (mobile_ui.html / desktop_ui.html) 로더 + 정적 서버
+mobile_app.py / new_app.py에서 사용
+
+- 프로세스당 한 번만 읽고 압축 (공백 / 주석 제거) → 매 rerun마다 디스크를 읽지 않음
+- gzip (brotli 패키지가 있으면 br도) 압축본을 미리 만들어 둠
+- UI_SHELL_URL 환경 변수가 있으면 (예: http://localhost:8502) 작은 정적 서버를 띄우고
+  iframe src로 임베드 → 브라우저가 ETag로 캐시, rerun마다 HTML이 다시 전송되지 않음
+  (Streamlit 정적 서빙은 .html을 text/plain으로 내보내서 iframe에 쓸 수 없음)
+  서버는 기본적으로 localhost에만 바인딩 (다른 주소가 필요하면 UI_SHELL_HOST),
+  포트가 사용 중이라 바인딩할 수 없으면 인라인 렌더링으로 대체
+- UI_SHELL_URL이 없으면 예전처럼 components.html로 인라인 렌더링 (압축본 사용)
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(__file__)
+
+# 셸 이름 → HTML 파일
+SHELLS = {
+    "mobile": "mobile_ui.html",
+    "desktop": "desktop_ui.html",
+}
+
+HTML_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.S)
+
+
+def minify_html(html):
+    """HTML 압축 - 주석과 줄 앞뒤 공백 / 빈 줄만 제거 (줄바꿈은 유지해서 인라인 스크립트 안전)"""
+    html = HTML_COMMENT_PATTERN.sub("", html)
+    lines = (line.strip() for line in html.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class ShellAsset:
+    """압축된 셸 HTML + 미리 압축한 인코딩별 본문"""
+
+    def __init__(self, name, html):
+        self.name = name
+        self.body = minify_html(html).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:16] + '"'
+        self.encodings = {"gzip": gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(self.body, quality=11)
+
+    def negotiate(self, accept_encoding):
+        """Accept-Encoding에 맞는 (인코딩, 본문) 반환 - br > gzip > 원본"""
+        accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encodings:
+                return encoding, self.encodings[encoding]
+        return None, self.body
+
+
+@lru_cache(maxsize=None)
+def load_shell(name):
+    """셸 로드 (프로세스당 한 번)"""
+    with open(os.path.join(BASE_DIR, SHELLS[name]), "r", encoding="utf-8") as f:
+        return ShellAsset(name, f.read())
+
+
+class ShellRequestHandler(BaseHTTPRequestHandler):
+    """GET /<셸 이름>.html - ETag / If-None-Match / 압축 협상 지원"""
+
+    def do_GET(self):
+        name = urlparse(self.path).path.strip("/").removesuffix(".html")
+        if name not in SHELLS:
+            self.send_error(404)
+            return
+
+        shell = load_shell(name)
+        if self.headers.get("If-None-Match") == shell.etag:
+            self.send_response(304)
+            self._send_cache_headers(shell)
+            self.end_headers()
+            return
+
+        encoding, body = shell.negotiate(self.headers.get("Accept-Encoding"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self._send_cache_headers(shell)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_cache_headers(self, shell):
+        self.send_header("ETag", shell.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def log_message(self, format, *args):
+        # 요청마다 콘솔에 찍지 않음
+        pass
+
+
+def shell_base_url():
+    """셸 서버 URL (UI_SHELL_URL 환경 변수, 없으면 None → 인라인 렌더링)"""
+    url = os.getenv("UI_SHELL_URL")
+    return url.rstrip("/") if url else None
+
+
+def shell_host():
+    """셸 서버 바인딩 주소 (UI_SHELL_HOST 환경 변수, 기본 localhost)"""
+    return os.getenv("UI_SHELL_HOST", "127.0.0.1")
+
+
+def start_shell_server(port, host="127.0.0.1"):
+    """셸 정적 서버를 백그라운드 스레드로 시작"""
+    for name in SHELLS:
+        load_shell(name)
+    server = ThreadingHTTPServer((host, port), ShellRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def get_shell_server(port, host):
+    """프로세스당 한 번만 서버 시작 (모든 세션 공유), 바인딩 실패 시 None"""
+    try:
+        return start_shell_server(port, host)
+    except OSError as e:
+        print(f"⚠️ 셸 서버를 {host}:{port}에 띄울 수 없어 인라인 렌더링 사용: {e}")
+        return None
+
+
+def render_shell(name, height, scrolling=False):
+    """셸 렌더링 - 서버가 설정되어 있고 떠 있으면 iframe src, 아니면 인라인"""
+    base_url = shell_base_url()
+    if base_url and get_shell_server(urlparse(base_url).port or 80, shell_host()) is not None:
+        components.iframe(f"{base_url}/{name}.html", height=height, scrolling=scrolling)
+    else:
+        components.html(load_shell(name).body.decode("utf-8"), height=height, scrolling=scrolling)